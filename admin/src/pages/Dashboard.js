@@ -29,6 +29,33 @@ ChartJS.register(
 );
 
 const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'http://127.0.0.1:8000/api';
+const PAGE_SIZE = 200;
+const LIVE_EVENT_TYPES = [
+  'case.created',
+  'case.status_changed',
+  'tip.created',
+  'tip.verified',
+  'report.created',
+  'report.reviewed',
+  'user.score_changed',
+  'import.completed',
+];
+
+// List endpoints return cursor pages ({ next, previous, results }); follow
+// `next` to the last page so the tables hold every row. Null on a failed page.
+const fetchAllPages = async (url) => {
+  const rows = [];
+  let next = url;
+  while (next) {
+    const res = await fetch(next);
+    if (!res.ok) return null;
+    const body = await res.json();
+    if (Array.isArray(body)) return body;
+    rows.push(...(body.results || []));
+    next = body.next;
+  }
+  return rows;
+};
 
 const Dashboard = () => {
   const [activeTab, setActiveTab] = useState('overview');
@@ -43,27 +70,30 @@ const Dashboard = () => {
   const [redemptions, setRedemptions] = useState([]);
   const [reports, setReports] = useState([]);
   const [pointsAdjustments, setPointsAdjustments] = useState({});
+  const [stats, setStats] = useState(null);
 
   // API Configuration
   // Fetch Data (Polling for real-time updates)
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [casesRes, tipsRes, usersRes, rewardsRes, redemptionsRes, reportsRes] = await Promise.all([
-          fetch(`${API_BASE_URL}/cases`),
-          fetch(`${API_BASE_URL}/tips`),
-          fetch(`${API_BASE_URL}/users`),
+        const [statsRes, rewardsRes, casesRows, tipsRows, usersRows, redemptionsRows, reportsRows] = await Promise.all([
+          fetch(`${API_BASE_URL}/stats`),
           fetch(`${API_BASE_URL}/rewards`),
-          fetch(`${API_BASE_URL}/rewards/redemptions`),
-          fetch(`${API_BASE_URL}/reports/`)
+          fetchAllPages(`${API_BASE_URL}/cases?page_size=${PAGE_SIZE}`),
+          fetchAllPages(`${API_BASE_URL}/tips?page_size=${PAGE_SIZE}`),
+          fetchAllPages(`${API_BASE_URL}/users?page_size=${PAGE_SIZE}`),
+          fetchAllPages(`${API_BASE_URL}/rewards/redemptions?page_size=${PAGE_SIZE}`),
+          fetchAllPages(`${API_BASE_URL}/reports/?page_size=${PAGE_SIZE}`)
         ]);
 
-        if (casesRes.ok) setCases(await casesRes.json());
-        if (tipsRes.ok) setTips(await tipsRes.json());
-        if (usersRes.ok) setUsers(await usersRes.json());
+        if (statsRes.ok) setStats(await statsRes.json());
         if (rewardsRes.ok) setRewards(await rewardsRes.json());
-        if (redemptionsRes.ok) setRedemptions(await redemptionsRes.json());
-        if (reportsRes.ok) setReports(await reportsRes.json());
+        if (casesRows) setCases(casesRows);
+        if (tipsRows) setTips(tipsRows);
+        if (usersRows) setUsers(usersRows);
+        if (redemptionsRows) setRedemptions(redemptionsRows);
+        if (reportsRows) setReports(reportsRows);
         setLastUpdated(new Date());
       } catch (error) {
         console.error('Error fetching dashboard data:', error);
@@ -73,8 +103,22 @@ const Dashboard = () => {
     };
 
     fetchData();
-    const interval = setInterval(fetchData, 5000); // Poll every 5 seconds
-    return () => clearInterval(interval);
+
+    // Changes are pushed over Server-Sent Events; refetch (debounced) when one
+    // arrives. The slow poll only covers a dropped stream.
+    let pending = null;
+    const scheduleFetch = () => {
+      clearTimeout(pending);
+      pending = setTimeout(fetchData, 500);
+    };
+    const source = new EventSource(`${API_BASE_URL}/events`);
+    LIVE_EVENT_TYPES.forEach(type => source.addEventListener(type, scheduleFetch));
+    const interval = setInterval(fetchData, 60000);
+    return () => {
+      source.close();
+      clearTimeout(pending);
+      clearInterval(interval);
+    };
   }, []);
 
   // Actions
@@ -107,6 +151,22 @@ const Dashboard = () => {
     }
   };
 
+  const handleVerifyAllTips = async () => {
+    const ids = tips.filter(t => !t.verified).map(t => t.id);
+    if (ids.length === 0) return;
+    setTips(tips.map(t => ({ ...t, verified: true })));
+
+    try {
+      await fetch(`${API_BASE_URL}/tips/verify`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ids }),
+      });
+    } catch (error) {
+      console.error('Failed to verify tips:', error);
+    }
+  };
+
   const handleRedemptionReview = async (id, status) => {
     setRedemptions(redemptions.map(r => r.id === id ? { ...r, status } : r));
 
@@ -176,33 +236,31 @@ const Dashboard = () => {
     return (urgencyWeight * 0.65 + recency * 0.35).toFixed(2);
   };
 
+  // Totals come from the cached /stats aggregates; the lists only hold the latest page.
+  const caseCountByStatus = (status) => (
+    stats ? stats.cases.by_status[status] || 0 : cases.filter(c => c.status === status).length
+  );
+
   // Analytics Data Configuration
   const urgencyData = useMemo(() => ({
     labels: ['High', 'Medium', 'Low'],
     datasets: [{
-      data: [
-        cases.filter(c => c.urgency === 'High').length,
-        cases.filter(c => c.urgency === 'Medium').length,
-        cases.filter(c => c.urgency === 'Low').length,
-      ],
+      data: ['High', 'Medium', 'Low'].map(urgency => (
+        stats ? stats.cases.by_urgency[urgency] || 0 : cases.filter(c => c.urgency === urgency).length
+      )),
       backgroundColor: ['#f56565', '#ed8936', '#48bb78'],
       hoverOffset: 4,
     }]
-  }), [cases]);
+  }), [cases, stats]);
 
   const statusData = useMemo(() => ({
     labels: ['Pending', 'Active', 'Solved', 'Rejected'],
     datasets: [{
       label: 'Cases',
-      data: [
-        cases.filter(c => c.status === 'Pending').length,
-        cases.filter(c => c.status === 'Active').length,
-        cases.filter(c => c.status === 'Solved').length,
-        cases.filter(c => c.status === 'Rejected').length,
-      ],
+      data: ['Pending', 'Active', 'Solved', 'Rejected'].map(status => caseCountByStatus(status)),
       backgroundColor: '#3b82f6',
     }]
-  }), [cases]);
+  }), [cases, stats]);
 
   // Render Sections
   const renderOverview = () => (
@@ -210,7 +268,7 @@ const Dashboard = () => {
       <div className="stat-card">
         <div>
           <h3>Total Cases</h3>
-          <p>{cases.length}</p>
+          <p>{stats ? stats.cases.total : cases.length}</p>
         </div>
         <div className="stat-icon icon-blue">
           <FiCheckSquare size={24} />
@@ -219,7 +277,7 @@ const Dashboard = () => {
       <div className="stat-card">
         <div>
           <h3>Active Cases</h3>
-          <p>{cases.filter(c => c.status === 'Active').length}</p>
+          <p>{caseCountByStatus('Active')}</p>
         </div>
         <div className="stat-icon icon-green">
           <FiActivity size={24} />
@@ -228,7 +286,7 @@ const Dashboard = () => {
       <div className="stat-card">
         <div>
           <h3>Pending Verification</h3>
-          <p>{cases.filter(c => c.status === 'Pending').length}</p>
+          <p>{caseCountByStatus('Pending')}</p>
         </div>
         <div className="stat-icon icon-orange">
           <FiClock size={24} />
@@ -237,7 +295,7 @@ const Dashboard = () => {
       <div className="stat-card">
         <div>
           <h3>Tips Received</h3>
-          <p>{tips.length}</p>
+          <p>{stats ? stats.tips.total : tips.length}</p>
         </div>
         <div className="stat-icon icon-purple">
           <FiMessageSquare size={24} />
@@ -255,7 +313,7 @@ const Dashboard = () => {
       <div className="stat-card">
         <div>
           <h3>Sighting Reports</h3>
-          <p>{reports.length}</p>
+          <p>{stats ? stats.sightings.total : reports.length}</p>
         </div>
         <div className="stat-icon icon-orange">
           <FiAlertCircle size={24} />
@@ -319,6 +377,9 @@ const Dashboard = () => {
   const renderTips = () => (
     <div className="table-container">
       <h2>Tip Monitoring</h2>
+      {tips.some(t => !t.verified) && (
+        <button className="btn-verify" onClick={handleVerifyAllTips}>Verify All Pending</button>
+      )}
       <table>
         <thead>
           <tr>
@@ -1,25 +1,72 @@
 from django.contrib import admin
-from .models import Case, Tip, HonourProfile, Reward, RewardRedemption, UserCoupon
+from . import medals, search, tasks
+from .models import (
+    Case,
+    Tip,
+    HonourProfile,
+    MedalRule,
+    PointsTransaction,
+    Reward,
+    RewardRedemption,
+    Task,
+    UserCoupon,
+)
+
+
+class IndexedSearchMixin:
+    """Answer the changelist search box from the inverted index instead of LIKE scans."""
+
+    search_doc_type = None
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return queryset.filter(pk__in=search.matching_ids(self.search_doc_type, search_term)), False
 
 
 @admin.register(Case)
-class CaseAdmin(admin.ModelAdmin):
+class CaseAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'name', 'location', 'urgency', 'status', 'reliability', 'created_at')
     list_filter = ('urgency', 'status')
     search_fields = ('name', 'location', 'description')
+    search_doc_type = 'case'
 
 
 @admin.register(Tip)
-class TipAdmin(admin.ModelAdmin):
+class TipAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = ('id', 'case', 'reporter', 'verified', 'created_at')
     list_filter = ('verified', 'is_anonymous', 'share_location')
     search_fields = ('reporter', 'content')
+    search_doc_type = 'tip'
 
 
 @admin.register(HonourProfile)
 class HonourProfileAdmin(admin.ModelAdmin):
-    list_display = ('id', 'user', 'score')
+    list_display = ('id', 'user', 'score', 'reserved_points')
     search_fields = ('user__username', 'user__email')
+    # The score is materialized from the points ledger; adjust it through the API.
+    readonly_fields = ('score', 'reserved_points')
+
+
+@admin.register(MedalRule)
+class MedalRuleAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'metric', 'threshold', 'is_active', 'created_at')
+    list_filter = ('metric', 'is_active')
+    search_fields = ('name',)
+    actions = ['reevaluate']
+
+    @admin.action(description='Re-evaluate selected rules for all users')
+    def reevaluate(self, request, queryset):
+        granted, revoked = medals.reevaluate(rule_ids=list(queryset.values_list('id', flat=True)), revoke=True)
+        self.message_user(request, f'Granted {granted} and revoked {revoked} medals.')
+
+
+@admin.register(PointsTransaction)
+class PointsTransactionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'amount', 'reason', 'source_key', 'created_at')
+    list_filter = ('reason',)
+    search_fields = ('user__username', 'source_key')
+    readonly_fields = ('user', 'amount', 'reason', 'source_key', 'created_at')
 
 
 @admin.register(Reward)
@@ -31,9 +78,11 @@ class RewardAdmin(admin.ModelAdmin):
 
 @admin.register(RewardRedemption)
 class RewardRedemptionAdmin(admin.ModelAdmin):
-    list_display = ('id', 'reward', 'user', 'status', 'requested_at', 'reviewed_at')
+    list_display = ('id', 'reward', 'user', 'status', 'reserved_points', 'requested_at', 'reviewed_at')
     list_filter = ('status',)
     search_fields = ('reward__name', 'user__username', 'user__email')
+    # Status changes go through the review endpoint, which settles the reservation.
+    readonly_fields = ('status', 'reserved_points')
 
 
 @admin.register(UserCoupon)
@@ -41,3 +90,15 @@ class UserCouponAdmin(admin.ModelAdmin):
     list_display = ('id', 'reward', 'user', 'status', 'issued_at', 'used_at')
     list_filter = ('status',)
     search_fields = ('reward__name', 'user__username', 'user__email')
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'max_attempts', 'run_at', 'locked_by', 'created_at')
+    list_filter = ('status', 'name')
+    readonly_fields = ('attempts', 'locked_by', 'locked_until', 'last_error', 'created_at')
+    actions = ['retry']
+
+    @admin.action(description='Retry selected tasks now')
+    def retry(self, request, queryset):
+        self.message_user(request, f'Queued {tasks.retry(queryset)} tasks.')
@@ -3,3 +3,41 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from . import blobs, changes, counters, coupons, identifiers, leaderboard, medals, renditions, search, stats
+        from .models import Case, HonourProfile, Tip, UserCoupon
+        from .serializers import CaseReadSerializer, TipReadSerializer, UserCouponSerializer
+
+        search.register(
+            Case,
+            'case',
+            {'name': 3, 'location': 2, 'description': 1},
+            render=CaseReadSerializer.render_by_id,
+        )
+        search.register(Tip, 'tip', {'content': 1, 'reporter': 1}, render=TipReadSerializer.render_by_id)
+        stats.connect()
+        counters.connect()
+        leaderboard.connect()
+        medals.connect()
+        identifiers.connect()
+        blobs.track(Case, 'photo', 'cases')
+        blobs.track(Tip, 'attachment', 'tips')
+        renditions.register(Case, 'photo', 'cases')
+        renditions.register(Tip, 'attachment', 'tips')
+
+        def render_coupons(ids):
+            coupons = UserCoupon.objects.filter(id__in=ids).select_related('reward')
+            return {coupon.id: UserCouponSerializer(coupon).data for coupon in coupons}
+
+        def render_profiles(ids):
+            return {
+                row['id']: {'id': row['id'], 'userId': row['user_id'], 'score': row['score'], 'medals': row['medals']}
+                for row in HonourProfile.objects.filter(id__in=ids).values('id', 'user_id', 'score', 'medals')
+            }
+
+        changes.register(Case, 'cases', render=CaseReadSerializer.render_by_id)
+        changes.register(Tip, 'tips', render=TipReadSerializer.render_by_id)
+        changes.register(UserCoupon, 'coupons', render=render_coupons, owner=lambda coupon: coupon.user_id)
+        changes.register(HonourProfile, 'profile', render=render_profiles, owner=lambda profile: profile.user_id)
+        coupons.start_sweeper()
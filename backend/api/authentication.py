@@ -0,0 +1,70 @@
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from . import tokens
+
+
+class TokenUser:
+    """
+    The user behind a verified access token, built from its claims alone.
+    Views that need the full `User` row fetch it themselves; most only need
+    the id.
+    """
+
+    is_active = True
+    is_anonymous = False
+    is_authenticated = True
+
+    def __init__(self, claims):
+        self.id = self.pk = claims['uid']
+        self.role = claims.get('role', tokens.ROLE_USER)
+        self.is_staff = self.role == tokens.ROLE_ADMIN
+        self.is_superuser = False
+
+    def __str__(self):
+        return f'TokenUser {self.id}'
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """`Authorization: Bearer <access token>`, verified without a database query."""
+
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        header = get_authorization_header(request).split()
+        if not header or header[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(header) != 2:
+            raise exceptions.AuthenticationFailed('Invalid Authorization header.')
+        try:
+            claims = tokens.decode(header[1].decode(), tokens.ACCESS)
+        except (tokens.InvalidToken, UnicodeError) as exc:
+            raise exceptions.AuthenticationFailed(str(exc) or 'Token is invalid.')
+        return TokenUser(claims), claims
+
+    def authenticate_header(self, request):
+        return self.keyword
+
+
+def acting_user_id(request, supplied=None):
+    """
+    Id of the user a request acts as. Authenticated requests act as their own
+    user, and a different `userId` in the payload is refused. Anonymous
+    requests fall back to the client-supplied id while TRUST_CLIENT_USER_ID is
+    on, for app builds that predate tokens.
+    """
+    if supplied in (None, ''):
+        supplied = None
+    if request.user.is_authenticated:
+        if supplied is not None and str(supplied) != str(request.user.id):
+            raise exceptions.PermissionDenied('userId does not match the signed-in user.')
+        return request.user.id
+    if supplied is None:
+        return None
+    if not getattr(settings, 'TRUST_CLIENT_USER_ID', True):
+        raise exceptions.NotAuthenticated('Sign in to act as a user.')
+    try:
+        return int(supplied)
+    except (TypeError, ValueError):
+        raise exceptions.ValidationError({'userId': 'A valid integer is required.'})
@@ -0,0 +1,133 @@
+import hashlib
+import posixpath
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils.deconstruct import deconstructible
+
+PREFIX = 'blobs'
+# model -> {'field': file field name, 'resource': change-feed resource}
+_registry = {}
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that keeps each distinct upload once, at
+    `blobs/<aa>/<bb>/<sha256><ext>`. The upload is hashed in one streaming
+    pass; when the digest is already stored, saving only bumps its reference
+    count and writes nothing. Every `save()` takes a reference and every
+    `delete()` of a blob name gives one back, so the usual FieldFile
+    save/delete calls keep the count right. Names outside `blobs/` (files
+    stored before this backend) behave as in FileSystemStorage.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The requested name only contributes its extension; blobs never collide.
+        return name
+
+    def _save(self, name, content):
+        from .models import MediaBlob
+
+        digest, size = self.digest(content)
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(digest=digest).first()
+            if blob is None:
+                try:
+                    with transaction.atomic():
+                        blob = MediaBlob.objects.create(digest=digest, name=self.blob_name(digest, name), size=size)
+                except IntegrityError:
+                    blob = MediaBlob.objects.select_for_update().get(digest=digest)
+            MediaBlob.objects.filter(pk=blob.pk).update(references=F('references') + 1)
+            # Also restores a file lost to a crash between a row's commit and its write.
+            if not self.exists(blob.name):
+                super()._save(blob.name, content)
+        return blob.name
+
+    def delete(self, name):
+        from .models import MediaBlob
+
+        if not is_blob(name):
+            super().delete(name)
+            return
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is None:
+                return
+            if blob.references > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(references=F('references') - 1)
+                return
+            blob.delete()
+            # Only once the release commits, and only if no save has claimed the digest since.
+            transaction.on_commit(lambda: self._collect(blob.digest, name))
+
+    def _collect(self, digest, name):
+        from .models import MediaBlob
+
+        with transaction.atomic():
+            if not MediaBlob.objects.select_for_update().filter(digest=digest).exists():
+                super().delete(name)
+
+    @staticmethod
+    def digest(content):
+        sha = hashlib.sha256()
+        size = 0
+        for chunk in content.chunks():
+            sha.update(chunk)
+            size += len(chunk)
+        content.seek(0)
+        return sha.hexdigest(), size
+
+    @staticmethod
+    def blob_name(digest, name):
+        extension = posixpath.splitext(name)[1].lower()[:16]
+        return posixpath.join(PREFIX, digest[:2], digest[2:4], digest + extension)
+
+
+_storage = ContentAddressedStorage()
+
+
+def media_storage():
+    """Storage of uploaded case photos, tip attachments and report images."""
+    return _storage
+
+
+def is_blob(name):
+    return bool(name) and name.startswith(PREFIX + '/')
+
+
+def track(model, field, resource):
+    """
+    Give back `model.<field>`'s reference when a row's blob is replaced or the
+    row is deleted. The name loaded with the row is remembered, so this costs
+    no query. Files stored before content addressing are left alone.
+    """
+    _registry[model] = {'field': field, 'resource': resource}
+    attname = model._meta.get_field(field).attname
+
+    def on_init(sender, instance, **kwargs):
+        # Deferred fields stay unknown rather than costing a query; such saves release nothing.
+        value = instance.__dict__.get(attname)
+        instance._stored_file = value if isinstance(value, str) else None
+
+    def on_save(sender, instance, raw=False, **kwargs):
+        name = getattr(instance, field).name
+        previous = getattr(instance, '_stored_file', None)
+        if not raw and is_blob(previous) and previous != name:
+            getattr(instance, field).storage.delete(previous)
+        instance._stored_file = name
+
+    def on_delete(sender, instance, **kwargs):
+        file = getattr(instance, field)
+        if is_blob(file.name):
+            file.storage.delete(file.name)
+
+    post_init.connect(on_init, sender=model, weak=False, dispatch_uid=f'blobs-init-{resource}')
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f'blobs-save-{resource}')
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f'blobs-delete-{resource}')
+
+
+def tracked():
+    return [(model, spec['field'], spec['resource']) for model, spec in _registry.items()]
@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, Min, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import ChangeLogEntry
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 2000
+# Ids are handed out at insert time but become visible at commit, so a slow
+# transaction can commit an id below one a client has already read past.
+# Entries younger than this are held back until in-flight writers settle.
+DEFAULT_SETTLE_SECONDS = 2
+
+# resource -> {'model': Model, 'render': callable, 'owner': callable or None}
+_registry = {}
+
+
+class TokenExpired(Exception):
+    """The token predates the retained log; the client must reload in full."""
+
+
+def register(model, resource, render, owner=None):
+    """
+    Log saves and deletes of `model` under `resource`.
+
+    `render(ids)` returns `{id: payload}` for the feed. `owner(instance)`
+    returns the user id of per-user resources, whose entries are only shown
+    to that user.
+    """
+    _registry[resource] = {'model': model, 'render': render, 'owner': owner}
+
+    def on_save(sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        action = ChangeLogEntry.ACTION_CREATED if created else ChangeLogEntry.ACTION_UPDATED
+        record(resource, instance.pk, action, owner(instance) if owner else None)
+
+    def on_delete(sender, instance, **kwargs):
+        record(resource, instance.pk, ChangeLogEntry.ACTION_DELETED, owner(instance) if owner else None)
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f'change-log-save-{resource}')
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f'change-log-delete-{resource}')
+
+
+def registered_resources():
+    return list(_registry)
+
+
+def record(resource, object_id, action=ChangeLogEntry.ACTION_UPDATED, user_id=None):
+    """
+    Append one entry. Signal handlers cover `save()`/`delete()`; queryset
+    `update()` paths call this directly. Callers wrap the mutation in
+    `transaction.atomic()` so the entry commits or rolls back with it.
+    """
+    return ChangeLogEntry.objects.create(resource=resource, object_id=object_id, action=action, user_id=user_id)
+
+
+def record_many(resource, object_ids, action=ChangeLogEntry.ACTION_CREATED, user_id=None, owners=None):
+    """
+    `record()` for bulk writes: one `executemany` for the whole batch.
+    `owners` maps object ids to user ids when the rows belong to different users.
+    """
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    owners = owners or {}
+    rows = [(resource, object_id, action, owners.get(object_id, user_id), now) for object_id in object_ids]
+    if not rows:
+        return
+    table = connection.ops.quote_name(ChangeLogEntry._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} (resource, object_id, action, user_id, created_at) VALUES (%s, %s, %s, %s, %s)',
+            rows,
+        )
+
+
+def head():
+    """Newest settled token; a fresh client stores this before loading its lists."""
+    settled = ChangeLogEntry.objects.filter(created_at__lte=_settled_before())
+    return settled.aggregate(head=Max('id'))['head'] or 0
+
+
+def changes_since(since, user_id=None, limit=DEFAULT_LIMIT):
+    """
+    Everything visible to `user_id` that changed after token `since`.
+
+    Several entries for one object collapse into its latest state: a current
+    payload, or a tombstone if it is gone. Returns `(next_token, has_more,
+    changes)` where `changes` maps resource to `{'upserted', 'deleted'}`.
+    """
+    oldest = ChangeLogEntry.objects.aggregate(oldest=Min('id'))['oldest']
+    if since and oldest is not None and since < oldest - 1:
+        raise TokenExpired()
+
+    ceiling = head()
+    visible = Q(user_id__isnull=True)
+    if user_id is not None:
+        visible |= Q(user_id=user_id)
+    entries = list(
+        ChangeLogEntry.objects.filter(visible, id__gt=since, id__lte=ceiling)
+        .order_by('id')
+        .values_list('id', 'resource', 'object_id', 'action')[: limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    next_token = entries[-1][0] if has_more else max(ceiling, since)
+
+    latest = {}
+    for _, resource, object_id, action in entries:
+        if resource in _registry:
+            latest[(resource, object_id)] = action
+
+    changes = {}
+    for resource in _registry:
+        touched = [(oid, action) for (kind, oid), action in latest.items() if kind == resource]
+        live = [oid for oid, action in touched if action != ChangeLogEntry.ACTION_DELETED]
+        deleted = [oid for oid, action in touched if action == ChangeLogEntry.ACTION_DELETED]
+        payloads = _registry[resource]['render'](live) if live else {}
+        # Rows deleted after the ceiling have no payload yet; tombstone them now.
+        deleted.extend(oid for oid in live if oid not in payloads)
+        if payloads or deleted:
+            changes[resource] = {
+                'upserted': [payloads[oid] for oid in live if oid in payloads],
+                'deleted': sorted(deleted),
+            }
+    return next_token, has_more, changes
+
+
+def prune(days):
+    """
+    Drop entries older than `days`; returns the number removed. The newest
+    entry is always kept so tokens older than the log can be recognised.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    newest = ChangeLogEntry.objects.aggregate(newest=Max('id'))['newest'] or 0
+    deleted, _ = ChangeLogEntry.objects.filter(created_at__lt=cutoff, id__lt=newest).delete()
+    return deleted
+
+
+def _settled_before():
+    seconds = getattr(settings, 'CHANGE_FEED_SETTLE_SECONDS', DEFAULT_SETTLE_SECONDS)
+    return timezone.now() - timedelta(seconds=seconds)
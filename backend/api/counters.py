@@ -0,0 +1,142 @@
+from django.db.models import Case as SqlCase, Count, F, IntegerField, Max, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.signals import post_delete
+
+from .changes import record, record_many
+from .models import Case, ChangeLogEntry, Tip
+
+# Counter bumps rewrite the case row behind `save()`'s back, so each one also
+# logs the case for the sync feed.
+
+
+def tip_created(case_id):
+    Case.objects.filter(id=case_id).update(tip_count=F('tip_count') + 1)
+    record('cases', case_id)
+
+
+def tips_created(counts):
+    """Bulk `tip_created`: `counts` maps case id to new tips."""
+    _increment_many('tip_count', counts)
+
+
+def tip_verified(case_id, count=1):
+    Case.objects.filter(id=case_id).update(verified_tip_count=F('verified_tip_count') + count)
+    record('cases', case_id)
+
+
+def tips_verified(counts):
+    """Bulk `tip_verified`: `counts` maps case id to newly verified tips."""
+    _increment_many('verified_tip_count', counts)
+
+
+def _increment_many(field, counts):
+    """Add a different amount to `field` on each case, all in one UPDATE."""
+    if not counts:
+        return
+    increment = SqlCase(
+        *[When(id=case_id, then=Value(count)) for case_id, count in counts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    Case.objects.filter(id__in=list(counts)).update(**{field: F(field) + increment})
+    record_many('cases', list(counts), action=ChangeLogEntry.ACTION_UPDATED)
+
+
+def report_created(case_id, created_at, pending=True):
+    Case.objects.filter(id=case_id).update(
+        report_count=F('report_count') + 1,
+        pending_report_count=F('pending_report_count') + (1 if pending else 0),
+        last_sighting_at=Greatest(Coalesce(F('last_sighting_at'), Value(created_at)), Value(created_at)),
+    )
+    record('cases', case_id)
+
+
+def report_status_changed(case_id, old_pending, new_pending):
+    if old_pending == new_pending:
+        return
+    delta = 1 if new_pending else -1
+    Case.objects.filter(id=case_id).update(pending_report_count=F('pending_report_count') + delta)
+    record('cases', case_id)
+
+
+def _latest_report():
+    from public_reports.models import PublicReport
+
+    return (
+        PublicReport.objects.filter(missing_case_id=OuterRef('pk'))
+        .order_by()
+        .values('missing_case_id')
+        .annotate(latest=Max('created_at'))
+        .values('latest')
+    )
+
+
+def _cascaded_from_case(origin):
+    # Deleting a case deletes its tips and reports as well; its counters go with it.
+    return isinstance(origin, Case) or getattr(origin, 'model', None) is Case
+
+
+def _decrement(field, count):
+    return Greatest(F(field) - count, Value(0))
+
+
+def on_tip_deleted(sender, instance, origin=None, **kwargs):
+    if _cascaded_from_case(origin):
+        return
+    Case.objects.filter(id=instance.case_id).update(
+        tip_count=_decrement('tip_count', 1),
+        verified_tip_count=_decrement('verified_tip_count', 1 if instance.verified else 0),
+    )
+    record('cases', instance.case_id)
+
+
+def on_report_deleted(sender, instance, origin=None, **kwargs):
+    from public_reports.models import PublicReport
+
+    if _cascaded_from_case(origin):
+        return
+    pending = instance.status == PublicReport.STATUS_PENDING
+    Case.objects.filter(id=instance.missing_case_id).update(
+        report_count=_decrement('report_count', 1),
+        pending_report_count=_decrement('pending_report_count', 1 if pending else 0),
+        last_sighting_at=Subquery(_latest_report()),
+    )
+    record('cases', instance.missing_case_id)
+
+
+def connect():
+    from public_reports.models import PublicReport
+
+    post_delete.connect(on_tip_deleted, sender=Tip, dispatch_uid='case-counters-tip-delete')
+    post_delete.connect(on_report_deleted, sender=PublicReport, dispatch_uid='case-counters-report-delete')
+
+
+def recompute(batch_size=1000):
+    """
+    Recompute every case's counters from the source tables, one set-based
+    UPDATE per batch of case ids. Returns the number of cases processed.
+    """
+    from public_reports.models import PublicReport
+
+    def count_of(queryset):
+        counted = queryset.order_by().values('case_ref').annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+    tips = Tip.objects.filter(case_id=OuterRef('pk')).annotate(case_ref=F('case_id'))
+    reports = PublicReport.objects.filter(missing_case_id=OuterRef('pk')).annotate(case_ref=F('missing_case_id'))
+
+    processed = 0
+    last_id = 0
+    while True:
+        ids = list(Case.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return processed
+        Case.objects.filter(id__in=ids).update(
+            tip_count=count_of(tips),
+            verified_tip_count=count_of(tips.filter(verified=True)),
+            report_count=count_of(reports),
+            pending_report_count=count_of(reports.filter(status=PublicReport.STATUS_PENDING)),
+            last_sighting_at=Subquery(_latest_report()),
+        )
+        processed += len(ids)
+        last_id = ids[-1]
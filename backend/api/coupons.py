@@ -0,0 +1,75 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from . import changes, stats
+from .models import ChangeLogEntry, UserCoupon
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+
+def expire_due(now=None, batch_size=DEFAULT_BATCH_SIZE, pause=0):
+    """
+    Move Active coupons whose `expiry_date` is at or before `now` to Expired.
+
+    Each batch reads up to `batch_size` due ids from the `(status,
+    expiry_date)` index and flips them with one UPDATE in its own short
+    transaction, so locks are held for a single batch and an interrupted
+    sweep simply resumes on the next run. `pause` seconds between batches
+    leave room for replication on very large backlogs. Returns the number of
+    coupons expired.
+    """
+    now = now or timezone.now()
+    due = UserCoupon.objects.filter(status=UserCoupon.STATUS_ACTIVE, expiry_date__lte=now).order_by('expiry_date')
+    expired = 0
+    while True:
+        owners = dict(due.values_list('id', 'user_id')[:batch_size])
+        if not owners:
+            return expired
+        with transaction.atomic():
+            # Re-check the status: a coupon used since the read must stay Used.
+            expired += UserCoupon.objects.filter(id__in=owners, status=UserCoupon.STATUS_ACTIVE).update(
+                status=UserCoupon.STATUS_EXPIRED
+            )
+            changes.record_many('coupons', owners, action=ChangeLogEntry.ACTION_UPDATED, owners=owners)
+            stats.invalidate()
+        if pause:
+            time.sleep(pause)
+
+
+def start_sweeper(interval=None):
+    """
+    Run `expire_due()` every `interval` seconds (default
+    `COUPON_SWEEP_SECONDS`) on a daemon thread. Does nothing when the
+    interval is 0 or a sweeper is already running in this process.
+    """
+    global _sweeper
+    interval = interval if interval is not None else getattr(settings, 'COUPON_SWEEP_SECONDS', 0)
+    if not interval:
+        return None
+    with _sweeper_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(target=_sweep_forever, args=(interval,), name='coupon-sweeper', daemon=True)
+            _sweeper.start()
+        return _sweeper
+
+
+def _sweep_forever(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            expire_due()
+        except Exception:
+            # Retried next interval; logged so a sweeper that keeps failing is noticed.
+            logger.exception('coupon sweep failed')
+        finally:
+            close_old_connections()
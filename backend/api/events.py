@@ -0,0 +1,196 @@
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+HEARTBEAT_SECONDS = 15
+SUBSCRIBER_BUFFER = 256
+
+
+class Subscription:
+    """
+    One client's view of the event stream: a bounded buffer of matching events.
+
+    Consumers either block on `get()` (sync/WSGI) or `await aget()` (ASGI);
+    publishers wake both kinds without holding a lock across the wait. A slow
+    consumer loses its oldest events rather than growing without bound.
+    """
+
+    def __init__(self, broker, topics):
+        self.broker = broker
+        self.topics = tuple(topics)
+        self._events = deque(maxlen=SUBSCRIBER_BUFFER)
+        self._condition = threading.Condition()
+        self._waiters = set()
+        self.closed = False
+
+    def matches(self, topics):
+        if not self.topics:
+            return True
+        return any(
+            topic == wanted or topic.startswith(f'{wanted}.')
+            for topic in topics
+            for wanted in self.topics
+        )
+
+    def push(self, event):
+        with self._condition:
+            self._events.append(event)
+            self._condition.notify_all()
+            waiters = list(self._waiters)
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def get(self, timeout=None):
+        with self._condition:
+            if not self._events:
+                self._condition.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+    async def aget(self, timeout=None):
+        with self._condition:
+            if self._events:
+                return self._events.popleft()
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                self._waiters.discard(waiter)
+        with self._condition:
+            return self._events.popleft() if self._events else None
+
+    def close(self):
+        self.closed = True
+        self.broker.unsubscribe(self)
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class InMemoryBroker:
+    """
+    Single-process stand-in broker: fan-out to subscriptions held in memory.
+
+    Enough for one box (one ASGI process serving every stream). Deployments
+    with several processes should point EVENTS_BROKER at a shared broker that
+    implements the same `publish`/`subscribe`/`unsubscribe` interface.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._ids = itertools.count(1)
+
+    def publish(self, event_type, data, topics):
+        event = {
+            'id': next(self._ids),
+            'type': event_type,
+            'topics': list(topics),
+            'data': data,
+            'sent_at': timezone.now().isoformat(),
+        }
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if subscription.matches(event['topics']):
+                subscription.push(event)
+        return event
+
+    def subscribe(self, topics):
+        subscription = Subscription(self, topics)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'EVENTS_BROKER', 'api.events.InMemoryBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+def publish(event_type, data, topics):
+    """Publish once the surrounding transaction commits, so clients never see rolled-back writes."""
+    transaction.on_commit(lambda: get_broker().publish(event_type, data, topics))
+
+
+def format_sse(event):
+    payload = json.dumps(event, separators=(',', ':'), default=str)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+
+def stream(subscription):
+    """Blocking SSE iterator for WSGI servers; holds a worker thread per client."""
+    try:
+        yield ': connected\n\n'
+        while True:
+            event = subscription.get(timeout=HEARTBEAT_SECONDS)
+            yield format_sse(event) if event else ': keepalive\n\n'
+    finally:
+        subscription.close()
+
+
+async def astream(subscription):
+    """SSE iterator for ASGI servers; an idle client costs one parked coroutine."""
+    try:
+        yield ': connected\n\n'
+        while True:
+            event = await subscription.aget(timeout=HEARTBEAT_SECONDS)
+            yield format_sse(event) if event else ': keepalive\n\n'
+    finally:
+        subscription.close()
+
+
+# Event payload helpers, so every publisher describes a resource the same way.
+
+def case_event(event_type, case):
+    publish(
+        event_type,
+        {'id': case.id, 'name': case.name, 'status': case.status, 'urgency': case.urgency},
+        [f'cases.{case.id}'],
+    )
+
+
+def tip_event(event_type, tip):
+    publish(
+        event_type,
+        {'id': tip.id, 'caseId': tip.case_id, 'verified': tip.verified},
+        [f'tips.{tip.id}', f'cases.{tip.case_id}.tips'],
+    )
+
+
+def report_event(event_type, report):
+    publish(
+        event_type,
+        {'id': report.id, 'missing_case_id': report.missing_case_id, 'status': report.status},
+        [f'reports.{report.id}', f'cases.{report.missing_case_id}.reports'],
+    )
+
+
+def score_event(user_id, score, medals):
+    publish('user.score_changed', {'id': user_id, 'score': score, 'medals': medals}, [f'users.{user_id}'])
@@ -0,0 +1,128 @@
+from datetime import datetime, time
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import Case, UserCoupon
+
+# Sort key -> (keyset column, descending). Every column has a `(column, id)` index.
+CASE_SORT_KEYS = {
+    'created_at': ('created_at', False),
+    '-created_at': ('created_at', True),
+    'updated_at': ('updated_at', False),
+    '-updated_at': ('updated_at', True),
+    'age': ('age', False),
+    '-age': ('age', True),
+}
+DEFAULT_CASE_SORT = '-created_at'
+
+
+def filter_cases(queryset, params):
+    """
+    Apply the case-list query parameters and return `(queryset, sort)`.
+
+    Supported parameters: `status` and `urgency` (repeatable or comma
+    separated), `min_age`/`max_age`, `created_after`/`created_before`,
+    `updated_after`/`updated_before`, `user_id` and `sort` (one of
+    CASE_SORT_KEYS). Invalid values raise a 400 ValidationError.
+    """
+    statuses = _choice_set(params, 'status', Case.STATUS_CHOICES)
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+
+    urgencies = _choice_set(params, 'urgency', Case.URGENCY_CHOICES)
+    if urgencies:
+        queryset = queryset.filter(urgency__in=urgencies)
+
+    min_age = _int_param(params, 'min_age')
+    if min_age is not None:
+        queryset = queryset.filter(age__gte=min_age)
+    max_age = _int_param(params, 'max_age')
+    if max_age is not None:
+        queryset = queryset.filter(age__lte=max_age)
+
+    for field in ('created', 'updated'):
+        after = parse_datetime_param(params, f'{field}_after')
+        if after is not None:
+            queryset = queryset.filter(**{f'{field}_at__gte': after})
+        before = parse_datetime_param(params, f'{field}_before', end_of_day=True)
+        if before is not None:
+            queryset = queryset.filter(**{f'{field}_at__lte': before})
+
+    user_id = _int_param(params, 'user_id')
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+
+    sort = params.get('sort') or DEFAULT_CASE_SORT
+    if sort not in CASE_SORT_KEYS:
+        raise ValidationError({'sort': f'Must be one of {sorted(CASE_SORT_KEYS)}.'})
+    return queryset, CASE_SORT_KEYS[sort]
+
+
+def filter_coupons(queryset, params, now=None):
+    """
+    Apply the coupon-list query parameters: `status` (repeatable or comma
+    separated) and `expires_before`/`expires_after`. Active coupons past
+    their `expiry_date` count as Expired even before the sweeper reaches them.
+    """
+    now = now or timezone.now()
+    statuses = _choice_set(params, 'status', UserCoupon.STATUS_CHOICES)
+    if statuses:
+        lapsed = Q(status=UserCoupon.STATUS_ACTIVE, expiry_date__lte=now)
+        wanted = Q(status__in=[value for value in statuses if value != UserCoupon.STATUS_ACTIVE])
+        if UserCoupon.STATUS_ACTIVE in statuses:
+            wanted |= Q(status=UserCoupon.STATUS_ACTIVE) & ~lapsed
+        if UserCoupon.STATUS_EXPIRED in statuses:
+            wanted |= lapsed
+        queryset = queryset.filter(wanted)
+
+    after = parse_datetime_param(params, 'expires_after')
+    if after is not None:
+        queryset = queryset.filter(expiry_date__gte=after)
+    before = parse_datetime_param(params, 'expires_before', end_of_day=True)
+    if before is not None:
+        queryset = queryset.filter(expiry_date__lte=before)
+    return queryset
+
+
+def _choice_set(params, name, choices):
+    values = []
+    for raw in params.getlist(name):
+        values.extend(part.strip() for part in raw.split(',') if part.strip())
+
+    allowed = {choice[0].lower(): choice[0] for choice in choices}
+    unknown = [value for value in values if value.lower() not in allowed]
+    if unknown:
+        raise ValidationError({name: f'Unknown values {unknown}. Must be in {list(allowed.values())}.'})
+    return sorted({allowed[value.lower()] for value in values})
+
+
+def _int_param(params, name):
+    raw = params.get(name)
+    if raw in (None, ''):
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise ValidationError({name: 'Must be an integer.'})
+
+
+def parse_datetime_param(params, name, end_of_day=False):
+    raw = params.get(name)
+    if not raw:
+        return None
+
+    try:
+        value = parse_datetime(raw)
+        day = parse_date(raw) if value is None else None
+    except ValueError:
+        value = day = None
+    if value is None:
+        if day is None:
+            raise ValidationError({name: 'Must be an ISO 8601 date or datetime.'})
+        value = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
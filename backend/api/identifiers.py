@@ -0,0 +1,143 @@
+import re
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save
+
+from .models import LoginIdentifier
+
+# Accounts registered with only a phone number get `<phone>@phone.local` as their email.
+PHONE_EMAIL_DOMAIN = '@phone.local'
+PHONE_RE = re.compile(r'\+?[\d\s().-]+')
+# Kinds in the order login tries them when one string matches several accounts.
+PRECEDENCE = (LoginIdentifier.KIND_USERNAME, LoginIdentifier.KIND_EMAIL, LoginIdentifier.KIND_PHONE)
+
+
+def normalize(kind, value):
+    value = (value or '').strip()
+    if kind == LoginIdentifier.KIND_PHONE:
+        return re.sub(r'\D', '', value)
+    return value.lower()
+
+
+def identifiers_for(user):
+    """`{(kind, value)}` a user can log in with."""
+    wanted = {(LoginIdentifier.KIND_USERNAME, normalize(LoginIdentifier.KIND_USERNAME, user.username))}
+    email = normalize(LoginIdentifier.KIND_EMAIL, user.email)
+    if email:
+        wanted.add((LoginIdentifier.KIND_EMAIL, email))
+        if email.endswith(PHONE_EMAIL_DOMAIN):
+            phone = normalize(LoginIdentifier.KIND_PHONE, email[: -len(PHONE_EMAIL_DOMAIN)])
+            if phone:
+                wanted.add((LoginIdentifier.KIND_PHONE, phone))
+    return {(kind, value) for kind, value in wanted if value}
+
+
+def taken(username='', email=''):
+    """Which of `username`/`email` another account already uses, in one indexed query."""
+    lookup = Q(kind=LoginIdentifier.KIND_USERNAME, value=normalize(LoginIdentifier.KIND_USERNAME, username))
+    if email:
+        lookup |= Q(kind=LoginIdentifier.KIND_EMAIL, value=normalize(LoginIdentifier.KIND_EMAIL, email))
+    return set(LoginIdentifier.objects.filter(lookup).values_list('kind', flat=True))
+
+
+def resolve(identifier):
+    """The account whose username, email or phone is `identifier`, or None. One query."""
+    lookup = Q(kind=LoginIdentifier.KIND_USERNAME, value=normalize(LoginIdentifier.KIND_USERNAME, identifier))
+    lookup |= Q(kind=LoginIdentifier.KIND_EMAIL, value=normalize(LoginIdentifier.KIND_EMAIL, identifier))
+    if PHONE_RE.fullmatch(identifier.strip()):
+        lookup |= Q(kind=LoginIdentifier.KIND_PHONE, value=normalize(LoginIdentifier.KIND_PHONE, identifier))
+    matches = LoginIdentifier.objects.filter(lookup).select_related('user__honour_profile')
+    matches = sorted(matches, key=lambda match: PRECEDENCE.index(match.kind))
+    return matches[0].user if matches else None
+
+
+def authenticate(identifier, password):
+    """
+    Resolve `identifier` and check `password` against that one account, so a
+    login costs one lookup and exactly one password hash whether or not it
+    succeeds.
+    """
+    user = resolve(identifier)
+    if user is None:
+        # Hash anyway, so unknown identifiers take as long as wrong passwords.
+        User().set_password(password)
+        return None
+    if user.check_password(password) and user.is_active:
+        return user
+    return None
+
+
+def sync(user, created=False):
+    """
+    Bring the user's identifiers in line with their username and email. New
+    accounts claim theirs strictly (a clash raises IntegrityError, rolling
+    back the signup); for existing accounts an identifier another account
+    already holds is skipped. Returns the number skipped.
+    """
+    wanted = identifiers_for(user)
+    if created:
+        LoginIdentifier.objects.bulk_create(
+            [LoginIdentifier(user=user, kind=kind, value=value) for kind, value in wanted]
+        )
+        return 0
+
+    current = set(user.login_identifiers.values_list('kind', 'value'))
+    stale = current - wanted
+    if stale:
+        lookup = Q()
+        for kind, value in stale:
+            lookup |= Q(kind=kind, value=value)
+        user.login_identifiers.filter(lookup).delete()
+    skipped = 0
+    for kind, value in wanted - current:
+        try:
+            with transaction.atomic():
+                LoginIdentifier.objects.create(user=user, kind=kind, value=value)
+        except IntegrityError:
+            skipped += 1
+    return skipped
+
+
+def on_user_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    # Password rehashes and last_login updates leave the identifiers alone.
+    if raw or (update_fields is not None and not {'username', 'email'} & set(update_fields)):
+        return
+    sync(instance, created=created)
+
+
+def connect():
+    post_save.connect(on_user_saved, sender=User, dispatch_uid='login-identifiers-user-save')
+
+
+def backfill(batch_size=1000):
+    """
+    Create the missing identifiers of every account, `batch_size` users at a
+    time. Identifiers already held by another account are left with their
+    owner. Returns `(created, conflicts)`.
+    """
+    created = 0
+    conflicts = 0
+    last_id = 0
+    while True:
+        users = list(User.objects.filter(id__gt=last_id).order_by('id').only('id', 'username', 'email')[:batch_size])
+        if not users:
+            return created, conflicts
+        last_id = users[-1].id
+
+        wanted = {}
+        for user in users:
+            for key in identifiers_for(user):
+                # Two accounts in one batch may share an identifier; the older keeps it.
+                if wanted.setdefault(key, user.id) != user.id:
+                    conflicts += 1
+        existing = LoginIdentifier.objects.filter(value__in={value for _, value in wanted})
+        for kind, value, owner in existing.values_list('kind', 'value', 'user_id'):
+            if wanted.pop((kind, value), owner) != owner:
+                conflicts += 1
+        LoginIdentifier.objects.bulk_create(
+            [LoginIdentifier(user_id=user_id, kind=kind, value=value) for (kind, value), user_id in wanted.items()],
+            ignore_conflicts=True,
+        )
+        created += len(wanted)
@@ -0,0 +1,341 @@
+import codecs
+import csv
+import io
+import json
+import uuid
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db import DatabaseError, connections, transaction
+
+from . import changes, counters, events, search, stats
+from .models import Case, Tip
+
+FORMATS = ('ndjson', 'csv')
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+TRUE_VALUES = frozenset(['1', 'true', 'yes', 'y', 't'])
+FALSE_VALUES = frozenset(['', '0', 'false', 'no', 'n', 'f'])
+
+
+def detect_format(name):
+    """Map a file name or content type to 'ndjson'/'csv', or None."""
+    name = (name or '').lower()
+    if 'csv' in name:
+        return 'csv'
+    if any(marker in name for marker in ('ndjson', 'jsonl', 'json-seq', 'json')):
+        return 'ndjson'
+    return None
+
+
+def read_rows(stream, fmt):
+    """
+    Yield `(line, row, error)` from a binary or text stream without reading
+    it into memory; exactly one of `row` and `error` is set.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f'Unsupported format: {fmt}')
+    # Request bodies, uploads and binary files all iterate line by line as bytes.
+    if not isinstance(stream, io.TextIOBase):
+        stream = codecs.iterdecode(stream, 'utf-8-sig', errors='replace')
+
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, {'row': f'Invalid JSON: {exc}'}
+            continue
+        if isinstance(row, dict):
+            yield line_number, row, None
+        else:
+            yield line_number, None, {'row': 'Each line must be a JSON object.'}
+
+
+class _Cleaner:
+    """Field-by-field coercion of one raw row, collecting every error."""
+
+    def __init__(self, row):
+        self.row = row
+        self.errors = {}
+
+    def _raw(self, key):
+        value = self.row.get(key)
+        if isinstance(value, str):
+            value = value.strip()
+        return None if value in (None, '') else value
+
+    def text(self, key, max_length=None, required=False, default=''):
+        value = self._raw(key)
+        if value is None:
+            if required:
+                self.errors[key] = 'This field is required.'
+            return default
+        value = str(value)
+        if max_length and len(value) > max_length:
+            self.errors[key] = f'Ensure this field has no more than {max_length} characters.'
+        return value
+
+    def integer(self, key, default=None, minimum=None, maximum=None, required=False):
+        value = self._raw(key)
+        if value is None:
+            if required:
+                self.errors[key] = 'This field is required.'
+            return default
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            self.errors[key] = 'A valid integer is required.'
+            return default
+        if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+            self.errors[key] = f'Ensure this value is between {minimum} and {maximum}.'
+        return value
+
+    def boolean(self, key, default=False):
+        value = self.row.get(key)
+        if value is None or isinstance(value, bool):
+            return default if value is None else value
+        value = str(value).strip().lower()
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+        self.errors[key] = 'Must be a valid boolean.'
+        return default
+
+    def choice(self, key, choices, default):
+        value = self._raw(key)
+        if value is None:
+            return default
+        # Lists and objects from NDJSON are not hashable, let alone a choice.
+        if not isinstance(value, str) or value not in choices:
+            self.errors[key] = f'"{value}" is not a valid choice.'
+        return value
+
+    def user_ref(self):
+        """`userId` or `username`, resolved later for the whole chunk at once."""
+        if self._raw('userId') is not None:
+            return ('id', self.integer('userId'))
+        username = self._raw('username')
+        return ('username', str(username)) if username is not None else None
+
+
+class CaseImporter:
+    kind = 'cases'
+    model = Case
+    doc_type = 'case'
+
+    columns = frozenset(['name', 'age', 'location', 'description', 'reliability', 'urgency', 'status', 'user_id'])
+    statuses = frozenset(value for value, _ in Case.STATUS_CHOICES)
+    urgencies = frozenset(value for value, _ in Case.URGENCY_CHOICES)
+
+    def clean(self, row):
+        cleaner = _Cleaner(row)
+        fields = {
+            'name': cleaner.text('name', max_length=255, required=True),
+            'age': cleaner.integer('age', default=0, minimum=0, maximum=32767),
+            'location': cleaner.text('location', max_length=255, required=True),
+            'description': cleaner.text('description'),
+            'reliability': cleaner.integer('reliability', default=50, minimum=0, maximum=100),
+            'urgency': cleaner.choice('urgency', self.urgencies, Case.URGENCY_MEDIUM),
+            'status': cleaner.choice('status', self.statuses, Case.STATUS_PENDING),
+        }
+        return fields, {'user': cleaner.user_ref()}, cleaner.errors
+
+    def build(self, fields, refs):
+        return Case(user_id=refs['user'], **fields)
+
+    def after_insert(self, objects):
+        pass
+
+
+class TipImporter:
+    kind = 'tips'
+    model = Tip
+    doc_type = 'tip'
+    columns = frozenset(['reporter', 'content', 'is_anonymous', 'share_location', 'case_id', 'user_id'])
+
+    def clean(self, row):
+        cleaner = _Cleaner(row)
+        fields = {
+            'reporter': cleaner.text('reporter', max_length=120, default='Anonymous'),
+            'content': cleaner.text('content', required=True),
+            'is_anonymous': cleaner.boolean('isAnonymous'),
+            'share_location': cleaner.boolean('shareLocation'),
+        }
+        refs = {'user': cleaner.user_ref(), 'case': cleaner.integer('caseId', required=True)}
+        return fields, refs, cleaner.errors
+
+    def build(self, fields, refs):
+        return Tip(case_id=refs['case'], user_id=refs['user'], **fields)
+
+    def after_insert(self, objects):
+        counters.tips_created(Counter(tip.case_id for tip in objects))
+
+
+IMPORTERS = {importer.kind: importer for importer in (CaseImporter(), TipImporter())}
+
+
+class ImportReport:
+    def __init__(self, kind):
+        self.kind = kind
+        self.received = 0
+        self.created = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'kind': self.kind,
+            'received': self.received,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': sorted(self.errors, key=lambda error: error['line']),
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+
+def import_stream(kind, stream, fmt, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate and insert rows of `kind` ('cases' or 'tips') from `stream`.
+
+    Rows are handled `chunk_size` at a time: coerce each row, resolve every
+    user and case reference of the chunk with one query per kind, then insert
+    the valid rows with one `executemany` in a transaction together with their
+    search postings, sync-feed entries and counters. Invalid rows are reported
+    by line number and never abort the rest of the import.
+    """
+    importer = IMPORTERS[kind]
+    report = ImportReport(kind)
+    chunk = []
+    for line, row, error in read_rows(stream, fmt):
+        report.received += 1
+        if error:
+            report.fail(line, error)
+            continue
+        chunk.append((line, row))
+        if len(chunk) >= chunk_size:
+            _import_chunk(importer, chunk, report)
+            chunk = []
+    if chunk:
+        _import_chunk(importer, chunk, report)
+
+    if report.created:
+        events.publish('import.completed', {'kind': kind, 'created': report.created}, ['imports'])
+    return report.as_dict()
+
+
+def _import_chunk(importer, chunk, report):
+    cleaned = []
+    for line, row in chunk:
+        fields, refs, errors = importer.clean(row)
+        if errors:
+            report.fail(line, errors)
+        else:
+            cleaned.append((line, fields, refs))
+
+    users = _resolve_users([refs['user'] for _, _, refs in cleaned if refs['user']])
+    case_ids = {refs['case'] for _, _, refs in cleaned if refs.get('case') is not None}
+    known_cases = set(Case.objects.filter(id__in=case_ids).values_list('id', flat=True)) if case_ids else set()
+
+    lines = []
+    objects = []
+    for line, fields, refs in cleaned:
+        errors = {}
+        if refs['user']:
+            refs['user'] = users.get(refs['user'])
+            if refs['user'] is None:
+                errors['user'] = 'User does not exist.'
+        if 'case' in refs and refs['case'] not in known_cases:
+            errors['caseId'] = 'Case does not exist.'
+        if errors:
+            report.fail(line, errors)
+            continue
+        lines.append(line)
+        objects.append(importer.build(fields, refs))
+
+    if not objects:
+        return
+    try:
+        with transaction.atomic():
+            _bulk_insert(importer.model, objects, importer.columns)
+            search.index_new_documents(importer.doc_type, objects)
+            changes.record_many(importer.kind, [obj.pk for obj in objects])
+            importer.after_insert(objects)
+            stats.invalidate()
+    except DatabaseError as exc:
+        for line in lines:
+            report.fail(line, {'row': f'Database error: {exc}'})
+        return
+    report.created += len(objects)
+
+
+def _resolve_users(refs):
+    """`{('id', 5): 5, ('username', 'ana'): 7}` for the references that exist."""
+    ids = {value for kind, value in refs if kind == 'id'}
+    usernames = {value for kind, value in refs if kind == 'username'}
+    resolved = {}
+    if ids:
+        resolved.update((('id', pk), pk) for pk in User.objects.filter(id__in=ids).values_list('id', flat=True))
+    if usernames:
+        resolved.update(
+            (('username', username), pk)
+            for username, pk in User.objects.filter(username__in=usernames).values_list('username', 'id')
+        )
+    return resolved
+
+
+def _bulk_insert(model, objects, varying):
+    """
+    Insert `objects` with one `executemany` (which the MySQL driver sends as
+    multi-row INSERTs) and give each its id.
+
+    Only the `varying` fields (the attnames the importer fills) are prepared
+    for every row; the others hold defaults or the chunk's timestamp and are
+    prepared once. MySQL returns no ids from a multi-row INSERT, and with the
+    default innodb_autoinc_lock_mode=2 concurrent inserts interleave their
+    ids, so no id range identifies the chunk: every row is tagged with an
+    `import_key` and the ids are read back by tag.
+    """
+    db = connections[model.objects.db]
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    per_row = [field for field in fields if field.attname in varying or field.attname == 'import_key']
+    first = objects[0]
+    shared = {
+        field: field.get_db_prep_save(field.pre_save(first, True), db) for field in fields if field not in per_row
+    }
+    stamps = {
+        field.attname: getattr(first, field.attname)
+        for field in shared
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    }
+    columns = list(shared) + per_row
+    constant = list(shared.values())
+    rows = []
+    for obj in objects:
+        obj.import_key = uuid.uuid4()
+        obj.__dict__.update(stamps)
+        rows.append(constant + [field.get_db_prep_save(getattr(obj, field.attname), db) for field in per_row])
+
+    table = db.ops.quote_name(model._meta.db_table)
+    names = ', '.join(db.ops.quote_name(field.column) for field in columns)
+    with db.cursor() as cursor:
+        cursor.executemany(f'INSERT INTO {table} ({names}) VALUES ({", ".join(["%s"] * len(columns))})', rows)
+    ids = dict(model.objects.filter(import_key__in=[obj.import_key for obj in objects]).values_list('import_key', 'id'))
+    for obj in objects:
+        obj.pk = ids[obj.import_key]
+        obj._state.adding = False
+        obj._state.db = db.alias
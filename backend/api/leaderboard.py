@@ -0,0 +1,186 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+
+from .models import HonourProfile
+from .serializers import user_display_name
+
+MIN_CAPACITY = 1024
+# Other processes' score changes reach this process's index on the next rebuild.
+DEFAULT_RESYNC_SECONDS = 60
+
+
+class RankIndex:
+    """
+    Fenwick tree of how many profiles hold each score.
+
+    Answers "how many profiles score above s" and "which score sits at
+    leaderboard position p" in O(log max_score), however many profiles there
+    are, and absorbs a score change with two O(log max_score) updates.
+    """
+
+    def __init__(self, counts=()):
+        counts = dict(counts)
+        self.capacity = MIN_CAPACITY
+        while self.capacity <= max(counts, default=0):
+            self.capacity *= 2
+        self.tree = [0] * (self.capacity + 1)
+        self.total = 0
+        for score, count in counts.items():
+            self.add(score, count)
+
+    def add(self, score, delta):
+        if score >= self.capacity:
+            self._grow(score)
+        self.total += delta
+        index = score + 1
+        while index <= self.capacity:
+            self.tree[index] += delta
+            index += index & -index
+
+    def count_at_most(self, score):
+        index = min(score, self.capacity - 1) + 1
+        count = 0
+        while index > 0:
+            count += self.tree[index]
+            index -= index & -index
+        return count
+
+    def count_above(self, score):
+        return self.total - self.count_at_most(score)
+
+    def score_at(self, position):
+        """Score of the profile at 1-based `position`, counting from the top."""
+        if not 1 <= position <= self.total:
+            return None
+        # The wanted score is the k-th smallest; descend the tree bit by bit.
+        remaining = self.total - position + 1
+        index = 0
+        step = self.capacity
+        while step:
+            if index + step <= self.capacity and self.tree[index + step] < remaining:
+                index += step
+                remaining -= self.tree[index]
+            step //= 2
+        return index
+
+    def _grow(self, score):
+        # Doubling a power-of-two Fenwick tree keeps every existing node; the
+        # only new non-zero node is the root, which covers everything so far.
+        while self.capacity <= score:
+            self.tree.extend([0] * self.capacity)
+            self.tree[2 * self.capacity] = self.tree[self.capacity]
+            self.capacity *= 2
+
+
+_index = None
+_built_at = 0.0
+_lock = threading.Lock()
+
+
+def get_index():
+    global _index, _built_at
+    resync = getattr(settings, 'LEADERBOARD_RESYNC_SECONDS', DEFAULT_RESYNC_SECONDS)
+    with _lock:
+        if _index is None or time.monotonic() - _built_at > resync:
+            counts = HonourProfile.objects.order_by().values_list('score').annotate(total=Count('id'))
+            _index = RankIndex(counts)
+            _built_at = time.monotonic()
+        return _index
+
+
+def invalidate():
+    global _index
+    with _lock:
+        _index = None
+
+
+def score_changed(old, new):
+    """Move one profile from `old` to `new` (None = absent) once the transaction commits."""
+
+    def apply():
+        with _lock:
+            if _index is None:
+                return
+            if old is not None:
+                _index.add(old, -1)
+            if new is not None:
+                _index.add(new, 1)
+
+    transaction.on_commit(apply)
+
+
+def on_profile_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        score_changed(None, instance.score)
+
+
+def on_profile_deleted(sender, instance, **kwargs):
+    score_changed(instance.score, None)
+
+
+def connect():
+    post_save.connect(on_profile_saved, sender=HonourProfile, dispatch_uid='leaderboard-profile-save')
+    post_delete.connect(on_profile_deleted, sender=HonourProfile, dispatch_uid='leaderboard-profile-delete')
+
+
+def _entries(queryset):
+    rows = queryset.annotate(name=user_display_name()).values('user_id', 'name', 'score', 'medals')
+    return [
+        {'id': row['user_id'], 'name': row['name'], 'score': row['score'], 'medals': row['medals']}
+        for row in rows
+    ]
+
+
+def _ranked(entries, index):
+    for entry in entries:
+        entry['rank'] = index.count_above(entry['score']) + 1
+    return entries
+
+
+def page(start=1, limit=20):
+    """
+    `limit` profiles from leaderboard position `start`, ordered by score then
+    user id. The index turns the position into a score, so the query seeks
+    straight to it and only skips rows that tie on that score.
+    """
+    index = get_index()
+    score = index.score_at(start)
+    if score is None:
+        return index.total, []
+    skip = max(start - 1 - index.count_above(score), 0)
+    queryset = HonourProfile.objects.filter(score__lte=score).order_by('-score', 'user_id')
+    entries = _ranked(_entries(queryset[skip : skip + limit]), index)
+    for position, entry in enumerate(entries, start=start):
+        entry['position'] = position
+    return index.total, entries
+
+
+def around(user_id, neighbours=5):
+    """A user's entry plus up to `neighbours` entries either side, or None."""
+    me = HonourProfile.objects.filter(user_id=user_id)
+    mine = _entries(me)
+    if not mine:
+        return None
+    entry = mine[0]
+    score = entry['score']
+    index = get_index()
+
+    ahead = Q(score__gt=score) | Q(score=score, user_id__lt=user_id)
+    behind = Q(score__lt=score) | Q(score=score, user_id__gt=user_id)
+    above = _entries(HonourProfile.objects.filter(ahead).order_by('score', '-user_id')[:neighbours])
+    below = _entries(HonourProfile.objects.filter(behind).order_by('-score', 'user_id')[:neighbours])
+    ties_ahead = HonourProfile.objects.filter(score=score, user_id__lt=user_id).count()
+
+    entry['rank'] = index.count_above(score) + 1
+    entry['position'] = entry['rank'] + ties_ahead
+    return {
+        'total': index.total,
+        'user': entry,
+        'above': _ranked(list(reversed(above)), index),
+        'below': _ranked(below, index),
+    }
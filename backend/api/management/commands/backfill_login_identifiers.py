@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from api import identifiers
+
+
+class Command(BaseCommand):
+    help = 'Create the normalized login identifiers (username, email, phone) that existing accounts are missing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created, conflicts = identifiers.backfill(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Created {created} login identifiers.'))
+        if conflicts:
+            self.stdout.write(
+                self.style.WARNING(f'{conflicts} identifiers are shared by several accounts; the older one keeps each.')
+            )
@@ -0,0 +1,69 @@
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from api.views import login
+
+
+class Command(BaseCommand):
+    help = 'Measure the CPU time and queries of one login request for each kind of identifier'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Login requests per scenario')
+
+    def handle(self, *args, **options):
+        requests = options['requests']
+        tag = uuid.uuid4().hex[:10]
+        phone = str(int(tag, 16))[:10]
+        password = uuid.uuid4().hex
+        # Committed fixtures, so the numbers include a real index lookup.
+        user = User.objects.create_user(username=f'bench-{tag}', email=f'{phone}@phone.local', password=password)
+        try:
+            started = time.process_time()
+            for _ in range(requests):
+                make_password(password)
+            hash_ms = (time.process_time() - started) * 1000 / requests
+            self.stdout.write(f'one password hash: {hash_ms:.1f} ms CPU')
+
+            scenarios = [
+                ('username', {'username': user.username.upper(), 'password': password}, 200),
+                ('email', {'email': user.email, 'password': password}, 200),
+                ('phone', {'phone': phone, 'password': password}, 200),
+                ('wrong password', {'phone': phone, 'password': 'wrong'}, 401),
+                ('unknown account', {'username': f'nobody-{tag}', 'password': password}, 401),
+            ]
+            factory = RequestFactory()
+            # Without an 'auth' rate AuthThrottle lets every request through; the
+            # benchmark measures the login, and 20/min would answer most with 429.
+            rates = {
+                scope: rate
+                for scope, rate in settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {}).items()
+                if scope != 'auth'
+            }
+            with override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=rates)):
+                for label, body, expected in scenarios:
+                    self._measure(factory, label, body, expected, requests, hash_ms)
+            self.stdout.write(self.style.SUCCESS('Done.'))
+        finally:
+            user.delete()
+
+    def _measure(self, factory, label, body, expected, requests, hash_ms):
+        payload = json.dumps(body)
+        started = time.process_time()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                response = login(factory.post('/api/login', payload, content_type='application/json'))
+                if response.status_code != expected:
+                    raise CommandError(f'{label}: got {response.status_code}, expected {expected}.')
+        cpu_ms = (time.process_time() - started) * 1000 / requests
+        self.stdout.write(
+            f'{label:>16}: {cpu_ms:6.1f} ms CPU/request (~{cpu_ms / hash_ms:.1f} hashes), '
+            f'{len(queries) / requests:.1f} queries/request'
+        )
@@ -0,0 +1,76 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+from api import points
+from api.models import HonourProfile, PointsTransaction
+
+
+class Command(BaseCommand):
+    help = 'Award points to one user from many threads and check that no award is lost or doubled'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--awards', type=int, default=200, help='Awards per thread')
+        parser.add_argument(
+            '--duplicates',
+            type=int,
+            default=2,
+            help='How many threads replay each source event (only the first may count)',
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stderr.write('SQLite serializes writers; run this against MySQL for meaningful numbers.')
+
+        threads = options['threads']
+        awards = options['awards']
+        duplicates = max(1, options['duplicates'])
+        # Committed fixtures: the worker threads use their own connections.
+        user = User.objects.create_user(username=f'bench-{uuid.uuid4().hex[:12]}')
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(
+                    pool.map(lambda worker: self._worker(user.id, worker, awards, duplicates), range(threads))
+                )
+            elapsed = time.perf_counter() - started
+
+            retries = sum(results)
+            unique_events = len({(worker // duplicates, index) for worker in range(threads) for index in range(awards)})
+            score = HonourProfile.objects.get(user=user).score
+            ledger = points.balance(user.id)
+            self.stdout.write(
+                f'{threads * awards} award calls ({unique_events} distinct events) in {elapsed:.2f}s '
+                f'-> {threads * awards / elapsed:.0f}/s, {retries} retried on lock errors'
+            )
+            self.stdout.write(f'score={score} ledger={ledger} expected={unique_events}')
+            if score != unique_events or ledger != unique_events:
+                raise CommandError('Lost or duplicated points.')
+            self.stdout.write(self.style.SUCCESS('No lost or duplicated awards.'))
+        finally:
+            PointsTransaction.objects.filter(user=user).delete()
+            user.delete()
+
+    def _worker(self, user_id, worker, awards, duplicates):
+        # Threads `worker // duplicates` share source keys, so replays race each other.
+        group = worker // duplicates
+        retries = 0
+        try:
+            for index in range(awards):
+                while True:
+                    try:
+                        points.award(
+                            user_id, 1, PointsTransaction.REASON_ADJUSTMENT, source_key=f'bench:{group}:{index}'
+                        )
+                        break
+                    except OperationalError:
+                        retries += 1
+                        time.sleep(0.001)
+        finally:
+            close_old_connections()
+            connection.close()
+        return retries
@@ -0,0 +1,83 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections, connection
+from api import redemptions
+from api.models import HonourProfile, Reward, RewardRedemption
+
+
+class Command(BaseCommand):
+    help = 'Request one reward from many threads against a single balance and check that nothing is overspent'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=50, help='Redemption requests per thread')
+        parser.add_argument('--balance', type=int, default=1000)
+        parser.add_argument('--cost', type=int, default=30)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stderr.write('SQLite serializes writers; run this against MySQL for meaningful numbers.')
+
+        threads = options['threads']
+        requests = options['requests']
+        balance = options['balance']
+        cost = options['cost']
+        if cost <= 0:
+            raise CommandError('--cost must be positive.')
+
+        # Committed fixtures: the worker threads use their own connections.
+        user = User.objects.create_user(username=f'bench-{uuid.uuid4().hex[:12]}')
+        HonourProfile.objects.create(user=user, score=balance)
+        reward = Reward.objects.create(name=f'Bench reward {user.username}', points_required=cost, is_active=False)
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as pool:
+                results = list(pool.map(lambda worker: self._worker(user, reward, requests), range(threads)))
+            elapsed = time.perf_counter() - started
+
+            granted = sum(granted for granted, _ in results)
+            retries = sum(retried for _, retried in results)
+            expected = min(balance // cost, threads * requests)
+            profile = HonourProfile.objects.get(user=user)
+            pending = RewardRedemption.objects.filter(user=user).count()
+            self.stdout.write(
+                f'{threads * requests} requests in {elapsed:.2f}s -> {threads * requests / elapsed:.0f}/s, '
+                f'{retries} retried on lock errors'
+            )
+            self.stdout.write(
+                f'granted={granted} rows={pending} expected={expected} '
+                f'reserved={profile.reserved_points} score={profile.score}'
+            )
+            if granted != expected or pending != expected or profile.reserved_points != expected * cost:
+                raise CommandError('Reservations do not match the balance.')
+            if profile.reserved_points > profile.score:
+                raise CommandError('Points were overspent.')
+            self.stdout.write(self.style.SUCCESS('No overspent or lost reservations.'))
+        finally:
+            RewardRedemption.objects.filter(user=user).delete()
+            reward.delete()
+            user.delete()
+
+    def _worker(self, user, reward, requests):
+        granted = 0
+        retries = 0
+        try:
+            for _ in range(requests):
+                while True:
+                    try:
+                        redemptions.request(user.id, reward)
+                        granted += 1
+                        break
+                    except redemptions.InsufficientPoints:
+                        break
+                    except OperationalError:
+                        retries += 1
+                        time.sleep(0.001)
+        finally:
+            close_old_connections()
+            connection.close()
+        return granted, retries
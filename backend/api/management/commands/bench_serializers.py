@@ -0,0 +1,103 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from api.models import Case, Tip, Reward, RewardRedemption
+from api.serializers import (
+    CaseReadSerializer,
+    CaseSerializer,
+    RewardRedemptionReadSerializer,
+    RewardRedemptionSerializer,
+    TipReadSerializer,
+    TipSerializer,
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Compare per-row cost of the ModelSerializers and the values() read fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        repeat = options['repeat']
+
+        # Fixture rows live in a transaction that is always rolled back.
+        try:
+            with transaction.atomic():
+                self._seed(rows)
+                self._report('Case', Case.objects.all(), CaseSerializer, CaseReadSerializer, rows, repeat)
+                self._report('Tip', Tip.objects.all(), TipSerializer, TipReadSerializer, rows, repeat)
+                self._report(
+                    'RewardRedemption',
+                    RewardRedemption.objects.all(),
+                    RewardRedemptionSerializer,
+                    RewardRedemptionReadSerializer,
+                    rows,
+                    repeat,
+                )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, rows):
+        # bulk_create does not return primary keys on MySQL, so re-read the rows.
+        User.objects.bulk_create(
+            [User(username=f'bench_user_{index}', first_name='Bench', last_name=str(index)) for index in range(50)]
+        )
+        users = list(User.objects.filter(username__startswith='bench_user_'))
+        Case.objects.bulk_create(
+            [
+                Case(name=f'Bench case {index}', location='Bench', user=users[index % len(users)])
+                for index in range(rows)
+            ]
+        )
+        cases = list(Case.objects.filter(name__startswith='Bench case '))
+        Tip.objects.bulk_create(
+            [
+                Tip(case=cases[index % len(cases)], user=users[index % len(users)], content='Bench tip')
+                for index in range(rows)
+            ]
+        )
+        reward = Reward.objects.create(name='Bench reward', points_required=1)
+        RewardRedemption.objects.bulk_create(
+            [RewardRedemption(reward=reward, user=users[index % len(users)]) for index in range(rows)]
+        )
+
+    def _report(self, label, queryset, model_serializer, read_serializer, rows, repeat):
+        model_time, model_queries, model_data = self._measure(
+            lambda: model_serializer(queryset[:rows], many=True).data, repeat
+        )
+        fast_time, fast_queries, fast_data = self._measure(
+            lambda: read_serializer.render(read_serializer.values(queryset[:rows])), repeat
+        )
+
+        identical = [dict(row) for row in model_data] == fast_data
+        self.stdout.write(
+            f'{label:<17} ModelSerializer {model_time / rows * 1e6:8.1f} us/row {model_queries:5d} queries | '
+            f'fast path {fast_time / rows * 1e6:8.1f} us/row {fast_queries:5d} queries | '
+            f'{model_time / fast_time:5.1f}x | identical={identical}'
+        )
+
+    def _measure(self, render, repeat):
+        best = None
+        for _ in range(repeat):
+            queries = []
+
+            def count_query(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            with connection.execute_wrapper(count_query):
+                started = time.perf_counter()
+                data = render()
+                elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, len(queries), data
@@ -0,0 +1,54 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from api import blobs, changes
+
+
+class Command(BaseCommand):
+    help = 'Move uploads stored before content addressing into shared blobs and remove the duplicate originals'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-originals', action='store_true', help='Leave the old files on disk')
+
+    def handle(self, *args, **options):
+        moved = 0
+        missing = 0
+        digests = set()
+        originals = set()
+        for model, field, resource in blobs.tracked():
+            storage = model._meta.get_field(field).storage
+            rows = (
+                model.objects.exclude(**{field: ''})
+                .exclude(**{f'{field}__isnull': True})
+                .exclude(**{f'{field}__startswith': blobs.PREFIX + '/'})
+                .values_list('id', field)
+            )
+            for pk, name in rows.iterator():
+                if not storage.exists(name):
+                    missing += 1
+                    continue
+                with storage.open(name, 'rb') as original:
+                    blob = storage.save(name, File(original))
+                with transaction.atomic():
+                    if not model.objects.filter(pk=pk, **{field: name}).update(**{field: blob}):
+                        # The row changed meanwhile; give the reference back.
+                        storage.delete(blob)
+                        continue
+                    changes.record(resource, pk)
+                moved += 1
+                digests.add(blob)
+                originals.add((storage, name))
+
+        removed = 0
+        if not options['keep_originals']:
+            for storage, name in originals:
+                if not any(model.objects.filter(**{field: name}).exists() for model, field, _ in blobs.tracked()):
+                    storage.delete(name)
+                    removed += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Moved {moved} files into {len(digests)} blobs; removed {removed} originals.')
+        )
+        if missing:
+            self.stdout.write(self.style.WARNING(f'{missing} rows point at files that no longer exist.'))
+        if moved:
+            self.stdout.write('Run generate_renditions to re-render the moved images from their blobs.')
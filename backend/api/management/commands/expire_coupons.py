@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from api import coupons
+
+
+class Command(BaseCommand):
+    help = 'Mark Active coupons past their expiry date as Expired, in short batched transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=coupons.DEFAULT_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        expired = coupons.expire_due(batch_size=options['batch_size'], pause=options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Expired {expired} coupons.'))
@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from api import renditions
+from api.models import Case, Tip
+from public_reports.models import PublicReport
+
+KINDS = {'cases': (Case, 'photo'), 'tips': (Tip, 'attachment'), 'reports': (PublicReport, 'image')}
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnail and medium copies of uploaded images that have none yet (or all of them with --force)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(KINDS), action='append', help='Defaults to every kind')
+        parser.add_argument('--force', action='store_true', help='Re-render images that already have renditions')
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        force = options['force']
+        for kind in options['kind'] or sorted(KINDS):
+            model, field = KINDS[kind]
+            images = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+            ids = list(images.values_list('id', flat=True))
+            with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+                results = list(pool.map(lambda pk: self._render(model, pk, force), ids))
+            rendered = sum(1 for result in results if result == 'rendered')
+            failed = sum(1 for result in results if result == 'failed')
+            self.stdout.write(self.style.SUCCESS(f'{kind}: rendered {rendered} of {len(ids)} images.'))
+            if failed:
+                self.stdout.write(self.style.WARNING(f'{kind}: {failed} images could not be read.'))
+
+    def _render(self, model, pk, force):
+        try:
+            return 'rendered' if renditions.generate(model, pk, force=force) else 'skipped'
+        except Exception as exc:
+            self.stderr.write(f'{model._meta.label} #{pk}: {exc}')
+            return 'failed'
+        finally:
+            close_old_connections()
@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from api import importer
+
+
+class Command(BaseCommand):
+    help = 'Stream an NDJSON or CSV dump of cases or tips into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(importer.IMPORTERS))
+        parser.add_argument('path', help="File to import, or '-' for stdin")
+        parser.add_argument('--format', choices=importer.FORMATS)
+        parser.add_argument('--chunk-size', type=int, default=importer.DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or importer.detect_format(path)
+        if fmt is None:
+            raise CommandError('Cannot tell the format from the file name; pass --format.')
+
+        stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        try:
+            result = importer.import_stream(options['kind'], stream, fmt, chunk_size=options['chunk_size'])
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        for error in result['errors']:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        if result['errors_truncated']:
+            self.stderr.write(f"... {result['failed'] - len(result['errors'])} more rows failed")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {result['created']} of {result['received']} {options['kind']} ({result['failed']} failed)."
+            )
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api import points
+
+
+class Command(BaseCommand):
+    help = 'Rebuild every honour profile score from the points ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        processed = points.materialize(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt scores for {processed} profiles.'))
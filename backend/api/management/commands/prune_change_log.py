@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api import changes
+
+
+class Command(BaseCommand):
+    help = 'Delete sync change-log entries older than the retention window'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+
+    def handle(self, *args, **options):
+        deleted = changes.prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} change-log entries.'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from api import uploads
+
+
+class Command(BaseCommand):
+    help = 'Delete resumable upload sessions idle past UPLOAD_SESSION_TTL_SECONDS, with their partial files'
+
+    def handle(self, *args, **options):
+        purged = uploads.purge()
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} upload sessions.'))
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+from api import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for cases, tips and public reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('types', nargs='*', help='Document types to rebuild (default: all)')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        doc_types = options['types'] or search.registered_types()
+        unknown = set(doc_types) - set(search.registered_types())
+        if unknown:
+            raise CommandError(f'Unknown document type(s): {", ".join(sorted(unknown))}')
+
+        for doc_type in doc_types:
+            indexed = search.rebuild(doc_type, batch_size=options['batch_size'])
+            self.stdout.write(f'{doc_type}: indexed {indexed} documents')
+
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt successfully.'))
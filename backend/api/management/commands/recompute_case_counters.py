@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from api import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized tip/report counters and last sighting time on every case'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        processed = counters.recompute(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Recomputed counters for {processed} cases.'))
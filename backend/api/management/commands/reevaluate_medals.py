@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from api import medals
+from api.models import MedalRule
+
+
+class Command(BaseCommand):
+    help = 'Recount medal metrics and re-apply medal rules to every user with set-based queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rule', action='append', default=[], help='Rule name (repeatable); default: all')
+        parser.add_argument('--revoke', action='store_true', help='Also remove medals that no longer qualify')
+        parser.add_argument('--skip-recount', action='store_true', help='Trust the stored tip/sighting counters')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rule_ids = None
+        if options['rule']:
+            rule_ids = list(MedalRule.objects.filter(name__in=options['rule']).values_list('id', flat=True))
+            if len(rule_ids) != len(set(options['rule'])):
+                raise CommandError('Unknown medal rule name.')
+
+        if not options['skip_recount']:
+            medals.recount(batch_size=options['batch_size'])
+        granted, revoked = medals.reevaluate(
+            rule_ids=rule_ids,
+            revoke=options['revoke'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Granted {granted} and revoked {revoked} medals.'))
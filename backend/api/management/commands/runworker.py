@@ -0,0 +1,57 @@
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+from api import tasks
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (api.tasks) until stopped with SIGINT/SIGTERM'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help='Tasks run at the same time by this process')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds to wait when the queue is empty')
+        parser.add_argument(
+            '--lease',
+            type=int,
+            default=tasks.DEFAULT_LEASE_SECONDS,
+            help='Seconds a claimed task is held before another worker may take it over',
+        )
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        self.stopping = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.stopping.set())
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        threads = [
+            threading.Thread(target=self._loop, args=(f'{prefix}:{index}', options), name=f'worker-{index}')
+            for index in range(max(1, options['concurrency']))
+        ]
+        self.processed = 0
+        self._count_lock = threading.Lock()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped after {self.processed} tasks.'))
+
+    def _loop(self, worker, options):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                found = tasks.work(worker, lease=options['lease'])
+                with self._count_lock:
+                    self.processed += found
+                if not found:
+                    if options['once']:
+                        return
+                    # Finishes the running task, then stops at the next poll.
+                    self.stopping.wait(options['poll'])
+        finally:
+            connection.close()
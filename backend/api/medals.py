@@ -0,0 +1,179 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from . import changes, events
+from .models import HonourProfile, MedalRule, Tip, UserMedal
+
+RULES_CACHE_KEY = 'api:medal-rules'
+# With a per-process cache, other workers see a rule change once their copy expires.
+RULES_CACHE_TIMEOUT = 60
+
+
+def active_rules():
+    """Active rules as plain dicts, cached until a rule is saved or deleted, or for a minute at most."""
+    rules = cache.get(RULES_CACHE_KEY)
+    if rules is None:
+        rules = list(MedalRule.objects.filter(is_active=True).values('id', 'name', 'metric', 'threshold'))
+        cache.set(RULES_CACHE_KEY, rules, RULES_CACHE_TIMEOUT)
+    return rules
+
+
+def invalidate_rules(**kwargs):
+    transaction.on_commit(lambda: cache.delete(RULES_CACHE_KEY))
+
+
+def connect():
+    post_save.connect(invalidate_rules, sender=MedalRule, dispatch_uid='medal-rules-save')
+    post_delete.connect(invalidate_rules, sender=MedalRule, dispatch_uid='medal-rules-delete')
+
+
+def crossed(user_id, metric, old, new):
+    """
+    Grant the rules on `metric` whose threshold lies in `(old, new]`.
+
+    Returns the user's refreshed medal names, or None when no threshold was
+    crossed, which is almost always; that path costs no queries at all.
+    """
+    rules = [rule for rule in active_rules() if rule['metric'] == metric and old < rule['threshold'] <= new]
+    if not rules:
+        return None
+    UserMedal.objects.bulk_create(
+        [UserMedal(user_id=user_id, rule_id=rule['id']) for rule in rules],
+        ignore_conflicts=True,
+    )
+    return sync_names([user_id]).get(user_id, [])
+
+
+def bump(user_id, metric, delta=1):
+    bump_many(metric, {user_id: delta})
+
+
+def bump_many(metric, deltas):
+    """
+    Add `deltas[user_id]` to each user's counter for `metric` with an `F()`
+    increment and grant whatever medals the new value crosses.
+    """
+    field = MedalRule.METRIC_FIELDS[metric]
+    for user_id, delta in deltas.items():
+        if not delta:
+            continue
+        profiles = HonourProfile.objects.filter(user_id=user_id)
+        if not profiles.update(**{field: F(field) + delta}):
+            try:
+                with transaction.atomic():
+                    HonourProfile.objects.create(user_id=user_id, **{field: max(delta, 0)})
+            except IntegrityError:
+                profiles.update(**{field: F(field) + delta})
+        value, score = profiles.values_list(field, 'score').get()
+        names = crossed(user_id, metric, value - delta, value)
+        if names is not None:
+            events.score_event(user_id, score, names)
+
+
+def sync_names(user_ids):
+    """
+    Rewrite `HonourProfile.medals` for `user_ids` from their UserMedal rows,
+    touching only the profiles whose list actually changed.
+    """
+    names = defaultdict(list)
+    awards = (
+        UserMedal.objects.filter(user_id__in=user_ids)
+        .order_by('awarded_at', 'rule_id')
+        .values_list('user_id', 'rule__name')
+    )
+    for user_id, name in awards:
+        names[user_id].append(name)
+
+    changed = []
+    for profile in HonourProfile.objects.filter(user_id__in=user_ids).only('id', 'user_id', 'medals'):
+        if profile.medals != names[profile.user_id]:
+            profile.medals = names[profile.user_id]
+            changed.append(profile)
+    if changed:
+        HonourProfile.objects.bulk_update(changed, ['medals'])
+        for profile in changed:
+            changes.record('profile', profile.id, user_id=profile.user_id)
+    return {user_id: names[user_id] for user_id in user_ids}
+
+
+def recount(batch_size=1000):
+    """Recompute the verified-tip and accepted-sighting counters from the source tables."""
+    from public_reports.models import PublicReport
+
+    def count_of(queryset):
+        counted = queryset.order_by().values('owner').annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+    tips = Tip.objects.filter(user_id=OuterRef('user_id'), verified=True).annotate(owner=F('user_id'))
+    reports = PublicReport.objects.filter(
+        reporter_user_id=OuterRef('user_id'),
+        status=PublicReport.STATUS_ACCEPTED,
+    ).annotate(owner=F('reporter_user_id'))
+
+    last_id = 0
+    while True:
+        ids = list(
+            HonourProfile.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return
+        HonourProfile.objects.filter(id__in=ids).update(
+            verified_tip_count=count_of(tips),
+            accepted_report_count=count_of(reports),
+        )
+        last_id = ids[-1]
+
+
+def reevaluate(rule_ids=None, revoke=False, batch_size=1000):
+    """
+    Bring UserMedal in line with the rules using set-based statements: one
+    INSERT ... SELECT per rule grants every qualifying profile at once, and
+    with `revoke` one DELETE drops awards that no longer qualify (or belong
+    to inactive rules). Only the users whose medals changed have their
+    display list rewritten. Returns `(granted, revoked)`.
+    """
+    rules = MedalRule.objects.filter(is_active=True)
+    if rule_ids:
+        rules = rules.filter(id__in=rule_ids)
+    rules = list(rules)
+
+    stamp = timezone.now()
+    medal_table = connection.ops.quote_name(UserMedal._meta.db_table)
+    profile_table = connection.ops.quote_name(HonourProfile._meta.db_table)
+    granted = 0
+    revoked = 0
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            for rule in rules:
+                column = connection.ops.quote_name(MedalRule.METRIC_FIELDS[rule.metric])
+                cursor.execute(
+                    f'INSERT INTO {medal_table} (user_id, rule_id, awarded_at) '
+                    f'SELECT p.user_id, %s, %s FROM {profile_table} p '
+                    f'WHERE p.{column} >= %s AND NOT EXISTS ('
+                    f'SELECT 1 FROM {medal_table} m WHERE m.user_id = p.user_id AND m.rule_id = %s)',
+                    [rule.id, connection.ops.adapt_datetimefield_value(stamp), rule.threshold, rule.id],
+                )
+                granted += max(cursor.rowcount, 0)
+        affected = set(UserMedal.objects.filter(awarded_at=stamp).values_list('user_id', flat=True))
+
+        if revoke:
+            stale = Q(rule__is_active=False)
+            for rule in rules:
+                field = MedalRule.METRIC_FIELDS[rule.metric]
+                stale |= Q(rule=rule, **{f'user__honour_profile__{field}__lt': rule.threshold})
+            stale_awards = UserMedal.objects.filter(stale)
+            if rule_ids:
+                stale_awards = stale_awards.filter(rule_id__in=rule_ids)
+            affected.update(stale_awards.values_list('user_id', flat=True))
+            revoked, _ = stale_awards.delete()
+
+        affected = sorted(affected)
+        for start in range(0, len(affected), batch_size):
+            sync_names(affected[start : start + batch_size])
+    return granted, revoked
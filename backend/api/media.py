@@ -0,0 +1,127 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from . import blobs
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+DEFAULT_MAX_AGE = 60 * 60
+READ_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+@require_safe
+def serve(request, path):
+    """
+    Serve a file under MEDIA_ROOT with validators, caching headers and byte
+    ranges. Content-addressed blobs never change, so they are cached for a
+    year as immutable and keep their digest as the ETag. With MEDIA_SENDFILE
+    set, the front proxy sends the body and the worker is released at once.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        info = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404('File not found.')
+    if not stat.S_ISREG(info.st_mode):
+        raise Http404('File not found.')
+
+    immutable = blobs.is_blob(path)
+    if immutable:
+        etag = f'"{os.path.splitext(os.path.basename(path))[0]}"'
+    else:
+        etag = f'"{info.st_mtime_ns:x}-{info.st_size:x}"'
+    last_modified = int(info.st_mtime)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _body(request, path, full_path, info.st_size, etag, last_modified)
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    if immutable:
+        response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response.headers['Cache-Control'] = f"public, max-age={getattr(settings, 'MEDIA_MAX_AGE', DEFAULT_MAX_AGE)}"
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+
+def _body(request, path, full_path, size, etag, last_modified):
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    sendfile = getattr(settings, 'MEDIA_SENDFILE', '')
+    if sendfile:
+        # The proxy reads the file (and answers Range itself); Django only sends headers.
+        response = HttpResponse(content_type=content_type)
+        if sendfile == 'x-accel-redirect':
+            response.headers['X-Accel-Redirect'] = getattr(settings, 'MEDIA_ACCEL_PREFIX', '/protected-media/') + path
+        else:
+            response.headers['X-Sendfile'] = full_path
+        response.headers['Accept-Ranges'] = 'bytes'
+        return response
+
+    byte_range = _range(request, size, etag, last_modified)
+    if byte_range == 'unsatisfiable':
+        response = HttpResponse(status=416)
+        response.headers['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None:
+        # FileResponse lets the WSGI server use sendfile() where it can.
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(_read(full_path, start, length), status=206, content_type=content_type)
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response.headers['Content-Length'] = str(length)
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _range(request, size, etag, last_modified):
+    """
+    `(start, end)` inclusive for a single satisfiable `Range`, None to send the
+    whole file, or 'unsatisfiable'. Multiple ranges and a stale `If-Range`
+    fall back to the whole file, as RFC 9110 allows.
+    """
+    header = request.headers.get('Range')
+    if not header:
+        return None
+    if_range = request.headers.get('If-Range')
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if last and int(last) < start:
+            return None
+    else:
+        # Suffix range: the last N bytes.
+        start = max(size - int(last), 0)
+        end = size - 1
+    if start >= size or end < start:
+        return 'unsatisfiable'
+    return start, end
+
+
+def _read(full_path, start, length):
+    with open(full_path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(READ_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_usercoupon'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['created_at', 'id'], name='case_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rewardredemption',
+            index=models.Index(fields=['requested_at', 'id'], name='redemption_requested_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tip',
+            index=models.Index(fields=['created_at', 'id'], name='tip_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usercoupon',
+            index=models.Index(fields=['user', 'issued_at', 'id'], name='coupon_user_issued_id_idx'),
+        ),
+    ]
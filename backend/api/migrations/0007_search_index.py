@@ -0,0 +1,30 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_case_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('doc_type', models.CharField(max_length=16)),
+                ('doc_id', models.BigIntegerField()),
+                ('weight', models.PositiveIntegerField(default=1)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['doc_type', 'doc_id'], name='search_posting_doc_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchposting',
+            constraint=models.UniqueConstraint(fields=('term', 'doc_type', 'doc_id'), name='unique_search_posting'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='last_sighting_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='pending_report_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='report_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='tip_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='verified_tip_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:38
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def open_balances(apps, schema_editor):
+    # Seed the ledger with today's scores so rebuilding from it keeps them.
+    HonourProfile = apps.get_model('api', 'HonourProfile')
+    PointsTransaction = apps.get_model('api', 'PointsTransaction')
+    profiles = HonourProfile.objects.filter(score__gt=0).values_list('user_id', 'score')
+    PointsTransaction.objects.bulk_create(
+        [
+            PointsTransaction(
+                user_id=user_id,
+                amount=score,
+                reason='opening_balance',
+                source_key=f'opening:{user_id}',
+            )
+            for user_id, score in profiles.iterator(chunk_size=2000)
+        ],
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0009_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PointsTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.IntegerField()),
+                ('reason', models.CharField(choices=[('tip_verified', 'Tip verified'), ('report_accepted', 'Sighting accepted'), ('redemption', 'Reward redemption'), ('adjustment', 'Manual adjustment'), ('opening_balance', 'Opening balance')], max_length=32)),
+                ('source_key', models.CharField(blank=True, max_length=64, null=True, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='points_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'created_at'], name='points_user_created_idx')],
+            },
+        ),
+        migrations.RunPython(open_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_points_ledger'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='honourprofile',
+            index=models.Index(fields=['-score', 'user'], name='honour_score_rank_idx'),
+        ),
+    ]
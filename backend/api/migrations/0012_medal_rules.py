@@ -0,0 +1,91 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:41
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def seed_bronze_rule(apps, schema_editor):
+    # The medal that used to be hard-coded, plus awards for everyone who holds it.
+    HonourProfile = apps.get_model('api', 'HonourProfile')
+    MedalRule = apps.get_model('api', 'MedalRule')
+    UserMedal = apps.get_model('api', 'UserMedal')
+    rule = MedalRule.objects.create(name='Bronze Rescuer', metric='score', threshold=100)
+    holders = [
+        user_id
+        for user_id, medals in HonourProfile.objects.exclude(medals=[]).values_list('user_id', 'medals')
+        if 'Bronze Rescuer' in (medals or [])
+    ]
+    UserMedal.objects.bulk_create([UserMedal(user_id=user_id, rule=rule) for user_id in holders], batch_size=2000)
+
+
+def backfill_counters(apps, schema_editor):
+    # Verified tips and accepted sightings per user, as the new counters track them.
+    HonourProfile = apps.get_model('api', 'HonourProfile')
+    Tip = apps.get_model('api', 'Tip')
+    PublicReport = apps.get_model('public_reports', 'PublicReport')
+
+    def count_of(queryset, owner):
+        counted = queryset.order_by().values(owner).annotate(total=Count('id')).values('total')
+        return Coalesce(Subquery(counted, output_field=IntegerField()), Value(0))
+
+    HonourProfile.objects.update(
+        verified_tip_count=count_of(Tip.objects.filter(user_id=OuterRef('user_id'), verified=True), 'user_id'),
+        accepted_report_count=count_of(
+            PublicReport.objects.filter(reporter_user_id=OuterRef('user_id'), status='Accepted'),
+            'reporter_user_id',
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0011_leaderboard_index'),
+        ('public_reports', '0002_reporter_user_points_awarded'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MedalRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('metric', models.CharField(choices=[('score', 'Honour score'), ('verified_tips', 'Verified tips'), ('accepted_sightings', 'Accepted sightings')], max_length=32)),
+                ('threshold', models.PositiveIntegerField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['metric', 'threshold'],
+            },
+        ),
+        migrations.AddField(
+            model_name='honourprofile',
+            name='accepted_report_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='honourprofile',
+            name='verified_tip_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='UserMedal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('awarded_at', models.DateTimeField(auto_now_add=True)),
+                ('rule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='awards', to='api.medalrule')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='medal_awards', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='usermedal',
+            constraint=models.UniqueConstraint(fields=('user', 'rule'), name='unique_user_medal'),
+        ),
+        migrations.RunPython(seed_bronze_rule, migrations.RunPython.noop),
+    ]
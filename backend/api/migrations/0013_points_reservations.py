@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_medal_rules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='honourprofile',
+            name='reserved_points',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='rewardredemption',
+            name='reserved_points',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_points_reservations'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usercoupon',
+            index=models.Index(fields=['status', 'expiry_date'], name='coupon_status_expiry_idx'),
+        ),
+    ]
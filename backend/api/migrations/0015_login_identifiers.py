@@ -0,0 +1,52 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import re
+
+
+def claim_existing(apps, schema_editor):
+    # Same normalization as api.identifiers; the older account keeps a shared identifier.
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    LoginIdentifier = apps.get_model('api', 'LoginIdentifier')
+    claimed = set()
+    rows = []
+    for user_id, username, email in User.objects.order_by('id').values_list('id', 'username', 'email').iterator(2000):
+        email = (email or '').strip().lower()
+        wanted = [('username', (username or '').strip().lower()), ('email', email)]
+        if email.endswith('@phone.local'):
+            wanted.append(('phone', re.sub(r'\D', '', email[: -len('@phone.local')])))
+        for kind, value in wanted:
+            if value and (kind, value) not in claimed:
+                claimed.add((kind, value))
+                rows.append(LoginIdentifier(user_id=user_id, kind=kind, value=value))
+        if len(rows) >= 2000:
+            LoginIdentifier.objects.bulk_create(rows)
+            rows = []
+    LoginIdentifier.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0014_coupon_expiry_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoginIdentifier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('username', 'Username'), ('email', 'Email'), ('phone', 'Phone')], max_length=8)),
+                ('value', models.CharField(max_length=254)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='login_identifiers', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='loginidentifier',
+            constraint=models.UniqueConstraint(fields=('kind', 'value'), name='unique_login_identifier'),
+        ),
+        migrations.RunPython(claim_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:58
+
+import api.blobs
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_image_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('references', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='case',
+            name='photo',
+            field=models.ImageField(blank=True, null=True, storage=api.blobs.media_storage, upload_to='cases/'),
+        ),
+        migrations.AlterField(
+            model_name='tip',
+            name='attachment',
+            field=models.ImageField(blank=True, null=True, storage=api.blobs.media_storage, upload_to='tips/'),
+        ),
+    ]
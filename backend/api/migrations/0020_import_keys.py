@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_task_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='import_key',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='tip',
+            name='import_key',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
@@ -1,5 +1,8 @@
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
+from .blobs import media_storage
 
 
 class Case(models.Model):
@@ -32,7 +35,9 @@ class Case(models.Model):
     reliability = models.PositiveSmallIntegerField(default=50)
     urgency = models.CharField(max_length=16, choices=URGENCY_CHOICES, default=URGENCY_MEDIUM)
     status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING)
-    photo = models.ImageField(upload_to='cases/', null=True, blank=True)
+    photo = models.ImageField(upload_to='cases/', storage=media_storage, null=True, blank=True)
+    # Resized copies of `photo`, written by api.renditions.
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     user = models.ForeignKey(
         User,
         on_delete=models.SET_NULL,
@@ -40,11 +45,27 @@ class Case(models.Model):
         blank=True,
         related_name='cases',
     )
+    # Tags bulk-imported rows so api.importer can find their ids again on MySQL.
+    import_key = models.UUIDField(null=True, blank=True, unique=True, editable=False)
+    # Denormalized activity counters, maintained by api.counters.
+    tip_count = models.PositiveIntegerField(default=0)
+    verified_tip_count = models.PositiveIntegerField(default=0)
+    report_count = models.PositiveIntegerField(default=0)
+    pending_report_count = models.PositiveIntegerField(default=0)
+    last_sighting_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='case_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='case_updated_id_idx'),
+            models.Index(fields=['age', 'id'], name='case_age_id_idx'),
+            models.Index(fields=['status', 'urgency', 'created_at'], name='case_status_urgency_idx'),
+            models.Index(fields=['status', 'created_at'], name='case_status_created_idx'),
+            models.Index(fields=['user', 'created_at'], name='case_user_created_idx'),
+        ]
 
     def __str__(self):
         return f'{self.name} ({self.status})'
@@ -64,11 +85,17 @@ class Tip(models.Model):
     is_anonymous = models.BooleanField(default=False)
     share_location = models.BooleanField(default=False)
     verified = models.BooleanField(default=False)
-    attachment = models.ImageField(upload_to='tips/', null=True, blank=True)
+    attachment = models.ImageField(upload_to='tips/', storage=media_storage, null=True, blank=True)
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
+    # Tags bulk-imported rows so api.importer can find their ids again on MySQL.
+    import_key = models.UUIDField(null=True, blank=True, unique=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='tip_created_id_idx'),
+        ]
 
     def __str__(self):
         return f'Tip #{self.pk} for case #{self.case_id}'
@@ -77,12 +104,104 @@ class Tip(models.Model):
 class HonourProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='honour_profile')
     score = models.PositiveIntegerField(default=0)
+    # Display copy of the user's UserMedal names; rewritten only when they change.
     medals = models.JSONField(default=list, blank=True)
+    # Points held by pending redemptions; spendable balance is score - reserved_points.
+    reserved_points = models.PositiveIntegerField(default=0)
+    verified_tip_count = models.PositiveIntegerField(default=0)
+    accepted_report_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', 'user'], name='honour_score_rank_idx'),
+        ]
 
     def __str__(self):
         return f'{self.user.username} ({self.score})'
 
 
+class MedalRule(models.Model):
+    METRIC_SCORE = 'score'
+    METRIC_VERIFIED_TIPS = 'verified_tips'
+    METRIC_ACCEPTED_SIGHTINGS = 'accepted_sightings'
+
+    METRIC_CHOICES = [
+        (METRIC_SCORE, 'Honour score'),
+        (METRIC_VERIFIED_TIPS, 'Verified tips'),
+        (METRIC_ACCEPTED_SIGHTINGS, 'Accepted sightings'),
+    ]
+
+    # The HonourProfile column each metric is read from.
+    METRIC_FIELDS = {
+        METRIC_SCORE: 'score',
+        METRIC_VERIFIED_TIPS: 'verified_tip_count',
+        METRIC_ACCEPTED_SIGHTINGS: 'accepted_report_count',
+    }
+
+    name = models.CharField(max_length=100, unique=True)
+    metric = models.CharField(max_length=32, choices=METRIC_CHOICES)
+    threshold = models.PositiveIntegerField()
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['metric', 'threshold']
+
+    def __str__(self):
+        return f'{self.name} ({self.metric} >= {self.threshold})'
+
+
+class UserMedal(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='medal_awards')
+    rule = models.ForeignKey(MedalRule, on_delete=models.CASCADE, related_name='awards')
+    awarded_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'rule'], name='unique_user_medal'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id}: {self.rule_id}'
+
+
+class PointsTransaction(models.Model):
+    """
+    Append-only ledger behind `HonourProfile.score`. `source_key` names the
+    event that produced the entry (e.g. `tip:12`) and is unique, so replaying
+    an event can never award twice; manual adjustments leave it NULL.
+    """
+
+    REASON_TIP_VERIFIED = 'tip_verified'
+    REASON_REPORT_ACCEPTED = 'report_accepted'
+    REASON_REDEMPTION = 'redemption'
+    REASON_ADJUSTMENT = 'adjustment'
+    REASON_OPENING_BALANCE = 'opening_balance'
+
+    REASON_CHOICES = [
+        (REASON_TIP_VERIFIED, 'Tip verified'),
+        (REASON_REPORT_ACCEPTED, 'Sighting accepted'),
+        (REASON_REDEMPTION, 'Reward redemption'),
+        (REASON_ADJUSTMENT, 'Manual adjustment'),
+        (REASON_OPENING_BALANCE, 'Opening balance'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='points_transactions')
+    amount = models.IntegerField()
+    reason = models.CharField(max_length=32, choices=REASON_CHOICES)
+    source_key = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='points_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.amount:+d} ({self.reason})'
+
+
 class Reward(models.Model):
     name = models.CharField(max_length=200)
     description = models.TextField(blank=True)
@@ -122,9 +241,15 @@ class RewardRedemption(models.Model):
         related_name='reward_reviews',
     )
     review_notes = models.TextField(blank=True)
+    # Points held on the user's profile for this request; 0 for requests made
+    # before reservations existed.
+    reserved_points = models.PositiveIntegerField(default=0)
 
     class Meta:
         ordering = ['-requested_at']
+        indexes = [
+            models.Index(fields=['requested_at', 'id'], name='redemption_requested_id_idx'),
+        ]
 
     def __str__(self):
         return f'{self.reward.name} for {self.user.username}'
@@ -157,6 +282,183 @@ class UserCoupon(models.Model):
 
     class Meta:
         ordering = ['-issued_at']
+        indexes = [
+            models.Index(fields=['user', 'issued_at', 'id'], name='coupon_user_issued_id_idx'),
+            # Drives the expiry sweep: Active coupons in expiry order.
+            models.Index(fields=['status', 'expiry_date'], name='coupon_status_expiry_idx'),
+        ]
 
     def __str__(self):
         return f'{self.reward.name} coupon for {self.user.username} ({self.status})'
+
+
+class SearchPosting(models.Model):
+    """One term of the inverted index: `term` occurs in document `(doc_type, doc_id)`."""
+
+    term = models.CharField(max_length=64)
+    doc_type = models.CharField(max_length=16)
+    doc_id = models.BigIntegerField()
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'doc_type', 'doc_id'], name='unique_search_posting'),
+        ]
+        indexes = [
+            models.Index(fields=['doc_type', 'doc_id'], name='search_posting_doc_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.term} -> {self.doc_type}#{self.doc_id}'
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Append-only change log behind the mobile sync feed. The auto-increment id
+    is the sync token; entries are written in the same transaction as the
+    change they describe.
+    """
+
+    ACTION_CREATED = 'created'
+    ACTION_UPDATED = 'updated'
+    ACTION_DELETED = 'deleted'
+
+    ACTION_CHOICES = [
+        (ACTION_CREATED, ACTION_CREATED),
+        (ACTION_UPDATED, ACTION_UPDATED),
+        (ACTION_DELETED, ACTION_DELETED),
+    ]
+
+    resource = models.CharField(max_length=16)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=8, choices=ACTION_CHOICES)
+    # Set for per-user resources (coupons, honour profile); NULL means public.
+    user_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='changelog_created_idx'),
+        ]
+
+    def __str__(self):
+        return f'#{self.pk} {self.resource}#{self.object_id} {self.action}'
+
+
+class LoginIdentifier(models.Model):
+    """
+    Normalized username, email and phone of each account, so login resolves
+    whatever the user typed with one unique-index lookup.
+    """
+
+    KIND_USERNAME = 'username'
+    KIND_EMAIL = 'email'
+    KIND_PHONE = 'phone'
+
+    KIND_CHOICES = [
+        (KIND_USERNAME, 'Username'),
+        (KIND_EMAIL, 'Email'),
+        (KIND_PHONE, 'Phone'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='login_identifiers')
+    kind = models.CharField(max_length=8, choices=KIND_CHOICES)
+    value = models.CharField(max_length=254)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'value'], name='unique_login_identifier'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind}:{self.value}'
+
+
+class MediaBlob(models.Model):
+    """
+    One stored upload, kept once under its SHA-256 however many rows point at
+    it. `references` counts the saves that handed out `name` minus the
+    deletes that gave it back; at zero the file is removed. See api.blobs.
+    """
+
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    references = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.name} x{self.references}'
+
+
+class UploadSession(models.Model):
+    """
+    A resumable upload: the client declares the size, sends the bytes in
+    chunks at increasing offsets and completes it. The finished file is
+    then attached to a case, tip or report by id. See api.uploads.
+    """
+
+    STATUS_OPEN = 'open'
+    STATUS_COMPLETE = 'complete'
+    STATUS_CLAIMED = 'claimed'
+
+    STATUS_CHOICES = [
+        (STATUS_OPEN, STATUS_OPEN),
+        (STATUS_COMPLETE, STATUS_COMPLETE),
+        (STATUS_CLAIMED, STATUS_CLAIMED),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=STATUS_OPEN)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at'], name='upload_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.filename} {self.received}/{self.size}'
+
+
+class Task(models.Model):
+    """
+    Outbox row for work done after a request commits. Enqueued in the same
+    transaction as the change it follows, run by `runworker`, retried with
+    backoff and parked as dead once it runs out of attempts. See api.tasks.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DEAD = 'dead'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, STATUS_PENDING),
+        (STATUS_RUNNING, STATUS_RUNNING),
+        (STATUS_DEAD, STATUS_DEAD),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=8, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_at = models.DateTimeField()
+    # The worker holding a running task, until `locked_until`; past that it is claimable again.
+    locked_by = models.CharField(max_length=64, blank=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_at'], name='task_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} {self.status}'
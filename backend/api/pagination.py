@@ -0,0 +1,164 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+_UNSET = object()
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination over `(ordering_field, id)`, newest first.
+
+    Each page is a single indexed range scan starting right after the last row
+    of the previous page, so page 10,000 costs the same as page 1. The cursor
+    is an opaque url-safe token holding the boundary row and the direction.
+    Set `ordering_field` to None to paginate on the primary key alone, and
+    `descending` to False to walk the keyset in ascending order.
+    """
+
+    ordering_field = 'created_at'
+    descending = True
+    page_size = 50
+    max_page_size = 200
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering_field=_UNSET, descending=None):
+        if ordering_field is not _UNSET:
+            self.ordering_field = ordering_field
+        if descending is not None:
+            self.descending = descending
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        position, reverse = self.decode_cursor(request)
+
+        queryset = queryset.order_by(*self._ordering(reverse))
+        if position is not None:
+            queryset = queryset.filter(self._seek_filter(position, reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Arriving through a cursor means there is a page on the side we came from.
+        self.has_next = has_more if not reverse else True
+        self.has_previous = position is not None if not reverse else has_more
+        self.first_position = self._position(rows[0]) if rows else None
+        self.last_position = self._position(rows[-1]) if rows else None
+        if not rows and position is not None:
+            # Walked off either end: keep a link back to where the client was.
+            self.first_position = self.last_position = position
+            self.has_next, self.has_previous = reverse, not reverse
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                'next': self.get_next_link(),
+                'previous': self.get_previous_link(),
+                'results': data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, TypeError, ValueError):
+            return self.page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self._link(self.last_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self._link(self.first_position, reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps(
+            {'o': self._ordering_key(), 'p': position, 'r': int(reverse)},
+            separators=(',', ':'),
+        )
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r'))
+            if payload.get('o') != self._ordering_key():
+                raise ValueError(payload.get('o'))
+            if self.ordering_field:
+                value, pk = position
+                self.model._meta.get_field(self.ordering_field).to_python(value)
+                position = [value, int(pk)]
+            else:
+                position = [int(position[0])]
+        except (TypeError, ValueError, KeyError, IndexError, UnicodeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _ordering_key(self):
+        return f"{'-' if self.descending else ''}{self.ordering_field or 'id'}"
+
+    def _ordering(self, reverse):
+        prefix = '-' if self.descending != reverse else ''
+        fields = [self.ordering_field, 'id'] if self.ordering_field else ['id']
+        return [f'{prefix}{field}' for field in fields]
+
+    def _seek_filter(self, position, reverse):
+        lookup = 'lt' if self.descending != reverse else 'gt'
+        if not self.ordering_field:
+            return Q(**{f'id__{lookup}': position[0]})
+
+        value = self.model._meta.get_field(self.ordering_field).to_python(position[0])
+        return Q(**{f'{self.ordering_field}__{lookup}': value}) | Q(
+            **{self.ordering_field: value, f'id__{lookup}': position[1]}
+        )
+
+    def _position(self, row):
+        # Rows are model instances, or dicts when paginating a `.values()` queryset.
+        is_dict = isinstance(row, dict)
+        pk = row['id'] if is_dict else row.pk
+        if not self.ordering_field:
+            return [pk]
+        value = row[self.ordering_field] if is_dict else getattr(row, self.ordering_field)
+        return [value.isoformat() if hasattr(value, 'isoformat') else value, pk]
+
+    def _link(self, position, reverse):
+        if position is None:
+            return None
+        url = remove_query_param(self.base_url, self.cursor_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(position, reverse))
@@ -0,0 +1,145 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from . import changes, events, leaderboard, medals
+from .models import HonourProfile, MedalRule, PointsTransaction
+
+TIP_VERIFIED_POINTS = 10
+REPORT_ACCEPTED_POINTS = 15
+
+
+def award(user_id, amount, reason, source_key=None, release=0):
+    """
+    Append a ledger entry and apply it to the user's score.
+
+    A `source_key` that is already in the ledger makes this a no-op and
+    returns None; otherwise returns the profile's `(score, medals)`. The score
+    moves with an `F()` increment, so concurrent awards never lose points and
+    hold the profile row lock only for the UPDATE itself. `release` frees that
+    many reserved points in the same UPDATE (capturing a reservation).
+    """
+    applied = award_many([(user_id, amount, reason, source_key)], releases={user_id: release})
+    return applied.get(user_id)
+
+
+def reserve(user_id, amount):
+    """
+    Hold `amount` points if the spendable balance covers them. One
+    conditional UPDATE: no read first, no lock kept beyond the statement's
+    transaction. Returns whether the points were reserved.
+    """
+    spendable = HonourProfile.objects.filter(user_id=user_id, score__gte=F('reserved_points') + amount)
+    return spendable.update(reserved_points=F('reserved_points') + amount) == 1
+
+
+def release(user_id, amount):
+    """Give back points held by `reserve()`."""
+    if amount:
+        HonourProfile.objects.filter(user_id=user_id).update(
+            reserved_points=Greatest(F('reserved_points') - amount, Value(0))
+        )
+
+
+def award_many(entries, releases=None):
+    """
+    `award()` for many `(user_id, amount, reason, source_key)` entries at
+    once: one ledger INSERT, then one score UPDATE per user for the sum of
+    that user's new entries. Returns `{user_id: (score, medals)}` for the
+    users whose score changed.
+    """
+    releases = releases or {}
+    with transaction.atomic():
+        rows = [
+            PointsTransaction(user_id=user_id, amount=amount, reason=reason, source_key=source_key)
+            for user_id, amount, reason, source_key in entries
+        ]
+        try:
+            with transaction.atomic():
+                PointsTransaction.objects.bulk_create(rows)
+        except IntegrityError:
+            # Some events were already applied; keep the ones that are new.
+            rows = [row for row in rows if _insert_once(row)]
+
+        totals = defaultdict(int)
+        for row in rows:
+            totals[row.user_id] += row.amount
+        # Users whose entries were all duplicates are skipped, releases included.
+        return {
+            user_id: _apply(user_id, total, releases.get(user_id, 0))
+            for user_id, total in totals.items()
+            if total or releases.get(user_id)
+        }
+
+
+def _insert_once(row):
+    try:
+        with transaction.atomic():
+            row.save(force_insert=True)
+        return True
+    except IntegrityError:
+        return False
+
+
+def _apply(user_id, delta, release=0):
+    profiles = HonourProfile.objects.filter(user_id=user_id)
+    increment = {'score': Greatest(F('score') + delta, Value(0))}
+    if release:
+        increment['reserved_points'] = Greatest(F('reserved_points') - release, Value(0))
+    updated = profiles.update(**increment)
+    if not updated:
+        try:
+            with transaction.atomic():
+                HonourProfile.objects.create(user_id=user_id, score=max(delta, 0))
+        except IntegrityError:
+            # Created concurrently; fold the delta into that row instead.
+            updated = profiles.update(**increment)
+
+    profile_id, score, names = profiles.values_list('id', 'score', 'medals').get()
+    if updated:
+        if score > 0 or delta >= 0:
+            leaderboard.score_changed(score - delta, score)
+        else:
+            # Clamped at zero, so the old score is unknown.
+            transaction.on_commit(leaderboard.invalidate)
+    awarded = medals.crossed(user_id, MedalRule.METRIC_SCORE, max(score - delta, 0), score)
+    names = list(names if awarded is None else awarded)
+
+    # Queryset updates skip post_save, so log the profile for the sync feed here.
+    changes.record('profile', profile_id, user_id=user_id)
+    events.score_event(user_id, score, names)
+    return score, names
+
+
+def balance(user_id):
+    return PointsTransaction.objects.filter(user_id=user_id).aggregate(total=Sum('amount'))['total'] or 0
+
+
+def materialize(batch_size=1000):
+    """
+    Rebuild every `HonourProfile.score` from the ledger, one set-based UPDATE
+    per batch of profiles. Returns the number of profiles processed.
+    """
+    total = (
+        PointsTransaction.objects.filter(user_id=OuterRef('user_id'))
+        .order_by()
+        .values('user_id')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    score = Greatest(Coalesce(Subquery(total, output_field=IntegerField()), Value(0)), Value(0))
+
+    processed = 0
+    last_id = 0
+    while True:
+        ids = list(
+            HonourProfile.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            transaction.on_commit(leaderboard.invalidate)
+            return processed
+        HonourProfile.objects.filter(id__in=ids).update(score=score)
+        processed += len(ids)
+        last_id = ids[-1]
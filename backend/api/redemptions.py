@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.utils import timezone
+
+from . import points, stats
+from .models import HonourProfile, PointsTransaction, RewardRedemption, UserCoupon
+
+
+class InsufficientPoints(Exception):
+    pass
+
+
+class AlreadyReviewed(Exception):
+    pass
+
+
+def request(user_id, reward):
+    """
+    Open a pending redemption and reserve its points.
+
+    The redemption row is inserted first and the reservation is the last
+    statement before commit, so the profile row is locked only for that one
+    UPDATE. Raises InsufficientPoints (rolling back the insert) when the
+    spendable balance does not cover the reward.
+    """
+    HonourProfile.objects.get_or_create(user_id=user_id)
+    cost = reward.points_required
+    with transaction.atomic():
+        redemption = RewardRedemption.objects.create(reward=reward, user_id=user_id, reserved_points=cost)
+        if not points.reserve(user_id, cost):
+            raise InsufficientPoints()
+    return redemption
+
+
+def review(redemption, status_value, reviewer_id=None, notes=''):
+    """
+    Approve (spend the reserved points, issue the coupon) or reject (release
+    them) a pending redemption. The status moves with a conditional UPDATE,
+    so a redemption is settled exactly once however many reviewers race.
+    """
+    with transaction.atomic():
+        reviewed_at = timezone.now()
+        settled = RewardRedemption.objects.filter(id=redemption.id, status=RewardRedemption.STATUS_PENDING).update(
+            status=status_value,
+            review_notes=notes,
+            reviewed_by_id=reviewer_id,
+            reviewed_at=reviewed_at,
+        )
+        if not settled:
+            raise AlreadyReviewed()
+        # The UPDATE skips the post_save hook that refreshes the dashboard counts.
+        stats.invalidate()
+        redemption.status = status_value
+        redemption.review_notes = notes
+        redemption.reviewed_by_id = reviewer_id
+        redemption.reviewed_at = reviewed_at
+
+        if status_value == RewardRedemption.STATUS_APPROVED:
+            # Requests from before reservations held nothing; charge the reward price.
+            cost = redemption.reserved_points or redemption.reward.points_required
+            points.award(
+                redemption.user_id,
+                -cost,
+                PointsTransaction.REASON_REDEMPTION,
+                source_key=f'redemption:{redemption.id}',
+                release=redemption.reserved_points,
+            )
+            UserCoupon.objects.create(
+                user_id=redemption.user_id,
+                reward=redemption.reward,
+                status=UserCoupon.STATUS_ACTIVE,
+                redemption=redemption,
+            )
+        else:
+            points.release(redemption.user_id, redemption.reserved_points)
+    return redemption
@@ -0,0 +1,152 @@
+import io
+import logging
+import posixpath
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_delete, post_save
+from PIL import Image, ImageOps
+
+from . import changes
+
+logger = logging.getLogger(__name__)
+
+# Label -> longest edge in pixels, largest first: each size is cut from the one before.
+SIZES = [('medium', 1280), ('thumb', 320)]
+FORMATS = [
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', {'quality': 82, 'progressive': True}),
+]
+DEFAULT_WORKERS = 2
+
+# model -> {'field': image field name, 'resource': change-feed resource}
+_registry = {}
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def register(model, field, resource):
+    """Render `model.<field>` after every save that changes it; drop the copies with the row."""
+    _registry[model] = {'field': field, 'resource': resource}
+
+    def on_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+        if raw or (update_fields is not None and field not in update_fields):
+            return
+        name = getattr(instance, field).name
+        if name and instance.renditions.get('source') != name:
+            schedule(model, instance.pk)
+
+    def on_delete(sender, instance, **kwargs):
+        _discard(getattr(instance, field).storage, instance.renditions, {})
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f'renditions-{resource}')
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f'renditions-delete-{resource}')
+
+
+def storage_for(model):
+    return model._meta.get_field(_registry[model]['field']).storage
+
+
+def schedule(model, pk):
+    """Render on the worker pool once the upload's transaction commits."""
+    transaction.on_commit(lambda: _submit(model, pk))
+
+
+def _submit(model, pk):
+    workers = getattr(settings, 'IMAGE_RENDITION_WORKERS', DEFAULT_WORKERS)
+    if not workers:
+        _run(model, pk)
+        return
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='renditions')
+    _executor.submit(_run, model, pk)
+
+
+def _run(model, pk):
+    try:
+        generate(model, pk)
+    except Exception:
+        # A corrupt upload keeps its original; `generate_renditions` retries later.
+        logger.exception('Could not render %s #%s', model._meta.label, pk)
+    finally:
+        close_old_connections()
+
+
+def generate(model, pk, force=False):
+    """
+    Write the thumbnail and medium renditions of one object's image in every
+    format and record them on the row. Orientation is applied from EXIF and
+    all metadata is dropped. Returns the new `renditions` value, or None
+    when there is nothing (new) to render.
+    """
+    spec = _registry[model]
+    row = model.objects.filter(pk=pk).values_list(spec['field'], 'renditions').first()
+    if not row or not row[0]:
+        return None
+    name, current = row
+    if current.get('source') == name and not force:
+        return None
+
+    storage = storage_for(model)
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        # JPEG can decode straight at 1/2..1/8 scale, skipping most of a 12MP image.
+        image.draft('RGB', (SIZES[0][1], SIZES[0][1]))
+        image = ImageOps.exif_transpose(image)
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    stem = posixpath.join('renditions', posixpath.splitext(name)[0])
+    rendered = {'source': name}
+    for label, edge in SIZES:
+        image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        rendered[label] = {'width': image.width, 'height': image.height}
+        for extension, fmt, options in FORMATS:
+            frame = image.convert('RGB') if fmt == 'JPEG' else image
+            buffer = io.BytesIO()
+            frame.save(buffer, fmt, optimize=True, **options)
+            path = f'{stem}-{label}.{extension}'
+            rendered[label][extension] = storage.save(path, ContentFile(buffer.getvalue()))
+
+    with transaction.atomic():
+        # Only if the image was not replaced while rendering; that save scheduled its own run.
+        stored = model.objects.filter(pk=pk, **{spec['field']: name}).update(renditions=rendered)
+        if stored:
+            changes.record(spec['resource'], pk)
+    if not stored:
+        # Nothing points at these copies; keep only what the row holds now.
+        latest = model.objects.filter(pk=pk).values_list('renditions', flat=True).first() or {}
+        _discard(storage, rendered, latest)
+        return None
+    _discard(storage, current, rendered)
+    return rendered
+
+
+def _discard(storage, old, new):
+    kept = {path for label, _ in SIZES for path in new.get(label, {}).values() if isinstance(path, str)}
+    for label, _ in SIZES:
+        for extension, _, _ in FORMATS:
+            path = old.get(label, {}).get(extension)
+            if path and path not in kept:
+                storage.delete(path)
+
+
+def urls(renditions, storage):
+    """
+    `{'medium': {'webp': url, 'jpeg': url, 'width': w, 'height': h}, 'thumb':
+    {...}}` for a `renditions` value, or None until the image is rendered.
+    """
+    if not renditions or 'source' not in renditions:
+        return None
+    result = {}
+    for label, _ in SIZES:
+        entry = renditions.get(label)
+        if entry:
+            result[label] = {
+                key: storage.url(value) if key in ('webp', 'jpeg') else value for key, value in entry.items()
+            }
+    return result
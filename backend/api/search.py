@@ -0,0 +1,198 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Case as SqlCase, Count, F, FloatField, Sum, Value, When
+from django.db.models.signals import post_delete, post_save
+
+from .models import SearchPosting
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 8
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has he her his in is it its of on or she that the their they '
+    'this to was were with'.split()
+)
+
+# doc_type -> {'model': Model, 'fields': {field name: weight}, 'render': callable}
+_registry = {}
+
+
+def fold(text):
+    """
+    Casefold and strip accents, so 'Café' and 'cafe' are one term. MySQL's
+    accent-insensitive collation compares them as equal anyway, and two
+    postings for them would break the unique constraint there.
+    """
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """Folded word tokens without stopwords and single characters."""
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(fold(text or ''))
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def register(model, doc_type, fields, render):
+    """
+    Index `fields` (a `{field name: weight}` mapping) of `model` under `doc_type`.
+
+    `render(ids)` returns `{id: payload}` for the search response. Saves and
+    deletes keep the postings in step; saves whose `update_fields` touch none
+    of the indexed fields skip re-indexing.
+    """
+    _registry[doc_type] = {'model': model, 'fields': fields, 'render': render}
+
+    def on_save(sender, instance, update_fields=None, raw=False, **kwargs):
+        if raw or (update_fields is not None and not set(update_fields) & set(fields)):
+            return
+        index_document(doc_type, instance)
+
+    def on_delete(sender, instance, **kwargs):
+        remove_document(doc_type, instance.pk)
+
+    post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f'search-index-{doc_type}')
+    post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f'search-remove-{doc_type}')
+
+
+def registered_types():
+    return list(_registry)
+
+
+def term_weights(doc_type, instance):
+    weights = Counter()
+    for field, weight in _registry[doc_type]['fields'].items():
+        for term in tokenize(getattr(instance, field, '')):
+            weights[term] += weight
+    return weights
+
+
+def build_postings(doc_type, instance):
+    return [
+        SearchPosting(term=term, doc_type=doc_type, doc_id=instance.pk, weight=weight)
+        for term, weight in term_weights(doc_type, instance).items()
+    ]
+
+
+def index_document(doc_type, instance):
+    postings = build_postings(doc_type, instance)
+    with transaction.atomic():
+        SearchPosting.objects.filter(doc_type=doc_type, doc_id=instance.pk).delete()
+        SearchPosting.objects.bulk_create(postings)
+
+
+def index_new_documents(doc_type, instances):
+    """
+    Index freshly inserted rows (e.g. after `bulk_create`). A document yields
+    about ten postings, so they go in with one `executemany` rather than
+    through model instances.
+    """
+    rows = [
+        (term, doc_type, instance.pk, weight)
+        for instance in instances
+        for term, weight in term_weights(doc_type, instance).items()
+    ]
+    if not rows:
+        return
+    table = connection.ops.quote_name(SearchPosting._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'INSERT INTO {table} (term, doc_type, doc_id, weight) VALUES (%s, %s, %s, %s)',
+            rows,
+        )
+
+
+def remove_document(doc_type, doc_id):
+    SearchPosting.objects.filter(doc_type=doc_type, doc_id=doc_id).delete()
+
+
+def rebuild(doc_type, batch_size=1000):
+    """Re-index every row of `doc_type`; returns the number of documents indexed."""
+    model = _registry[doc_type]['model']
+    fields = list(_registry[doc_type]['fields'])
+    indexed = 0
+    last_id = 0
+    SearchPosting.objects.filter(doc_type=doc_type).delete()
+    while True:
+        batch = list(model.objects.filter(pk__gt=last_id).order_by('pk').only('pk', *fields)[:batch_size])
+        if not batch:
+            return indexed
+        postings = [posting for instance in batch for posting in build_postings(doc_type, instance)]
+        SearchPosting.objects.bulk_create(postings, batch_size=batch_size)
+        indexed += len(batch)
+        last_id = batch[-1].pk
+
+
+def search(query, doc_types=None, limit=20):
+    """
+    Rank documents matching `query` and return `[(doc_type, doc_id, score)]`.
+
+    Documents matching more query terms rank first; ties are broken by the
+    summed field weights, each scaled by the term's inverse document frequency
+    so rare words count for more than common ones. Everything after the
+    document-frequency lookup is one grouped query over the term index.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        return []
+
+    postings = SearchPosting.objects.filter(term__in=terms)
+    if doc_types:
+        postings = postings.filter(doc_type__in=doc_types)
+
+    frequencies = dict(postings.values_list('term').annotate(df=Count('id')).order_by())
+    terms = [term for term in terms if term in frequencies]
+    if not terms:
+        return []
+
+    score = Sum(
+        SqlCase(
+            *[
+                When(term=term, then=F('weight') * Value(1.0 / math.log2(1 + frequencies[term])))
+                for term in terms
+            ],
+            output_field=FloatField(),
+        )
+    )
+    rows = (
+        postings.filter(term__in=terms)
+        .values('doc_type', 'doc_id')
+        .annotate(matched=Count('term'), score=score)
+        .order_by('-matched', '-score', '-doc_id')[:limit]
+    )
+    return [(row['doc_type'], row['doc_id'], round(row['score'], 4)) for row in rows]
+
+
+def matching_ids(doc_type, query):
+    """
+    Subquery of the ids of `doc_type` documents matching any term of `query`.
+    Unlike `search()` it is neither ranked nor capped, so a changelist filtered
+    on it pages through every match.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    return SearchPosting.objects.filter(doc_type=doc_type, term__in=terms).values('doc_id')
+
+
+def render_hits(hits):
+    """Attach each hit's rendered payload, dropping hits whose row has gone away."""
+    ids_by_type = {}
+    for doc_type, doc_id, _ in hits:
+        ids_by_type.setdefault(doc_type, []).append(doc_id)
+    payloads = {
+        doc_type: _registry[doc_type]['render'](ids)
+        for doc_type, ids in ids_by_type.items()
+    }
+    return [
+        {'type': doc_type, 'id': doc_id, 'score': score, 'data': payloads[doc_type][doc_id]}
+        for doc_type, doc_id, score in hits
+        if doc_id in payloads[doc_type]
+    ]
@@ -1,11 +1,15 @@
 from django.contrib.auth.models import User
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
 from rest_framework import serializers
-from .models import Case, Tip, HonourProfile, Reward, RewardRedemption, UserCoupon
+from . import renditions, uploads
+from .models import Case, Tip, HonourProfile, Reward, RewardRedemption, UploadSession, UserCoupon
 
 
 class CaseSerializer(serializers.ModelSerializer):
     userId = serializers.IntegerField(source='user_id', read_only=True)
     userName = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Case
@@ -19,22 +23,39 @@ class CaseSerializer(serializers.ModelSerializer):
             'urgency',
             'status',
             'photo',
+            'renditions',
             'userId',
             'userName',
+            'tip_count',
+            'verified_tip_count',
+            'report_count',
+            'pending_report_count',
+            'last_sighting_at',
             'created_at',
             'updated_at',
         ]
+        read_only_fields = [
+            'tip_count',
+            'verified_tip_count',
+            'report_count',
+            'pending_report_count',
+            'last_sighting_at',
+        ]
 
     def get_userName(self, obj):
         if not obj.user:
             return ''
         return obj.user.get_full_name() or obj.user.username
 
+    def get_renditions(self, obj):
+        return renditions.urls(obj.renditions, obj.photo.storage)
+
 
 class TipSerializer(serializers.ModelSerializer):
     caseId = serializers.IntegerField(source='case_id', read_only=True)
     userId = serializers.IntegerField(source='user_id', read_only=True)
     userName = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
 
     class Meta:
         model = Tip
@@ -49,6 +70,7 @@ class TipSerializer(serializers.ModelSerializer):
             'share_location',
             'verified',
             'attachment',
+            'renditions',
             'created_at',
         ]
 
@@ -57,6 +79,9 @@ class TipSerializer(serializers.ModelSerializer):
             return ''
         return obj.user.get_full_name() or obj.user.username
 
+    def get_renditions(self, obj):
+        return renditions.urls(obj.renditions, obj.attachment.storage)
+
 
 class TipCreateSerializer(serializers.Serializer):
     caseId = serializers.IntegerField()
@@ -66,6 +91,8 @@ class TipCreateSerializer(serializers.Serializer):
     isAnonymous = serializers.BooleanField(required=False, default=False)
     shareLocation = serializers.BooleanField(required=False, default=False)
     attachment = serializers.ImageField(required=False, allow_null=True)
+    # A completed resumable upload to attach instead of `attachment`.
+    uploadId = serializers.UUIDField(required=False)
 
     def validate_caseId(self, value):
         if not Case.objects.filter(id=value).exists():
@@ -73,6 +100,20 @@ class TipCreateSerializer(serializers.Serializer):
         return value
 
 
+class UploadSessionSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source='received', read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'size', 'offset', 'status', 'updated_at']
+        read_only_fields = ['id', 'offset', 'status', 'updated_at']
+
+    def validate_size(self, value):
+        if not 0 < value <= uploads.max_bytes():
+            raise serializers.ValidationError(f'Size must be between 1 and {uploads.max_bytes()} bytes.')
+        return value
+
+
 class UserHonourSerializer(serializers.Serializer):
     id = serializers.IntegerField()
     name = serializers.CharField()
@@ -116,7 +157,9 @@ class RewardRedemptionSerializer(serializers.ModelSerializer):
             'reviewed_at',
             'reviewed_by',
             'review_notes',
+            'reserved_points',
         ]
+        read_only_fields = ['reserved_points']
 
     def get_userName(self, obj):
         if not obj.user:
@@ -142,3 +185,126 @@ class UserCouponSerializer(serializers.ModelSerializer):
             'used_at',
             'expiry_date',
         ]
+
+
+def user_display_name(prefix='user__'):
+    """SQL twin of `user.get_full_name() or user.username`, '' when there is no user."""
+    full_name = Trim(
+        Concat(F(f'{prefix}first_name'), Value(' '), F(f'{prefix}last_name'), output_field=CharField())
+    )
+    return Coalesce(NullIf(full_name, Value('')), F(f'{prefix}username'), Value(''), output_field=CharField())
+
+
+class ValuesReadSerializer:
+    """
+    Read-only fast path that renders `.values()` rows to the same JSON as a
+    ModelSerializer.
+
+    `values()` fetches exactly the listed columns (with related names built by
+    SQL annotations) in one query, and `render()` turns the plain dicts into
+    response rows without instantiating models or DRF fields per object.
+    `columns` is a list of `(output key, source, kind)` where kind is None,
+    'datetime', 'file' or 'renditions'.
+    """
+
+    model = None
+    annotations = {}
+    columns = []
+
+    _datetime_field = serializers.DateTimeField()
+
+    @classmethod
+    def values(cls, queryset):
+        sources = [source for _, source, _ in cls.columns]
+        return queryset.annotate(**cls.annotations).values(*sources)
+
+    @classmethod
+    def render(cls, rows):
+        formatters = [(key, source, cls._formatter(source, kind)) for key, source, kind in cls.columns]
+        return [
+            {key: formatter(row[source]) if formatter else row[source] for key, source, formatter in formatters}
+            for row in rows
+        ]
+
+    @classmethod
+    def render_by_id(cls, ids):
+        rows = cls.render(cls.values(cls.model.objects.filter(id__in=ids)))
+        return {row['id']: row for row in rows}
+
+    @classmethod
+    def _formatter(cls, source, kind):
+        if kind == 'datetime':
+            return lambda value: cls._datetime_field.to_representation(value) if value else None
+        if kind == 'file':
+            storage = cls.model._meta.get_field(source).storage
+            return lambda name: storage.url(name) if name else None
+        if kind == 'renditions':
+            storage = renditions.storage_for(cls.model)
+            return lambda value: renditions.urls(value, storage)
+        return None
+
+
+class CaseReadSerializer(ValuesReadSerializer):
+    model = Case
+    annotations = {'user_display_name': user_display_name()}
+    columns = [
+        ('id', 'id', None),
+        ('name', 'name', None),
+        ('age', 'age', None),
+        ('location', 'location', None),
+        ('description', 'description', None),
+        ('reliability', 'reliability', None),
+        ('urgency', 'urgency', None),
+        ('status', 'status', None),
+        ('photo', 'photo', 'file'),
+        ('renditions', 'renditions', 'renditions'),
+        ('userId', 'user_id', None),
+        ('userName', 'user_display_name', None),
+        ('tip_count', 'tip_count', None),
+        ('verified_tip_count', 'verified_tip_count', None),
+        ('report_count', 'report_count', None),
+        ('pending_report_count', 'pending_report_count', None),
+        ('last_sighting_at', 'last_sighting_at', 'datetime'),
+        ('created_at', 'created_at', 'datetime'),
+        ('updated_at', 'updated_at', 'datetime'),
+    ]
+
+
+class TipReadSerializer(ValuesReadSerializer):
+    model = Tip
+    annotations = {'user_display_name': user_display_name()}
+    columns = [
+        ('id', 'id', None),
+        ('caseId', 'case_id', None),
+        ('userId', 'user_id', None),
+        ('userName', 'user_display_name', None),
+        ('reporter', 'reporter', None),
+        ('content', 'content', None),
+        ('is_anonymous', 'is_anonymous', None),
+        ('share_location', 'share_location', None),
+        ('verified', 'verified', None),
+        ('attachment', 'attachment', 'file'),
+        ('renditions', 'renditions', 'renditions'),
+        ('created_at', 'created_at', 'datetime'),
+    ]
+
+
+class RewardRedemptionReadSerializer(ValuesReadSerializer):
+    model = RewardRedemption
+    annotations = {
+        'reward_name': F('reward__name'),
+        'user_display_name': user_display_name(),
+    }
+    columns = [
+        ('id', 'id', None),
+        ('reward', 'reward_id', None),
+        ('rewardName', 'reward_name', None),
+        ('userId', 'user_id', None),
+        ('userName', 'user_display_name', None),
+        ('status', 'status', None),
+        ('requested_at', 'requested_at', 'datetime'),
+        ('reviewed_at', 'reviewed_at', 'datetime'),
+        ('reviewed_by', 'reviewed_by_id', None),
+        ('review_notes', 'review_notes', None),
+        ('reserved_points', 'reserved_points', None),
+    ]
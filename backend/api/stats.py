@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .models import Case, Reward, RewardRedemption, Tip, UserCoupon
+
+CACHE_KEY = 'api:dashboard-stats'
+# Safety net only: writes invalidate the cached payload as soon as they commit.
+CACHE_TIMEOUT = 300
+
+
+def get_stats():
+    stats = cache.get(CACHE_KEY)
+    if stats is None:
+        stats = compute_stats()
+        cache.set(CACHE_KEY, stats, CACHE_TIMEOUT)
+    return stats
+
+
+def compute_stats():
+    """Dashboard counts from six grouped aggregate queries."""
+    from public_reports.models import PublicReport
+
+    by_status = {status: 0 for status, _ in Case.STATUS_CHOICES}
+    by_urgency = {urgency: 0 for urgency, _ in Case.URGENCY_CHOICES}
+    for row in Case.objects.order_by().values('status', 'urgency').annotate(total=Count('id')):
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['total']
+        by_urgency[row['urgency']] = by_urgency.get(row['urgency'], 0) + row['total']
+
+    tips = dict(Tip.objects.order_by().values_list('verified').annotate(total=Count('id')))
+
+    sightings = {status: 0 for status, _ in PublicReport.STATUS_CHOICES}
+    sightings.update(PublicReport.objects.order_by().values_list('status').annotate(total=Count('id')))
+
+    now = timezone.now()
+    # Lapsed coupons count as expired before the sweeper flips them, as in the coupon list.
+    live_coupons = UserCoupon.objects.filter(Q(expiry_date__isnull=True) | Q(expiry_date__gt=now))
+
+    return {
+        'cases': {
+            'total': sum(by_status.values()),
+            'by_status': by_status,
+            'by_urgency': by_urgency,
+        },
+        'tips': {
+            'total': sum(tips.values()),
+            'verified': tips.get(True, 0),
+            'unverified': tips.get(False, 0),
+        },
+        'sightings': {
+            'total': sum(sightings.values()),
+            'by_status': sightings,
+        },
+        'rewards': {
+            'active': Reward.objects.filter(is_active=True).count(),
+            'pending_redemptions': RewardRedemption.objects.filter(status=RewardRedemption.STATUS_PENDING).count(),
+            'active_coupons': live_coupons.filter(status=UserCoupon.STATUS_ACTIVE).count(),
+        },
+        'generated_at': now.isoformat(),
+    }
+
+
+def invalidate(**kwargs):
+    # Deleting after commit stops a concurrent reader re-caching pre-commit counts.
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
+
+
+def connect():
+    from public_reports.models import PublicReport
+
+    for model in (Case, Tip, PublicReport, Reward, RewardRedemption, UserCoupon):
+        uid = f'dashboard-stats-{model._meta.label_lower}'
+        post_save.connect(invalidate, sender=model, dispatch_uid=f'{uid}-save')
+        post_delete.connect(invalidate, sender=model, dispatch_uid=f'{uid}-delete')
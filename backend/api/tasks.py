@@ -0,0 +1,141 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+DEFAULT_LEASE_SECONDS = 5 * 60
+
+# name -> {'handler': callable, 'max_attempts': int}
+_registry = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+def register(name, handler, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Run `handler(**payload)` for tasks enqueued under `name`. Handlers must be safe to run twice."""
+    _registry[name] = {'handler': handler, 'max_attempts': max_attempts}
+
+
+def enqueue(name, payload=None, delay=0):
+    """
+    Add a task. Call it inside the transaction of the write it follows: the
+    task commits (and becomes visible to workers) or rolls back with it.
+    """
+    if name not in _registry:
+        raise UnknownTask(name)
+    return Task.objects.create(
+        name=name,
+        payload=payload or {},
+        max_attempts=_registry[name]['max_attempts'],
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def backoff(attempts):
+    """Seconds before retry number `attempts`: doubling from BACKOFF_BASE_SECONDS, capped, with jitter."""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _expired(now):
+    # Running tasks whose lease lapsed belong to a worker that died mid-task.
+    return Q(status=Task.STATUS_RUNNING, locked_until__lt=now)
+
+
+def _due(now):
+    return Q(status=Task.STATUS_PENDING, run_at__lte=now) | (_expired(now) & Q(attempts__lt=F('max_attempts')))
+
+
+def claim(worker, limit=1, lease=DEFAULT_LEASE_SECONDS):
+    """
+    Lease up to `limit` due tasks to `worker`, oldest first. Each claim is a
+    conditional UPDATE, so concurrent workers never get the same task. Lapsed
+    leases are taken over, unless that was the task's last attempt: then it
+    is marked dead.
+    """
+    now = timezone.now()
+    # A task that keeps killing its worker would otherwise be leased forever.
+    spent = Task.objects.filter(_expired(now), attempts__gte=F('max_attempts')).update(
+        status=Task.STATUS_DEAD,
+        locked_by='',
+        locked_until=None,
+        last_error='Worker lost the lease on the last attempt.',
+    )
+    if spent:
+        logger.error('%s tasks are dead after their worker was lost on the last attempt', spent)
+    candidates = list(Task.objects.filter(_due(now)).order_by('run_at', 'id').values_list('id', flat=True)[:limit * 4])
+    claimed = []
+    for task_id in candidates:
+        won = Task.objects.filter(_due(now), pk=task_id).update(
+            status=Task.STATUS_RUNNING,
+            locked_by=worker,
+            locked_until=now + timedelta(seconds=lease),
+            attempts=F('attempts') + 1,
+        )
+        if won:
+            claimed.append(Task.objects.get(pk=task_id))
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def run(task, worker):
+    """
+    Run one claimed task. Success deletes it; failure schedules a retry
+    after `backoff()`, or marks it dead once `max_attempts` are spent. The
+    outcome is only written while `worker` still holds the lease.
+    """
+    mine = Task.objects.filter(pk=task.pk, locked_by=worker, status=Task.STATUS_RUNNING)
+    try:
+        spec = _registry.get(task.name)
+        if spec is None:
+            raise UnknownTask(task.name)
+        spec['handler'](**task.payload)
+    except Exception:
+        error = traceback.format_exc()
+        if task.attempts >= task.max_attempts:
+            logger.error('Task %s #%s is dead after %s attempts', task.name, task.pk, task.attempts)
+            mine.update(status=Task.STATUS_DEAD, locked_by='', locked_until=None, last_error=error)
+        else:
+            logger.warning('Task %s #%s failed (attempt %s); retrying', task.name, task.pk, task.attempts)
+            mine.update(
+                status=Task.STATUS_PENDING,
+                run_at=timezone.now() + timedelta(seconds=backoff(task.attempts)),
+                locked_by='',
+                locked_until=None,
+                last_error=error,
+            )
+        return False
+    mine.delete()
+    return True
+
+
+def work(worker, limit=1, lease=DEFAULT_LEASE_SECONDS):
+    """Claim and run up to `limit` tasks; returns how many were found."""
+    tasks = claim(worker, limit=limit, lease=lease)
+    for task in tasks:
+        run(task, worker)
+    return len(tasks)
+
+
+def retry(queryset):
+    """Put dead (or any) tasks back in line with a fresh set of attempts."""
+    return queryset.update(
+        status=Task.STATUS_PENDING,
+        attempts=0,
+        run_at=timezone.now(),
+        locked_by='',
+        locked_until=None,
+    )
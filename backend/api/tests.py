@@ -1,3 +1,1016 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from .models import Case, HonourProfile, Tip
+from .serializers import CaseReadSerializer, CaseSerializer, TipReadSerializer, TipSerializer
+
+
+class CasePaginationTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for index in range(5):
+            Case.objects.create(name=f'Case {index}', location='Test Location')
+
+    def test_pages_follow_cursor_without_overlap(self):
+        first = self.client.get('/api/cases', {'page_size': 2}).json()
+        self.assertEqual(len(first['results']), 2)
+        self.assertIsNone(first['previous'])
+
+        second = self.client.get(first['next']).json()
+        third = self.client.get(second['next']).json()
+        self.assertIsNone(third['next'])
+
+        ids = [row['id'] for page in (first, second, third) for row in page['results']]
+        expected = list(Case.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+        back = self.client.get(third['previous']).json()
+        self.assertEqual(back['results'], second['results'])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/api/cases', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class CaseFilterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        Case.objects.create(name='Young', location='A', age=8, urgency=Case.URGENCY_HIGH, status=Case.STATUS_ACTIVE)
+        Case.objects.create(name='Teen', location='B', age=15, urgency=Case.URGENCY_LOW, status=Case.STATUS_ACTIVE)
+        Case.objects.create(name='Adult', location='C', age=40, urgency=Case.URGENCY_HIGH, status=Case.STATUS_SOLVED)
+
+    def test_filters_by_status_urgency_and_age(self):
+        response = self.client.get('/api/cases', {'status': 'Active,Pending', 'urgency': 'high', 'max_age': 10})
+        self.assertEqual([row['name'] for row in response.json()['results']], ['Young'])
+
+    def test_sorts_by_age(self):
+        response = self.client.get('/api/cases', {'sort': 'age', 'page_size': 2})
+        first = response.json()
+        second = self.client.get(first['next']).json()
+        names = [row['name'] for row in first['results'] + second['results']]
+        self.assertEqual(names, ['Young', 'Teen', 'Adult'])
+
+    def test_rejects_unknown_filter_values(self):
+        self.assertEqual(self.client.get('/api/cases', {'status': 'Lost'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/cases', {'sort': 'name'}).status_code, 400)
+
+
+class ReadSerializerTest(TestCase):
+    def test_fast_path_matches_model_serializers(self):
+        user = User.objects.create_user(username='ana', first_name='Ana', last_name='Silva')
+        nameless = User.objects.create_user(username='nameless')
+        case = Case.objects.create(name='Case', location='Here', user=user)
+        Case.objects.create(name='Orphan', location='There')
+        Tip.objects.create(case=case, user=nameless, content='Seen at the station')
+        Tip.objects.create(case=case, content='Anonymous tip')
+
+        for model_serializer, read_serializer, queryset in (
+            (CaseSerializer, CaseReadSerializer, Case.objects.order_by('id')),
+            (TipSerializer, TipReadSerializer, Tip.objects.order_by('id')),
+        ):
+            expected = [dict(row) for row in model_serializer(queryset, many=True).data]
+            with self.assertNumQueries(1):
+                rendered = read_serializer.render(read_serializer.values(queryset))
+            self.assertEqual(rendered, expected)
+
+
+class SearchTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.case = Case.objects.create(
+            name='Sarah Johnson',
+            location='Central Park',
+            description='Blue jeans and white shirt',
+        )
+        self.other = Case.objects.create(name='Michael Chen', location='Sunset Mall', description='Red jacket')
+        self.tip = Tip.objects.create(case=self.other, content='Seen near the park entrance in a red jacket')
+
+    def test_ranks_matches_across_types(self):
+        response = self.client.get('/api/search', {'q': 'red jacket'})
+        hits = [(hit['type'], hit['id']) for hit in response.json()['results']]
+        self.assertEqual(set(hits), {('case', self.other.id), ('tip', self.tip.id)})
+
+        response = self.client.get('/api/search', {'q': 'sarah park', 'type': 'case'})
+        self.assertEqual(response.json()['results'][0]['id'], self.case.id)
+        self.assertEqual(response.json()['results'][0]['data']['name'], 'Sarah Johnson')
+
+    def test_index_follows_updates_and_deletes(self):
+        self.case.description = 'Green coat'
+        self.case.save()
+        self.assertEqual(self.client.get('/api/search', {'q': 'jeans'}).json()['results'], [])
+        self.assertEqual(len(self.client.get('/api/search', {'q': 'green'}).json()['results']), 1)
+
+        self.tip.delete()
+        results = self.client.get('/api/search', {'q': 'entrance'}).json()['results']
+        self.assertEqual(results, [])
+
+    def test_accented_spellings_share_one_term(self):
+        from .models import SearchPosting
+
+        case = Case.objects.create(name='Zoë Müller', location='Café Straße', description='Near the cafe')
+        terms = SearchPosting.objects.filter(doc_type='case', doc_id=case.id).values_list('term', flat=True)
+        self.assertEqual(sorted(terms), ['cafe', 'muller', 'near', 'strasse', 'zoe'])
+        results = self.client.get('/api/search', {'q': 'MULLER Strasse'}).json()['results']
+        self.assertEqual([hit['id'] for hit in results], [case.id])
+
+    def test_admin_search_is_not_capped(self):
+        from django.contrib import admin
+
+        from .models import SearchPosting
+
+        cases = Case.objects.bulk_create(
+            Case(name=f'Walker {number}', location='Harbour', description='') for number in range(1100)
+        )
+        SearchPosting.objects.bulk_create(
+            SearchPosting(term='walker', doc_type='case', doc_id=case.id) for case in cases
+        )
+        model_admin = admin.site._registry[Case]
+        found, _ = model_admin.get_search_results(None, Case.objects.all(), 'walker')
+        self.assertEqual(found.count(), 1100)
+        found, _ = model_admin.get_search_results(None, Case.objects.all(), 'the')
+        self.assertEqual(found.count(), 0)
+
+
+class CaseCounterTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.case = Case.objects.create(name='Counted', location='Here')
+
+    def test_tip_endpoints_maintain_counters(self):
+        response = self.client.post('/api/tips', {'caseId': self.case.id, 'content': 'Seen him'}, format='json')
+        tip_id = response.json()['id']
+        self.client.put(f'/api/tips/{tip_id}/verify')
+        self.client.put(f'/api/tips/{tip_id}/verify')
+
+        self.case.refresh_from_db()
+        self.assertEqual((self.case.tip_count, self.case.verified_tip_count), (1, 1))
+
+    def test_recompute_repairs_drifted_counters(self):
+        from . import counters
+
+        Tip.objects.create(case=self.case, content='One', verified=True)
+        Tip.objects.create(case=self.case, content='Two')
+        Case.objects.filter(id=self.case.id).update(tip_count=7, verified_tip_count=7)
+
+        counters.recompute()
+        self.case.refresh_from_db()
+        self.assertEqual((self.case.tip_count, self.case.verified_tip_count, self.case.report_count), (2, 1, 0))
+        self.assertIsNone(self.case.last_sighting_at)
+
+    def test_deletes_take_their_counts_back(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from public_reports.models import PublicReport
+
+        tip = Tip.objects.create(case=self.case, content='Verified', verified=True)
+        Tip.objects.create(case=self.case, content='Open')
+        now = timezone.now()
+        older = PublicReport.objects.create(missing_case=self.case, description='Older', latitude=1, longitude=2)
+        newer = PublicReport.objects.create(missing_case=self.case, description='Newer', latitude=1, longitude=2)
+        PublicReport.objects.filter(id=older.id).update(created_at=now - timedelta(days=1))
+        # The create endpoints bump the counters; these rows were created directly.
+        Case.objects.filter(id=self.case.id).update(
+            tip_count=2, verified_tip_count=1, report_count=2, pending_report_count=2, last_sighting_at=now
+        )
+
+        tip.delete()
+        PublicReport.objects.filter(id=newer.id).delete()
+        self.case.refresh_from_db()
+        self.assertEqual((self.case.tip_count, self.case.verified_tip_count), (1, 0))
+        self.assertEqual((self.case.report_count, self.case.pending_report_count), (1, 1))
+        self.assertEqual(self.case.last_sighting_at, now - timedelta(days=1))
+
+
+class DashboardStatsTest(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        self.client = APIClient()
+        cache.clear()
+
+    def test_stats_are_cached_and_invalidated_on_write(self):
+        Case.objects.create(name='One', location='A', status=Case.STATUS_ACTIVE, urgency=Case.URGENCY_HIGH)
+        first = self.client.get('/api/stats').json()
+        self.assertEqual(first['cases']['total'], 1)
+        self.assertEqual(first['cases']['by_status']['Active'], 1)
+        self.assertEqual(first['cases']['by_urgency']['High'], 1)
+
+        with self.assertNumQueries(0):
+            self.client.get('/api/stats')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Case.objects.create(name='Two', location='B')
+        self.assertEqual(self.client.get('/api/stats').json()['cases']['total'], 2)
+
+    def test_lapsed_coupons_are_not_counted_as_active(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from .models import Reward, UserCoupon
+
+        user = User.objects.create_user(username='holder', password='pass')
+        reward = Reward.objects.create(name='Voucher', points_required=10)
+        now = timezone.now()
+        UserCoupon.objects.create(user=user, reward=reward, expiry_date=now - timedelta(minutes=1))
+        UserCoupon.objects.create(user=user, reward=reward, expiry_date=now + timedelta(days=1))
+        UserCoupon.objects.create(user=user, reward=reward)
+        self.assertEqual(self.client.get('/api/stats').json()['rewards']['active_coupons'], 2)
+
+
+class EventBrokerTest(TestCase):
+    def test_subscribers_receive_matching_topics_after_commit(self):
+        from . import events
+
+        broker = events.get_broker()
+        case_feed = broker.subscribe(['cases.1'])
+        user_feed = broker.subscribe(['users.9'])
+        self.addCleanup(case_feed.close)
+        self.addCleanup(user_feed.close)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            case = Case.objects.create(id=1, name='Live', location='Here')
+            tip = Tip.objects.create(case=case, content='Seen')
+            events.tip_event('tip.created', tip)
+            self.assertIsNone(case_feed.get(timeout=0))
+
+        event = case_feed.get(timeout=1)
+        self.assertEqual((event['type'], event['data']['id']), ('tip.created', tip.id))
+        self.assertIn('cases.1.tips', event['topics'])
+        self.assertIsNone(user_feed.get(timeout=0))
+
+
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_feed_returns_latest_state_tombstones_and_scopes_per_user(self):
+        owner = User.objects.create_user(username='owner', password='pass')
+        other = User.objects.create_user(username='other', password='pass')
+        token = self.client.get('/api/changes').json()['next']
+
+        case = Case.objects.create(name='Synced', location='Here')
+        gone = Case.objects.create(name='Gone', location='There')
+        gone_id = gone.id
+        gone.delete()
+        case.status = Case.STATUS_SOLVED
+        case.save()
+        HonourProfile.objects.create(user=owner, score=5)
+        HonourProfile.objects.create(user=other, score=7)
+
+        payload = self.client.get('/api/changes', {'since': token, 'userId': owner.id}).json()
+        self.assertFalse(payload['has_more'])
+        self.assertEqual([row['status'] for row in payload['changes']['cases']['upserted']], ['Solved'])
+        self.assertEqual(payload['changes']['cases']['deleted'], [gone_id])
+        self.assertEqual([row['userId'] for row in payload['changes']['profile']['upserted']], [owner.id])
+
+        caught_up = self.client.get('/api/changes', {'since': payload['next']}).json()
+        self.assertEqual(caught_up['changes'], {})
+
+    def test_pages_follow_the_limit(self):
+        token = self.client.get('/api/changes').json()['next']
+        for index in range(3):
+            Case.objects.create(name=f'Case {index}', location='Here')
+
+        first = self.client.get('/api/changes', {'since': token, 'limit': 2}).json()
+        self.assertTrue(first['has_more'])
+        self.assertEqual(len(first['changes']['cases']['upserted']), 2)
+        second = self.client.get('/api/changes', {'since': first['next'], 'limit': 2}).json()
+        self.assertFalse(second['has_more'])
+        self.assertEqual(len(second['changes']['cases']['upserted']), 1)
+
+
+class BulkImportTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='agency', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_ndjson_tips_insert_valid_rows_and_report_the_rest(self):
+        case = Case.objects.create(name='Imported', location='Dock')
+        body = '\n'.join(
+            [
+                f'{{"caseId": {case.id}, "content": "Seen at the dock", "username": "agency"}}',
+                '{"caseId": 999999, "content": "No such case"}',
+                'not json',
+                f'{{"caseId": {case.id}, "content": "Seen again", "isAnonymous": "yes"}}',
+                f'{{"caseId": {case.id}}}',
+            ]
+        )
+        response = self.client.post('/api/import/tips', body, content_type='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        result = response.json()
+        self.assertEqual((result['received'], result['created'], result['failed']), (5, 2, 3))
+        self.assertEqual([error['line'] for error in result['errors']], [2, 3, 5])
+        self.assertIn('content', result['errors'][2]['errors'])
+
+        self.assertEqual(Tip.objects.filter(case=case).count(), 2)
+        self.assertEqual(Tip.objects.filter(user=self.user).count(), 1)
+        case.refresh_from_db()
+        self.assertEqual(case.tip_count, 2)
+        hits = self.client.get('/api/search', {'q': 'dock', 'type': 'tip'}).json()['results']
+        self.assertEqual([hit['id'] for hit in hits], [Tip.objects.get(user=self.user).id])
+
+    def test_rows_are_matched_to_their_ids_by_tag(self):
+        import io
+        import uuid
+        from unittest import mock
+
+        from . import importer
+        from .models import ChangeLogEntry
+
+        new_key = uuid.uuid4
+
+        def interleaved():
+            # Another writer takes the next id between the chunk's bookkeeping and its INSERT.
+            if not Case.objects.filter(name='Concurrent').exists():
+                Case.objects.create(name='Concurrent', location='Elsewhere')
+            return new_key()
+
+        body = '\n'.join(f'{{"name": "Bulk {index}", "location": "Quay"}}' for index in range(3))
+        with mock.patch.object(importer.uuid, 'uuid4', side_effect=interleaved):
+            result = importer.import_stream('cases', io.BytesIO(body.encode()), 'ndjson')
+        self.assertEqual(result['created'], 3)
+        imported = set(Case.objects.filter(name__startswith='Bulk').values_list('id', flat=True))
+        concurrent = Case.objects.get(name='Concurrent').id
+        logged = set(ChangeLogEntry.objects.filter(resource='cases').values_list('object_id', flat=True))
+        self.assertTrue(imported <= logged)
+        # The concurrent row was saved normally; only the import must not claim it.
+        self.assertEqual(ChangeLogEntry.objects.filter(resource='cases', object_id=concurrent).count(), 1)
+        hits = self.client.get('/api/search', {'q': 'quay', 'type': 'case'}).json()['results']
+        self.assertEqual({hit['id'] for hit in hits}, imported)
+
+    def test_non_string_choices_fail_their_row_only(self):
+        body = '\n'.join(
+            [
+                '{"name": "Listed", "location": "Quay", "urgency": ["High"]}',
+                '{"name": "Nested", "location": "Quay", "status": {"value": "Active"}}',
+                '{"name": "Plain", "location": "Quay", "urgency": "High"}',
+            ]
+        )
+        result = self.client.post('/api/import/cases', body, content_type='application/x-ndjson').json()
+        self.assertEqual((result['created'], result['failed']), (1, 2))
+        self.assertEqual([set(error['errors']) for error in result['errors']], [{'urgency'}, {'status'}])
+        self.assertEqual(Case.objects.get().name, 'Plain')
+
+    def test_csv_cases_import_requires_authentication(self):
+        body = 'name,location,age,urgency\nAsha,Harbour,12,High\nBad,Pier,old,Urgent\n'
+        self.assertEqual(
+            APIClient().post('/api/import/cases', body, content_type='text/csv').status_code,
+            401,
+        )
+        result = self.client.post('/api/import/cases', body, content_type='text/csv').json()
+        self.assertEqual((result['created'], result['failed']), (1, 1))
+        self.assertEqual(set(result['errors'][0]['errors']), {'age', 'urgency'})
+        self.assertEqual(Case.objects.get().urgency, Case.URGENCY_HIGH)
+
+
+class BatchTipVerifyTest(TestCase):
+    def test_batch_verifies_once_and_awards_points_per_user(self):
+        user = User.objects.create_user(username='helper', password='pass')
+        case = Case.objects.create(name='Batch', location='Here')
+        tips = [Tip.objects.create(case=case, user=user, content=f'Tip {index}') for index in range(3)]
+        done = Tip.objects.create(case=case, content='Old', verified=True)
+
+        response = APIClient().post(
+            '/api/tips/verify',
+            {'ids': [tip.id for tip in tips] + [done.id, 999999]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(sorted(body['verified']), sorted(tip.id for tip in tips))
+        self.assertEqual(body['already_verified'], [done.id])
+        self.assertEqual(body['not_found'], [999999])
+        self.assertEqual(body['points_awarded'], {str(user.id): 30})
+
+        case.refresh_from_db()
+        self.assertEqual(case.verified_tip_count, 3)
+        self.assertEqual(HonourProfile.objects.get(user=user).score, 30)
+
+        again = APIClient().post('/api/tips/verify', {'ids': [tips[0].id]}, format='json').json()
+        self.assertEqual((again['verified'], again['points_awarded']), ([], {}))
+        self.assertEqual(HonourProfile.objects.get(user=user).score, 30)
+
+
+class PointsLedgerTest(TestCase):
+    def test_awards_are_idempotent_per_source_and_materialize_from_the_ledger(self):
+        from . import points
+        from .models import PointsTransaction
+
+        user = User.objects.create_user(username='ledger', password='pass')
+        reason = PointsTransaction.REASON_TIP_VERIFIED
+        self.assertEqual(points.award(user.id, 60, reason, source_key='tip:1'), (60, []))
+        self.assertIsNone(points.award(user.id, 60, reason, source_key='tip:1'))
+        applied = points.award_many(
+            [(user.id, 30, reason, 'tip:1'), (user.id, 30, reason, 'tip:2'), (user.id, 30, reason, 'tip:3')]
+        )
+        self.assertEqual(applied, {user.id: (120, ['Bronze Rescuer'])})
+        self.assertEqual(PointsTransaction.objects.filter(user=user).count(), 3)
+
+        HonourProfile.objects.filter(user=user).update(score=0)
+        points.materialize()
+        self.assertEqual(HonourProfile.objects.get(user=user).score, 120)
+
+    def test_set_mode_records_the_exact_delta(self):
+        from . import points
+
+        user = User.objects.create_user(username='admin-set', password='pass')
+        client = APIClient()
+        client.post(f'/api/users/{user.id}/points', {'points': 40}, format='json')
+        response = client.post(f'/api/users/{user.id}/points', {'points': 10, 'mode': 'set'}, format='json')
+        self.assertEqual(response.json()['score'], 10)
+        self.assertEqual(points.balance(user.id), 10)
+
+
+class RedemptionReservationTest(TestCase):
+    def test_pending_requests_hold_points_until_reviewed(self):
+        from .models import Reward, RewardRedemption, UserCoupon
+
+        user = User.objects.create_user(username='saver', password='pass')
+        HonourProfile.objects.create(user=user, score=100)
+        reward = Reward.objects.create(name='Voucher', points_required=60)
+        client = APIClient()
+        redeem = f'/api/rewards/{reward.id}/redeem'
+
+        first = client.post(redeem, {'userId': user.id}, format='json')
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(first.json()['reserved_points'], 60)
+        # Only 40 points are spendable while the first request is pending.
+        self.assertEqual(client.post(redeem, {'userId': user.id}, format='json').status_code, 400)
+        self.assertEqual(RewardRedemption.objects.count(), 1)
+
+        from django.core.cache import cache
+
+        from . import stats
+
+        cache.delete(stats.CACHE_KEY)
+        self.assertEqual(stats.get_stats()['rewards']['pending_redemptions'], 1)
+        review = f"/api/rewards/redemptions/{first.json()['id']}/review"
+        with self.captureOnCommitCallbacks(execute=True):
+            client.patch(review, {'status': RewardRedemption.STATUS_REJECTED}, format='json')
+        self.assertEqual(HonourProfile.objects.get(user=user).reserved_points, 0)
+        self.assertEqual(stats.get_stats()['rewards']['pending_redemptions'], 0)
+
+        second = client.post(redeem, {'userId': user.id}, format='json').json()
+        review = f"/api/rewards/redemptions/{second['id']}/review"
+        approve = {'status': RewardRedemption.STATUS_APPROVED}
+        self.assertEqual(client.patch(review, approve, format='json').status_code, 200)
+        self.assertEqual(client.patch(review, approve, format='json').status_code, 409)
+
+        profile = HonourProfile.objects.get(user=user)
+        self.assertEqual((profile.score, profile.reserved_points), (40, 0))
+        self.assertEqual(UserCoupon.objects.filter(user=user).count(), 1)
+
+
+class CouponExpiryTest(TestCase):
+    def test_sweeper_expires_due_coupons_in_batches_and_listing_hides_lapsed_ones(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from . import coupons
+        from .models import Reward, UserCoupon
+
+        user = User.objects.create_user(username='holder', password='pass')
+        reward = Reward.objects.create(name='Voucher', points_required=10)
+        now = timezone.now()
+        lapsed = [
+            UserCoupon.objects.create(user=user, reward=reward, expiry_date=now - timedelta(days=day))
+            for day in (1, 2, 3)
+        ]
+        live = UserCoupon.objects.create(user=user, reward=reward, expiry_date=now + timedelta(days=1))
+        UserCoupon.objects.create(user=user, reward=reward)
+
+        client = APIClient()
+        listing = client.get(f'/api/users/{user.id}/coupons', {'status': 'active'}).json()['results']
+        self.assertEqual(len(listing), 2)
+        listing = client.get(f'/api/users/{user.id}/coupons', {'status': 'expired'}).json()['results']
+        self.assertEqual({row['status'] for row in listing}, {UserCoupon.STATUS_EXPIRED})
+        self.assertEqual(len(listing), 3)
+
+        self.assertEqual(coupons.expire_due(batch_size=2), 3)
+        self.assertEqual(coupons.expire_due(), 0)
+        statuses = dict(UserCoupon.objects.values_list('id', 'status'))
+        self.assertEqual({statuses[coupon.id] for coupon in lapsed}, {UserCoupon.STATUS_EXPIRED})
+        self.assertEqual(statuses[live.id], UserCoupon.STATUS_ACTIVE)
+
+
+class LeaderboardTest(TestCase):
+    def setUp(self):
+        from . import leaderboard
+
+        self.users = []
+        for name, score in [('ana', 50), ('ben', 30), ('cy', 30), ('dee', 10)]:
+            user = User.objects.create_user(username=name, password='pass')
+            HonourProfile.objects.create(user=user, score=score)
+            self.users.append(user)
+        leaderboard.invalidate()
+        self.client = APIClient()
+
+    def test_pages_by_position_with_competition_ranks(self):
+        body = self.client.get('/api/leaderboard', {'start': 2, 'limit': 2}).json()
+        self.assertEqual(body['total'], 4)
+        self.assertEqual([entry['name'] for entry in body['results']], ['ben', 'cy'])
+        self.assertEqual([entry['rank'] for entry in body['results']], [2, 2])
+        self.assertEqual(body['next_start'], 4)
+        self.assertEqual(self.client.get('/api/leaderboard', {'start': 4}).json()['next_start'], None)
+
+    def test_rank_with_neighbours(self):
+        body = self.client.get(f'/api/leaderboard/users/{self.users[2].id}', {'neighbours': 1}).json()
+        self.assertEqual((body['user']['rank'], body['user']['position']), (2, 3))
+        self.assertEqual([entry['name'] for entry in body['above']], ['ben'])
+        self.assertEqual([entry['name'] for entry in body['below']], ['dee'])
+
+    def test_index_follows_score_changes(self):
+        from . import leaderboard, points
+        from .models import PointsTransaction
+
+        with self.captureOnCommitCallbacks(execute=True):
+            points.award(self.users[3].id, 45, PointsTransaction.REASON_ADJUSTMENT)
+        index = leaderboard.get_index()
+        self.assertEqual(index.count_above(50), 1)
+        self.assertEqual(index.score_at(2), 50)
+
+
+class MedalRuleTest(TestCase):
+    def setUp(self):
+        from django.core.cache import cache
+
+        cache.clear()
+
+    def test_tip_medal_is_granted_when_the_count_crosses_its_threshold(self):
+        from .models import MedalRule
+
+        MedalRule.objects.create(name='Tipster', metric=MedalRule.METRIC_VERIFIED_TIPS, threshold=2)
+        user = User.objects.create_user(username='tipper', password='pass')
+        case = Case.objects.create(name='Medal', location='Here')
+        first, second = (Tip.objects.create(case=case, user=user, content=str(index)) for index in range(2))
+
+        APIClient().put(f'/api/tips/{first.id}/verify')
+        self.assertEqual(HonourProfile.objects.get(user=user).medals, [])
+        APIClient().put(f'/api/tips/{second.id}/verify')
+        profile = HonourProfile.objects.get(user=user)
+        self.assertEqual((profile.verified_tip_count, profile.medals), (2, ['Tipster']))
+
+    def test_bulk_reevaluation_grants_and_revokes_with_rule_changes(self):
+        from . import medals
+        from .models import MedalRule
+
+        keen, casual = (User.objects.create_user(username=name, password='pass') for name in ('keen', 'casual'))
+        HonourProfile.objects.create(user=keen, score=60)
+        HonourProfile.objects.create(user=casual, score=20)
+        rule = MedalRule.objects.create(name='Regular', metric=MedalRule.METRIC_SCORE, threshold=50)
+
+        self.assertEqual(medals.reevaluate(), (1, 0))
+        self.assertEqual(HonourProfile.objects.get(user=keen).medals, ['Regular'])
+
+        rule.threshold = 10
+        rule.save()
+        self.assertEqual(medals.reevaluate(rule_ids=[rule.id]), (1, 0))
+        rule.threshold = 80
+        rule.save()
+        self.assertEqual(medals.reevaluate(revoke=True), (0, 2))
+        self.assertEqual(HonourProfile.objects.get(user=casual).medals, [])
+
+
+class LoginIdentifierTest(TestCase):
+    def test_login_resolves_any_identifier_with_one_lookup(self):
+        from .models import LoginIdentifier
+
+        client = APIClient()
+        response = client.post(
+            '/api/auth/register',
+            {'username': 'Mira', 'phone': '0712345678', 'password': 'secret-pass'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            client.post('/api/auth/register', {'username': 'mira', 'email': 'x@y.z', 'password': 'p'}, format='json').json(),
+            {'detail': 'Username already exists'},
+        )
+
+        for body in ({'username': 'MIRA'}, {'email': '0712345678@Phone.local'}, {'phone': '0712 345 678'}):
+            with self.assertNumQueries(1):
+                response = client.post('/api/auth/login', dict(body, password='secret-pass'), format='json')
+            self.assertEqual(response.json()['username'], 'Mira')
+        self.assertEqual(client.post('/api/auth/login', {'phone': '0712345678', 'password': 'x'}).status_code, 401)
+
+        user = User.objects.get(username='Mira')
+        user.email = 'mira@example.com'
+        user.save()
+        kinds = set(LoginIdentifier.objects.filter(user=user).values_list('kind', 'value'))
+        self.assertEqual(kinds, {('username', 'mira'), ('email', 'mira@example.com')})
+
+
+class SignedTokenTest(TestCase):
+    def test_tokens_authenticate_without_a_user_query_refresh_and_revoke(self):
+        from .models import Reward
+
+        client = APIClient()
+        issued = client.post(
+            '/api/auth/register',
+            {'username': 'tokened', 'email': 't@example.com', 'password': 'secret-pass'},
+            format='json',
+        ).json()
+        user_id = issued['id']
+        HonourProfile.objects.filter(user_id=user_id).update(score=50)
+        reward = Reward.objects.create(name='Badge', points_required=20)
+
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {issued['accessToken']}")
+        with self.assertNumQueries(0):
+            self.assertEqual(client.get('/api/health').status_code, 200)
+        response = client.post(f'/api/rewards/{reward.id}/redeem', {}, format='json')
+        self.assertEqual(response.json()['userId'], user_id)
+        response = client.post(f'/api/rewards/{reward.id}/redeem', {'userId': user_id + 1}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+        refreshed = client.post('/api/auth/refresh', {'refreshToken': issued['refreshToken']}, format='json')
+        self.assertEqual(refreshed.status_code, 200)
+        self.assertEqual(
+            client.post('/api/auth/refresh', {'refreshToken': issued['refreshToken']}, format='json').status_code,
+            401,
+        )
+        client.post('/api/auth/logout', {'refreshToken': refreshed.json()['refreshToken']}, format='json')
+        self.assertEqual(client.get('/api/health').status_code, 401)
+
+        client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(client.get('/api/health').status_code, 401)
+
+
+class ThrottleTest(TestCase):
+    def test_token_bucket_refills_and_answers_429_with_retry_after(self):
+        from django.conf import settings
+
+        from . import throttling
+
+        store = throttling.InMemoryBucketStore()
+        results = [store.consume('k', 2, 1.0, now=0) for _ in range(3)]
+        self.assertEqual(results, [0, 0, 1.0])
+        self.assertEqual(store.consume('k', 2, 1.0, now=1), 0)
+
+        throttling.get_store().clear()
+        rates = dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={'auth': '2/min'})
+        with override_settings(REST_FRAMEWORK=rates):
+            client = APIClient()
+            body = {'username': 'nobody', 'password': 'wrong'}
+            statuses = [client.post('/api/auth/login', body, format='json').status_code for _ in range(3)]
+            self.assertEqual(statuses, [401, 401, 429])
+            response = client.post('/api/auth/login', body, format='json')
+            self.assertIn(int(response['Retry-After']), range(1, 31))
+            # Other clients keep their own budget.
+            other = client.post('/api/auth/login', body, format='json', REMOTE_ADDR='10.0.0.9')
+            self.assertEqual(other.status_code, 401)
+
+    def test_voice_endpoints_have_their_own_budgets(self):
+        from django.conf import settings
+
+        from . import throttling
+
+        throttling.get_store().clear()
+        scopes = {'voice_report': '1/min', 'tts': '1/min', 'speech': '1/min'}
+        with override_settings(REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=scopes)):
+            client = APIClient()
+            self.assertEqual(client.post('/api/voice/parse', {}, format='json').status_code, 400)
+            self.assertEqual(client.post('/api/voice/parse', {}, format='json').status_code, 429)
+            self.assertEqual(client.post('/api/voice/text-to-speech', {}, format='json').status_code, 400)
+            self.assertNotEqual(client.post('/api/voice/speech-recognition', {}, format='json').status_code, 429)
+
+    def test_idle_buckets_are_swept_in_amortized_batches(self):
+        from unittest import mock
+
+        from . import throttling
+
+        with mock.patch.object(throttling, 'MAX_TRACKED_BUCKETS', 4):
+            store = throttling.InMemoryBucketStore()
+            for key in range(5):
+                store.consume(key, 2, 1.0, now=0)
+            # Every bucket was busy, so the sweep kept them and waits for the dict to double.
+            self.assertEqual(len(store._buckets), 5)
+            for key in range(5, 10):
+                store.consume(key, 2, 1.0, now=100)
+            self.assertEqual(len(store._buckets), 10)
+            store.consume(10, 2, 1.0, now=100)
+            self.assertEqual(sorted(store._buckets), list(range(5, 11)))
+
+
+class ImageRenditionTest(TestCase):
+    def test_upload_is_rendered_upright_without_metadata(self):
+        import io
+        import shutil
+        import tempfile
+
+        from django.core.files.base import ContentFile
+        from PIL import Image
+
+        from . import renditions
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        # 2000x1000 landscape pixels whose EXIF says to rotate them upright into portrait.
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x010F] = 'Camera'
+        buffer = io.BytesIO()
+        Image.new('RGB', (2000, 1000), 'red').save(buffer, 'JPEG', exif=exif)
+
+        with override_settings(MEDIA_ROOT=media, IMAGE_RENDITION_WORKERS=0):
+            with self.captureOnCommitCallbacks(execute=True):
+                case = Case.objects.create(name='Photo', location='Here')
+                case.photo.save('child.jpg', ContentFile(buffer.getvalue()))
+            case.refresh_from_db()
+            self.assertEqual(case.renditions['source'], case.photo.name)
+            self.assertEqual((case.renditions['medium']['width'], case.renditions['medium']['height']), (640, 1280))
+            self.assertEqual((case.renditions['thumb']['width'], case.renditions['thumb']['height']), (160, 320))
+            with case.photo.storage.open(case.renditions['thumb']['jpeg']) as thumb:
+                self.assertEqual(len(Image.open(thumb).getexif()), 0)
+            self.assertIsNone(renditions.generate(Case, case.id))
+
+            exposed = CaseSerializer(case).data['renditions']
+            self.assertTrue(exposed['thumb']['webp'].endswith('.webp'))
+            read = CaseReadSerializer.render(CaseReadSerializer.values(Case.objects.filter(id=case.id)))
+            self.assertEqual(read[0]['renditions'], exposed)
+
+    def test_renditions_of_a_replaced_image_are_released(self):
+        import io
+        import shutil
+        import tempfile
+        from unittest import mock
+
+        from django.core.files.base import ContentFile
+        from PIL import Image, ImageOps
+
+        from . import renditions
+        from .models import MediaBlob
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        buffer = io.BytesIO()
+        Image.new('RGB', (400, 300), 'red').save(buffer, 'JPEG')
+        transpose = ImageOps.exif_transpose
+
+        with override_settings(MEDIA_ROOT=media, IMAGE_RENDITION_WORKERS=0):
+            case = Case.objects.create(name='Photo', location='Here')
+            case.photo.save('child.jpg', ContentFile(buffer.getvalue()))
+            storage = case.photo.storage
+            save = storage.save
+            saved = []
+
+            def replace_while_rendering(image):
+                Case.objects.filter(id=case.id).update(photo='replaced.jpg')
+                return transpose(image)
+
+            def record(*args, **kwargs):
+                saved.append(save(*args, **kwargs))
+                return saved[-1]
+
+            with mock.patch.object(renditions.ImageOps, 'exif_transpose', replace_while_rendering):
+                with mock.patch.object(storage, 'save', record):
+                    with self.captureOnCommitCallbacks(execute=True):
+                        self.assertIsNone(renditions.generate(Case, case.id))
+            self.assertEqual(len(saved), 4)
+            self.assertFalse(MediaBlob.objects.filter(name__in=saved).exists())
+            self.assertFalse(any(storage.exists(path) for path in saved))
+
+
+class MediaBlobTest(TestCase):
+    def test_duplicate_uploads_share_one_counted_blob(self):
+        import io
+        import shutil
+        import tempfile
+
+        from django.core.files.base import ContentFile
+        from PIL import Image
+
+        from .models import MediaBlob
+
+        def png(colour):
+            buffer = io.BytesIO()
+            Image.new('RGB', (4, 4), colour).save(buffer, 'PNG')
+            return buffer.getvalue()
+
+        same = png('red')
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        with override_settings(MEDIA_ROOT=media, IMAGE_RENDITION_WORKERS=0):
+            first = Case.objects.create(name='First', location='Here')
+            first.photo.save('a.png', ContentFile(same))
+            second = Case.objects.create(name='Second', location='There')
+            second.photo.save('b.PNG', ContentFile(same))
+            tip = Tip.objects.create(case=first, content='Seen')
+            tip.attachment.save('c.png', ContentFile(same))
+
+            self.assertEqual(first.photo.name, second.photo.name)
+            self.assertEqual(first.photo.name, tip.attachment.name)
+            self.assertTrue(first.photo.name.startswith('blobs/'))
+            blob = MediaBlob.objects.get()
+            self.assertEqual((blob.references, blob.size), (3, len(same)))
+
+            storage = first.photo.storage
+            with self.captureOnCommitCallbacks(execute=True):
+                Case.objects.get(id=second.id).delete()
+                replaced = Tip.objects.get(id=tip.id)
+                replaced.attachment.save('d.png', ContentFile(png('blue')))
+            self.assertEqual(MediaBlob.objects.get(name=blob.name).references, 1)
+            self.assertTrue(storage.exists(blob.name))
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Case.objects.get(id=first.id).delete()
+            self.assertFalse(MediaBlob.objects.filter(name=blob.name).exists())
+            self.assertFalse(storage.exists(blob.name))
+
+
+class ResumableUploadTest(TestCase):
+    def test_chunks_resume_from_the_stored_offset_and_attach_once(self):
+        import io
+        import shutil
+        import tempfile
+
+        from PIL import Image
+
+        from .models import UploadSession
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 64), 'green').save(buffer, 'PNG')
+        data = buffer.getvalue()
+        half = len(data) // 2
+
+        with override_settings(MEDIA_ROOT=f'{root}/media', UPLOAD_SESSION_DIR=f'{root}/sessions'):
+            client = APIClient()
+            session = client.post('/api/uploads', {'filename': 'sighting.png', 'size': len(data)}, format='json')
+            self.assertEqual(session.status_code, 201)
+            url = f"/api/uploads/{session.json()['id']}"
+
+            def put(offset, chunk):
+                return client.generic(
+                    'PUT', url, chunk, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+                )
+
+            self.assertEqual(put(0, data[:half]).json()['offset'], half)
+            # A retried chunk at a stale offset is refused and told where to resume.
+            stale = put(0, data[:half])
+            self.assertEqual((stale.status_code, stale.json()['offset']), (409, half))
+            self.assertEqual(client.post(f'{url}/complete').status_code, 409)
+            self.assertEqual(put(half, data[half:]).json()['offset'], len(data))
+            self.assertEqual(client.post(f'{url}/complete').json()['status'], UploadSession.STATUS_COMPLETE)
+
+            upload_id = session.json()['id']
+            response = client.post('/api/cases', {'name': 'Uploaded', 'location': 'Here', 'uploadId': upload_id})
+            self.assertEqual(response.status_code, 201)
+            case = Case.objects.get(id=response.json()['id'])
+            with case.photo.open('rb') as photo:
+                self.assertEqual(photo.read(), data)
+
+            again = client.post('/api/cases', {'name': 'Again', 'location': 'Here', 'uploadId': upload_id})
+            self.assertEqual(again.status_code, 400)
+            self.assertIn('uploadId', again.json())
+
+    def test_losing_writer_never_touches_the_file(self):
+        import io
+        import shutil
+        import tempfile
+
+        from . import uploads
+        from .models import UploadSession
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        with override_settings(UPLOAD_SESSION_DIR=root):
+            session = uploads.create('sighting.png', 8)
+            uploads.write(session, 0, io.BytesIO(b'abcd'), 4)
+            # A second request for offset 0 that loaded the session before the first one stored its offset.
+            stale = UploadSession.objects.get(pk=session.pk)
+            stale.received = 0
+            with self.assertRaises(uploads.OffsetMismatch):
+                uploads.write(stale, 0, io.BytesIO(b'WXYZ'), 4)
+            self.assertEqual(uploads.path_of(session).read_bytes(), b'abcd')
+
+    def test_upload_moved_by_a_rolled_back_claim_is_not_found(self):
+        import io
+        import shutil
+        import tempfile
+
+        from django.db import transaction
+        from PIL import Image
+        from rest_framework.exceptions import ValidationError
+
+        from . import uploads
+
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        buffer = io.BytesIO()
+        Image.new('RGB', (8, 8), 'green').save(buffer, 'PNG')
+        data = buffer.getvalue()
+        with override_settings(MEDIA_ROOT=f'{root}/media', UPLOAD_SESSION_DIR=f'{root}/sessions'):
+            session = uploads.create('sighting.png', len(data))
+            uploads.write(session, 0, io.BytesIO(data), len(data))
+            uploads.complete(session)
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    Case.objects.create(name='Rolled back', location='Here', photo=uploads.claim(session.id))
+                    raise RuntimeError
+            with self.assertRaises(ValidationError) as raised:
+                uploads.claim(session.id)
+            self.assertEqual(raised.exception.detail, {'uploadId': 'Upload not found.'})
+
+
+class MediaDeliveryTest(TestCase):
+    def test_validators_ranges_and_offloading(self):
+        import shutil
+        import tempfile
+
+        from django.core.files.base import ContentFile
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        with override_settings(MEDIA_ROOT=media):
+            case = Case.objects.create(name='Served', location='Here')
+            case.photo.save('served.bin', ContentFile(b'0123456789'))
+            url = f'/media/{case.photo.name}'
+
+            full = self.client.get(url)
+            self.assertEqual(b''.join(full.streaming_content), b'0123456789')
+            self.assertIn('immutable', full.headers['Cache-Control'])
+            etag = full.headers['ETag']
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+            part = self.client.get(url, HTTP_RANGE='bytes=2-4')
+            self.assertEqual((part.status_code, part.headers['Content-Range']), (206, 'bytes 2-4/10'))
+            self.assertEqual(b''.join(part.streaming_content), b'234')
+            self.assertEqual(b''.join(self.client.get(url, HTTP_RANGE='bytes=-3').streaming_content), b'789')
+            self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=20-').status_code, 416)
+            stale = self.client.get(url, HTTP_RANGE='bytes=2-4', HTTP_IF_RANGE='"other"')
+            self.assertEqual(stale.status_code, 200)
+
+            with override_settings(MEDIA_SENDFILE='x-accel-redirect'):
+                offloaded = self.client.get(url)
+            self.assertEqual(offloaded.headers['X-Accel-Redirect'], f'/protected-media/{case.photo.name}')
+            self.assertEqual(offloaded.content, b'')
+            self.assertEqual(self.client.get('/media/../config/settings.py').status_code, 404)
+
+
+class TaskQueueTest(TestCase):
+    def test_failures_back_off_then_go_dead_and_claims_are_exclusive(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from . import tasks
+        from .models import Task
+
+        calls = []
+
+        def flaky(value):
+            calls.append(value)
+            raise RuntimeError('smtp down')
+
+        tasks.register('test.flaky', flaky, max_attempts=2)
+        self.addCleanup(tasks._registry.pop, 'test.flaky', None)
+        task = tasks.enqueue('test.flaky', {'value': 7})
+
+        claimed = tasks.claim('one')
+        self.assertEqual([row.id for row in claimed], [task.id])
+        self.assertEqual(tasks.claim('two'), [])
+        self.assertFalse(tasks.run(claimed[0], 'one'))
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts), (Task.STATUS_PENDING, 1))
+        self.assertGreater(task.run_at, timezone.now())
+        self.assertIn('smtp down', task.last_error)
+        self.assertEqual(tasks.work('one'), 0)
+
+        Task.objects.filter(id=task.id).update(run_at=timezone.now())
+        self.assertEqual(tasks.work('one'), 1)
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, calls), (Task.STATUS_DEAD, 2, [7, 7]))
+
+        # A worker that died mid-task loses its lease to the next one.
+        tasks.retry(Task.objects.filter(id=task.id))
+        tasks.claim('crashed')
+        Task.objects.filter(id=task.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([row.locked_by for row in tasks.claim('next')], ['next'])
+
+    def test_task_that_crashes_its_worker_goes_dead_after_the_last_attempt(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from . import tasks
+        from .models import Task
+
+        tasks.register('test.crash', lambda: None, max_attempts=2)
+        self.addCleanup(tasks._registry.pop, 'test.crash', None)
+        task = tasks.enqueue('test.crash')
+        for worker in ('first', 'second'):
+            self.assertEqual([row.id for row in tasks.claim(worker)], [task.id])
+            # The worker dies without reporting back; its lease runs out.
+            Task.objects.filter(id=task.id).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(tasks.claim('third'), [])
+        task.refresh_from_db()
+        self.assertEqual((task.status, task.attempts, task.locked_by), (Task.STATUS_DEAD, 2, ''))
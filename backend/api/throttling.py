@@ -0,0 +1,161 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+# The in-memory store sweeps idle buckets once it tracks this many clients,
+# then not again until the survivors have doubled.
+MAX_TRACKED_BUCKETS = 100_000
+
+
+class InMemoryBucketStore:
+    """Token buckets held in this process; budgets are per worker, not per deployment."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._sweep_at = MAX_TRACKED_BUCKETS
+
+    def consume(self, key, capacity, refill_rate, now=None):
+        """
+        Take one token from `key`'s bucket, refilled at `refill_rate` tokens a
+        second up to `capacity`. Returns 0 when allowed, otherwise the seconds
+        until a token is available.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            wait = 0 if tokens >= 1 else (1 - tokens) / refill_rate
+            if not wait:
+                tokens -= 1
+            # Past `full_at` the bucket has refilled, which is the same as having no bucket.
+            full_at = now + (capacity - tokens) / refill_rate
+            self._buckets[key] = (tokens, now, full_at)
+            if len(self._buckets) > self._sweep_at:
+                self._buckets = {key: state for key, state in self._buckets.items() if state[2] > now}
+                # With many busy clients a sweep frees little; waiting for the dict to double
+                # keeps its cost amortized instead of scanning on every request.
+                self._sweep_at = max(MAX_TRACKED_BUCKETS, 2 * len(self._buckets))
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self._sweep_at = MAX_TRACKED_BUCKETS
+
+
+class RedisBucketStore:
+    """
+    Token buckets in Redis (THROTTLE_REDIS_URL), shared by every worker and
+    node. The refill-and-take runs as one Lua script, so concurrent requests
+    never spend the same token twice.
+    """
+
+    SCRIPT = """
+    local capacity = tonumber(ARGV[1])
+    local rate = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local tokens = tonumber(state[1]) or capacity
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+    redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self):
+        import redis
+
+        url = getattr(settings, 'THROTTLE_REDIS_URL', '')
+        if not url:
+            raise ImproperlyConfigured('RedisBucketStore needs THROTTLE_REDIS_URL.')
+        self._script = redis.Redis.from_url(url).register_script(self.SCRIPT)
+
+    def consume(self, key, capacity, refill_rate, now=None):
+        now = time.time() if now is None else now
+        return float(self._script(keys=[f'throttle:{key}'], args=[capacity, refill_rate, now]))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = getattr(settings, 'THROTTLE_STORE', 'api.throttling.InMemoryBucketStore')
+                _store = import_string(path)()
+    return _store
+
+
+def parse_rate(rate):
+    """'20/min' -> (capacity 20, refill 20/60 tokens per second)."""
+    count, _, period = rate.partition('/')
+    count = int(count)
+    return count, count / PERIODS[period]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token-bucket throttle with one budget per `scope`, taken from
+    `DEFAULT_THROTTLE_RATES`. Signed-in clients are counted by user id, the
+    rest by client address, so one client cannot spend another's budget.
+    Over budget, DRF answers 429 with a Retry-After header.
+    """
+
+    scope = None
+
+    def allow_request(self, request, view):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if not rate:
+            return True
+        capacity, refill_rate = parse_rate(rate)
+        self.delay = get_store().consume(self.cache_key(request), capacity, refill_rate)
+        return self.delay <= 0
+
+    def cache_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f'{self.scope}:user:{request.user.pk}'
+        return f'{self.scope}:ip:{self.get_ident(request)}'
+
+    def wait(self):
+        return self.delay
+
+
+class AuthThrottle(TokenBucketThrottle):
+    scope = 'auth'
+
+
+class AIThrottle(TokenBucketThrottle):
+    scope = 'ai'
+
+
+class VoiceReportThrottle(TokenBucketThrottle):
+    scope = 'voice_report'
+
+
+class TextToSpeechThrottle(TokenBucketThrottle):
+    scope = 'tts'
+
+
+class SpeechRecognitionThrottle(TokenBucketThrottle):
+    scope = 'speech'
+
+
+class SightingThrottle(TokenBucketThrottle):
+    scope = 'sightings'
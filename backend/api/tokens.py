@@ -0,0 +1,76 @@
+import uuid
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+DEFAULT_LIFETIMES = {ACCESS: 15 * 60, REFRESH: 30 * 24 * 60 * 60}
+# One salt per kind, so a refresh token is never accepted as an access token.
+SALTS = {ACCESS: 'api.tokens.access', REFRESH: 'api.tokens.refresh'}
+REVOKED_KEY = 'api:revoked-token:{}'
+
+ROLE_ADMIN = 'admin'
+ROLE_USER = 'user'
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def lifetime(kind):
+    setting = 'ACCESS_TOKEN_SECONDS' if kind == ACCESS else 'REFRESH_TOKEN_SECONDS'
+    return getattr(settings, setting, DEFAULT_LIFETIMES[kind])
+
+
+def role_of(user):
+    return ROLE_ADMIN if user.is_staff else ROLE_USER
+
+
+def issue(user):
+    """A fresh access/refresh pair carrying the user's id and role."""
+    claims = {'uid': user.id, 'role': role_of(user)}
+    return {
+        'accessToken': _sign(ACCESS, claims),
+        'refreshToken': _sign(REFRESH, claims),
+        'expiresIn': lifetime(ACCESS),
+    }
+
+
+def _sign(kind, claims):
+    return signing.dumps(dict(claims, jti=uuid.uuid4().hex), salt=SALTS[kind], compress=True)
+
+
+def decode(token, kind=ACCESS):
+    """
+    Verify `token` and return its claims. Only the signature, age and (when
+    enabled) the revocation cache are consulted; the database never is.
+    """
+    try:
+        claims = signing.loads(token, salt=SALTS[kind], max_age=lifetime(kind))
+    except signing.SignatureExpired:
+        raise InvalidToken('Token has expired.')
+    except signing.BadSignature:
+        raise InvalidToken('Token is invalid.')
+    if revocation_enabled() and cache.get(REVOKED_KEY.format(claims['jti'])):
+        raise InvalidToken('Token has been revoked.')
+    return claims
+
+
+def revocation_enabled():
+    return getattr(settings, 'AUTH_TOKEN_REVOCATION', True)
+
+
+def revoke(token, kind=ACCESS):
+    """Refuse `token` from now on. Entries outlive the token, then drop out of the cache."""
+    try:
+        claims = signing.loads(token, salt=SALTS[kind], max_age=lifetime(kind))
+    except signing.BadSignature:
+        return
+    revoke_claims(claims, kind)
+
+
+def revoke_claims(claims, kind=ACCESS):
+    if revocation_enabled():
+        cache.set(REVOKED_KEY.format(claims['jti']), True, lifetime(kind))
@@ -0,0 +1,183 @@
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+from rest_framework import status
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+
+from .models import UploadSession
+
+READ_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = 25 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+
+
+class OffsetMismatch(APIException):
+    """The chunk does not start where the upload left off; the body says where that is."""
+
+    status_code = status.HTTP_409_CONFLICT
+
+    def __init__(self, session, message='Chunk does not start at the current offset.'):
+        super().__init__(message)
+        # Kept as a number, unlike the strings APIException makes of detail values.
+        self.detail = {'detail': self.detail, 'offset': session.received}
+
+
+class FinishedUpload(File):
+    """A completed upload handed to a file field. Storage moves it into place instead of copying it."""
+
+    def __init__(self, path, name):
+        super().__init__(open(path, 'rb'), name)
+        self.path = path
+
+    def temporary_file_path(self):
+        return str(self.path)
+
+
+def max_bytes():
+    return getattr(settings, 'UPLOAD_SESSION_MAX_BYTES', DEFAULT_MAX_BYTES)
+
+
+def path_of(session):
+    return Path(settings.UPLOAD_SESSION_DIR) / session.id.hex
+
+
+def create(filename, size, user_id=None):
+    """Open a session for `size` bytes. Sessions of a signed-in user are only usable by that user."""
+    session = UploadSession.objects.create(filename=os.path.basename(filename), size=size, user_id=user_id)
+    path = path_of(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return session
+
+
+def get(upload_id, user_id=None):
+    ttl = getattr(settings, 'UPLOAD_SESSION_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+    session = UploadSession.objects.filter(
+        id=upload_id,
+        updated_at__gte=timezone.now() - timedelta(seconds=ttl),
+    ).first()
+    # Someone else's session looks the same as a missing one.
+    if session is None or (session.user_id is not None and session.user_id != user_id):
+        raise NotFound('Upload not found.')
+    return session
+
+
+def write(session, offset, stream, length):
+    """
+    Append `length` bytes read from `stream` at `offset`, straight to the
+    session's file in small reads. The session row stays locked until the
+    new offset is stored, so a second request for the same offset waits and
+    is then refused before it touches the file. If the connection drops
+    mid-chunk, the bytes that did arrive are kept and the client resumes
+    from there.
+    """
+    dropped = None
+    with transaction.atomic():
+        locked = UploadSession.objects.select_for_update().filter(pk=session.pk)
+        session.status, session.received = locked.values_list('status', 'received').get()
+        if session.status != UploadSession.STATUS_OPEN:
+            raise OffsetMismatch(session, 'Upload is already complete.')
+        if offset != session.received:
+            raise OffsetMismatch(session)
+        if not length:
+            raise ValidationError({'detail': 'Content-Length is required and must be positive.'})
+        if offset + length > session.size:
+            raise ValidationError({'detail': 'Chunk runs past the declared upload size.'})
+
+        written = 0
+        with open(path_of(session), 'r+b') as target:
+            target.seek(offset)
+            try:
+                while written < length:
+                    data = stream.read(min(READ_SIZE, length - written)) if stream else b''
+                    if not data:
+                        break
+                    target.write(data)
+                    written += len(data)
+            except OSError as exc:
+                # A dropped connection is an OSError too; it is re-raised once the bytes that arrived count.
+                dropped = exc
+            target.flush()
+            os.fsync(target.fileno())
+        if written:
+            session.received = offset + written
+            session.updated_at = timezone.now()
+            UploadSession.objects.filter(pk=session.pk).update(
+                received=session.received,
+                updated_at=session.updated_at,
+            )
+    if dropped is not None:
+        raise dropped
+    return session
+
+
+def complete(session):
+    """Close the upload once every byte is in and it decodes as an image."""
+    if session.status != UploadSession.STATUS_OPEN:
+        return session
+    if session.received != session.size:
+        raise OffsetMismatch(session, 'Upload is missing bytes.')
+    try:
+        with Image.open(path_of(session)) as image:
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise ValidationError({'detail': 'Upload is not a valid image.'})
+    UploadSession.objects.filter(pk=session.pk, status=UploadSession.STATUS_OPEN).update(
+        status=UploadSession.STATUS_COMPLETE,
+        updated_at=timezone.now(),
+    )
+    session.status = UploadSession.STATUS_COMPLETE
+    return session
+
+
+def claim(upload_id, user_id=None, field='uploadId'):
+    """
+    Use a completed upload as the file of the object being created in the
+    caller's transaction. Each upload can be claimed once; the partial file
+    is removed when the transaction commits.
+    """
+    try:
+        session = get(upload_id, user_id)
+    except NotFound:
+        raise ValidationError({field: 'Upload not found.'})
+    if session.status == UploadSession.STATUS_OPEN:
+        raise ValidationError({field: 'Upload is not complete.'})
+    if not path_of(session).exists():
+        # Moved into the media tree by a claim whose transaction then rolled back.
+        raise ValidationError({field: 'Upload not found.'})
+    claimed = UploadSession.objects.filter(pk=session.pk, status=UploadSession.STATUS_COMPLETE).update(
+        status=UploadSession.STATUS_CLAIMED,
+        updated_at=timezone.now(),
+    )
+    if not claimed:
+        raise ValidationError({field: 'Upload has already been used.'})
+    upload = FinishedUpload(path_of(session), session.filename)
+    transaction.on_commit(lambda: _remove(upload))
+    return upload
+
+
+def _remove(upload):
+    upload.close()
+    # Storage moved the file into place unless its content was already stored.
+    if os.path.exists(upload.path):
+        os.remove(upload.path)
+
+
+def purge(now=None):
+    """Delete sessions idle for longer than UPLOAD_SESSION_TTL_SECONDS, with their partial files."""
+    now = now or timezone.now()
+    ttl = getattr(settings, 'UPLOAD_SESSION_TTL_SECONDS', DEFAULT_TTL_SECONDS)
+    stale = UploadSession.objects.filter(updated_at__lt=now - timedelta(seconds=ttl))
+    purged = 0
+    for session in stale.iterator():
+        path = path_of(session)
+        if path.exists():
+            path.unlink()
+        purged += UploadSession.objects.filter(pk=session.pk, updated_at=session.updated_at).delete()[0]
+    return purged
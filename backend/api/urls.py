@@ -3,11 +3,22 @@ from . import views
 
 urlpatterns = [
     path('health', views.health, name='health'),
+    path('stats', views.dashboard_stats, name='dashboard-stats'),
+    path('events', views.event_stream, name='event-stream'),
+    path('search', views.search_records, name='search'),
+    path('changes', views.sync_changes, name='sync-changes'),
+    path('import/<str:kind>', views.bulk_import, name='bulk-import'),
     path('cases', views.list_cases, name='cases-list'),
     path('cases/<int:case_id>/status', views.update_case_status, name='case-status-update'),
     path('tips', views.tips_collection, name='tips-collection'),
+    path('tips/verify', views.verify_tips, name='tips-verify'),
     path('tips/<int:tip_id>/verify', views.verify_tip, name='tip-verify'),
+    path('uploads', views.upload_sessions, name='uploads'),
+    path('uploads/<uuid:upload_id>', views.upload_session, name='upload-session'),
+    path('uploads/<uuid:upload_id>/complete', views.complete_upload, name='upload-complete'),
     path('users', views.list_users, name='users-list'),
+    path('leaderboard', views.leaderboard_page, name='leaderboard'),
+    path('leaderboard/users/<int:user_id>', views.leaderboard_rank, name='leaderboard-rank'),
     path('users/<int:user_id>', views.user_profile, name='user-profile'),
     path('users/<int:user_id>/points', views.update_user_points, name='users-points'),
     path('users/<int:user_id>/coupons', views.user_coupons, name='user-coupons'),
@@ -17,6 +28,8 @@ urlpatterns = [
     path('rewards/redemptions/<int:redemption_id>/review', views.review_reward_redemption, name='reward-review'),
     path('auth/login', views.login, name='login'),
     path('auth/register', views.register, name='register'),
+    path('auth/refresh', views.refresh_token, name='token-refresh'),
+    path('auth/logout', views.logout, name='logout'),
     path('ai/chat', views.ai_chat, name='ai-chat'),
     path('voice/parse', views.parse_voice_report, name='voice-parse'),
     path('voice/text-to-speech', views.text_to_speech, name='text-to-speech'),
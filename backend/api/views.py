@@ -1,27 +1,55 @@
 import json
 import os
 import re
+from collections import Counter
 
 import requests
 from django.contrib.auth.models import User
-from django.contrib.auth import authenticate
+from django.core.handlers.asgi import ASGIRequest
 from django.db import IntegrityError
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.views.decorators.http import require_GET
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .models import Case, Tip, HonourProfile, Reward, RewardRedemption, UserCoupon
+from . import changes, counters, events, identifiers, importer, leaderboard, medals, points, redemptions, search, stats
+from . import tokens, uploads
+from .authentication import acting_user_id
+from .throttling import AIThrottle, AuthThrottle, SpeechRecognitionThrottle, TextToSpeechThrottle, VoiceReportThrottle
+from .filters import filter_cases, filter_coupons
+from .models import (
+    Case,
+    ChangeLogEntry,
+    Tip,
+    HonourProfile,
+    LoginIdentifier,
+    MedalRule,
+    PointsTransaction,
+    Reward,
+    RewardRedemption,
+    UserCoupon,
+)
+from .pagination import KeysetPagination
 from .serializers import (
+    CaseReadSerializer,
     CaseSerializer,
     CaseStatusUpdateSerializer,
     TipCreateSerializer,
+    TipReadSerializer,
     TipSerializer,
     RewardSerializer,
+    UploadSessionSerializer,
+    RewardRedemptionReadSerializer,
     RewardRedemptionSerializer,
     UserCouponSerializer,
 )
 
+MAX_BATCH_VERIFY = 1000
+MAX_LEADERBOARD_PAGE = 100
+
 
 @api_view(['GET'])
 def health(request):
@@ -31,27 +59,121 @@ def health(request):
 @api_view(['GET', 'POST'])
 def list_cases(request):
     if request.method == 'GET':
-        queryset = Case.objects.all()
-        serializer = CaseSerializer(queryset, many=True)
-        return Response(serializer.data)
+        queryset, (sort_field, descending) = filter_cases(Case.objects.all(), request.query_params)
+        paginator = KeysetPagination(ordering_field=sort_field, descending=descending)
+        page = paginator.paginate_queryset(CaseReadSerializer.values(queryset), request)
+        return paginator.get_paginated_response(CaseReadSerializer.render(page))
 
     # Handle file upload by passing both data and FILES
     payload = request.data.copy()
-    user_id = payload.get('userId')
+    user_id = acting_user_id(request, payload.get('userId'))
     payload.pop('userId', None)
+    upload_id = payload.get('uploadId')
+    payload.pop('uploadId', None)
+    # Ids from a verified token need no lookup; unknown legacy ids are ignored.
+    if user_id and not request.user.is_authenticated and not User.objects.filter(id=user_id).exists():
+        user_id = None
     serializer = CaseSerializer(data=payload)
     if serializer.is_valid():
-        case = serializer.save()
-        if user_id:
-            try:
-                case.user = User.objects.get(id=user_id)
-                case.save(update_fields=['user'])
-            except User.DoesNotExist:
-                pass
+        with transaction.atomic():
+            if upload_id:
+                case = serializer.save(user_id=user_id, photo=uploads.claim(upload_id, request.user.id))
+            else:
+                case = serializer.save(user_id=user_id)
+            events.case_event('case.created', case)
         return Response(CaseSerializer(case).data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+def dashboard_stats(request):
+    return Response(stats.get_stats())
+
+
+@api_view(['GET'])
+def sync_changes(request):
+    since = request.query_params.get('since')
+    if since is None:
+        # First sync: hand out the current token; the client then loads its lists.
+        return Response({'next': str(changes.head()), 'has_more': False, 'changes': {}})
+
+    try:
+        since = int(since)
+        if since < 0:
+            raise ValueError
+    except ValueError:
+        return Response({'detail': 'since must be a sync token'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        limit = min(int(request.query_params.get('limit', changes.DEFAULT_LIMIT)), changes.MAX_LIMIT)
+    except ValueError:
+        return Response({'detail': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    user_id = request.query_params.get('userId')
+    if user_id is not None and not user_id.isdigit():
+        return Response({'detail': 'userId must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        next_token, has_more, changed = changes.changes_since(
+            since,
+            user_id=acting_user_id(request, user_id),
+            limit=max(limit, 1),
+        )
+    except changes.TokenExpired:
+        return Response({'detail': 'Sync token has expired; reload and sync again.'}, status=status.HTTP_410_GONE)
+    return Response({'next': str(next_token), 'has_more': has_more, 'changes': changed})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_import(request, kind):
+    if kind not in importer.IMPORTERS:
+        return Response({'detail': 'Unknown import type'}, status=status.HTTP_404_NOT_FOUND)
+
+    # Read the raw body as a stream unless the dump arrives as a multipart upload.
+    upload = request.FILES.get('file') if request.content_type.startswith('multipart/') else None
+    fmt = request.query_params.get('format') or importer.detect_format(
+        upload.name if upload else request.content_type
+    )
+    if fmt not in importer.FORMATS:
+        return Response({'detail': 'format must be ndjson or csv'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        chunk_size = int(request.query_params.get('chunk_size', importer.DEFAULT_CHUNK_SIZE))
+    except ValueError:
+        return Response({'detail': 'chunk_size must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    result = importer.import_stream(kind, upload or request.stream, fmt, chunk_size=max(1, min(chunk_size, 5000)))
+    return Response(result, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+def search_records(request):
+    query = (request.query_params.get('q') or '').strip()
+    if not query:
+        return Response({'detail': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    doc_types = [
+        value.strip()
+        for value in (request.query_params.get('type') or '').split(',')
+        if value.strip()
+    ]
+    unknown = set(doc_types) - set(search.registered_types())
+    if unknown:
+        return Response(
+            {'detail': f'Unknown type(s): {", ".join(sorted(unknown))}'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+    except (TypeError, ValueError):
+        return Response({'detail': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    hits = search.search(query, doc_types or None, limit=limit)
+    return Response({'query': query, 'results': search.render_hits(hits)})
+
+
 @api_view(['PUT'])
 def update_case_status(request, case_id):
     try:
@@ -62,33 +184,76 @@ def update_case_status(request, case_id):
     serializer = CaseStatusUpdateSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     case.status = serializer.validated_data['status']
-    case.save(update_fields=['status', 'updated_at'])
+    with transaction.atomic():
+        case.save(update_fields=['status', 'updated_at'])
+        events.case_event('case.status_changed', case)
     return Response(CaseSerializer(case).data)
 
 
 @api_view(['GET', 'POST'])
 def tips_collection(request):
     if request.method == 'GET':
-        tips = Tip.objects.select_related('case').all()
-        serializer = TipSerializer(tips, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(TipReadSerializer.values(Tip.objects.all()), request)
+        return paginator.get_paginated_response(TipReadSerializer.render(page))
 
     serializer = TipCreateSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
 
     payload = serializer.validated_data
-    tip = Tip.objects.create(
-        case_id=payload['caseId'],
-        user_id=payload.get('userId'),
-        reporter=payload.get('reporter') or 'Anonymous',
-        content=payload['content'],
-        is_anonymous=payload.get('isAnonymous', False),
-        share_location=payload.get('shareLocation', False),
-        attachment=payload.get('attachment'),
-    )
+    with transaction.atomic():
+        attachment = payload.get('attachment')
+        if payload.get('uploadId'):
+            attachment = uploads.claim(payload['uploadId'], request.user.id)
+        tip = Tip.objects.create(
+            case_id=payload['caseId'],
+            user_id=acting_user_id(request, payload.get('userId')),
+            reporter=payload.get('reporter') or 'Anonymous',
+            content=payload['content'],
+            is_anonymous=payload.get('isAnonymous', False),
+            share_location=payload.get('shareLocation', False),
+            attachment=attachment,
+        )
+        counters.tip_created(tip.case_id)
+        events.tip_event('tip.created', tip)
     return Response(TipSerializer(tip).data, status=status.HTTP_201_CREATED)
 
 
+@api_view(['POST'])
+def upload_sessions(request):
+    serializer = UploadSessionSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    session = uploads.create(
+        serializer.validated_data['filename'],
+        serializer.validated_data['size'],
+        user_id=request.user.id,
+    )
+    return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'PUT'])
+def upload_session(request, upload_id):
+    session = uploads.get(upload_id, request.user.id)
+    if request.method == 'GET':
+        return Response(UploadSessionSerializer(session).data)
+
+    # The body is read from the request stream here, never parsed into memory.
+    offset = request.headers.get('Upload-Offset', request.query_params.get('offset'))
+    try:
+        offset = int(offset)
+        length = int(request.headers.get('Content-Length') or 0)
+    except (TypeError, ValueError):
+        return Response({'detail': 'Upload-Offset must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    session = uploads.write(session, offset, request.stream, length)
+    return Response(UploadSessionSerializer(session).data)
+
+
+@api_view(['POST'])
+def complete_upload(request, upload_id):
+    session = uploads.complete(uploads.get(upload_id, request.user.id))
+    return Response(UploadSessionSerializer(session).data)
+
+
 @api_view(['PUT'])
 def verify_tip(request, tip_id):
     try:
@@ -100,18 +265,90 @@ def verify_tip(request, tip_id):
         return Response(TipSerializer(tip).data)
 
     with transaction.atomic():
+        # Conditional update so concurrent verifications count (and award) once.
+        if not Tip.objects.filter(id=tip.id, verified=False).update(verified=True):
+            tip.refresh_from_db()
+            return Response(TipSerializer(tip).data)
         tip.verified = True
-        tip.save(update_fields=['verified'])
-
-        if tip.user:
-            _award_points(tip.user, 10)
+        changes.record('tips', tip.id)
+        counters.tip_verified(tip.case_id)
+        stats.invalidate()
+        events.tip_event('tip.verified', tip)
+
+        if tip.user_id:
+            points.award(
+                tip.user_id,
+                points.TIP_VERIFIED_POINTS,
+                PointsTransaction.REASON_TIP_VERIFIED,
+                source_key=f'tip:{tip.id}',
+            )
+            medals.bump(tip.user_id, MedalRule.METRIC_VERIFIED_TIPS)
 
     return Response(TipSerializer(tip).data)
 
 
+@api_view(['POST'])
+def verify_tips(request):
+    ids = request.data.get('ids')
+    try:
+        ids = list(dict.fromkeys(int(value) for value in ids))
+    except (TypeError, ValueError):
+        ids = None
+    if not ids:
+        return Response({'detail': 'ids must be a non-empty list of tip ids'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(ids) > MAX_BATCH_VERIFY:
+        return Response(
+            {'detail': f'At most {MAX_BATCH_VERIFY} tips can be verified at once'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    with transaction.atomic():
+        # Lock the rows first so the UPDATE below flips exactly the tips read as unverified.
+        rows = list(
+            Tip.objects.select_for_update()
+            .filter(id__in=ids)
+            .values_list('id', 'case_id', 'user_id', 'verified')
+        )
+        pending = [(tip_id, case_id, user_id) for tip_id, case_id, user_id, verified in rows if not verified]
+        pending_ids = [tip_id for tip_id, _, _ in pending]
+        awarded = Counter()
+
+        if pending_ids:
+            Tip.objects.filter(id__in=pending_ids, verified=False).update(verified=True)
+            changes.record_many('tips', pending_ids, action=ChangeLogEntry.ACTION_UPDATED)
+            counters.tips_verified(Counter(case_id for _, case_id, _ in pending))
+            stats.invalidate()
+            entries = []
+            for tip_id, case_id, user_id in pending:
+                events.tip_event('tip.verified', Tip(id=tip_id, case_id=case_id, verified=True))
+                if user_id:
+                    awarded[user_id] += points.TIP_VERIFIED_POINTS
+                    entries.append(
+                        (user_id, points.TIP_VERIFIED_POINTS, PointsTransaction.REASON_TIP_VERIFIED, f'tip:{tip_id}')
+                    )
+            # One ledger INSERT, then one score/medal update per user.
+            points.award_many(entries)
+            medals.bump_many(
+                MedalRule.METRIC_VERIFIED_TIPS,
+                {user_id: total // points.TIP_VERIFIED_POINTS for user_id, total in awarded.items()},
+            )
+
+    found = {tip_id for tip_id, _, _, _ in rows}
+    return Response(
+        {
+            'verified': pending_ids,
+            'already_verified': [tip_id for tip_id, _, _, verified in rows if verified],
+            'not_found': [tip_id for tip_id in ids if tip_id not in found],
+            'points_awarded': {str(user_id): total for user_id, total in awarded.items()},
+        }
+    )
+
+
 @api_view(['GET'])
 def list_users(request):
-    users = User.objects.all().select_related('honour_profile')
+    # auth.User has no indexed creation timestamp, so page on the primary key.
+    paginator = KeysetPagination(ordering_field=None)
+    users = paginator.paginate_queryset(User.objects.all().select_related('honour_profile'), request)
     response_payload = []
 
     for user in users:
@@ -125,7 +362,40 @@ def list_users(request):
             }
         )
 
-    return Response(response_payload)
+    return paginator.get_paginated_response(response_payload)
+
+
+@api_view(['GET'])
+def leaderboard_page(request):
+    try:
+        start = max(int(request.query_params.get('start', 1)), 1)
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), MAX_LEADERBOARD_PAGE)
+    except ValueError:
+        return Response({'detail': 'start and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    total, entries = leaderboard.page(start=start, limit=limit)
+    next_start = start + len(entries)
+    return Response(
+        {
+            'total': total,
+            'start': start,
+            'next_start': next_start if next_start <= total else None,
+            'results': entries,
+        }
+    )
+
+
+@api_view(['GET'])
+def leaderboard_rank(request, user_id):
+    try:
+        neighbours = min(max(int(request.query_params.get('neighbours', 5)), 0), MAX_LEADERBOARD_PAGE)
+    except ValueError:
+        return Response({'detail': 'neighbours must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    standing = leaderboard.around(user_id, neighbours=neighbours)
+    if standing is None:
+        return Response({'detail': 'User is not ranked'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(standing)
 
 
 @api_view(['GET'])
@@ -145,6 +415,7 @@ def user_profile(request, user_id):
             'firstName': user.first_name,
             'lastName': user.last_name,
             'score': profile.score if profile else 0,
+            'reservedPoints': profile.reserved_points if profile else 0,
             'medals': profile.medals if profile else [],
         }
     )
@@ -158,36 +429,33 @@ def update_user_points(request, user_id):
         return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
     try:
-        points = int(request.data.get('points', 0))
+        amount = int(request.data.get('points', 0))
     except (TypeError, ValueError):
         return Response({'detail': 'points must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
 
     mode = (request.data.get('mode') or 'add').lower()
-    profile, _ = HonourProfile.objects.get_or_create(user=user)
 
-    if mode == 'set':
-        profile.score = max(0, points)
-    else:
-        profile.score = max(0, profile.score + points)
-
-    medals = profile.medals or []
-    if profile.score >= 100 and 'Bronze Rescuer' not in medals:
-        medals.append('Bronze Rescuer')
-    profile.medals = medals
-    profile.save(update_fields=['score', 'medals'])
+    with transaction.atomic():
+        # Manual adjustments lock the profile so the ledger records the exact delta applied.
+        profile, _ = HonourProfile.objects.select_for_update().get_or_create(user=user)
+        target = max(0, amount) if mode == 'set' else max(0, profile.score + amount)
+        delta = target - profile.score
+        applied = points.award(user.id, delta, PointsTransaction.REASON_ADJUSTMENT) if delta else None
+        score, medals = applied or (profile.score, profile.medals)
 
     return Response(
         {
             'id': user.id,
             'name': user.get_full_name() or user.username,
-            'score': profile.score,
-            'medals': profile.medals,
+            'score': score,
+            'medals': medals,
         },
         status=status.HTTP_200_OK,
     )
 
 
 @api_view(['POST'])
+@throttle_classes([AuthThrottle])
 def login(request):
     username = request.data.get('username') or request.data.get('email') or request.data.get('phone')
     password = request.data.get('password')
@@ -198,23 +466,7 @@ def login(request):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    user = authenticate(request, username=username, password=password)
-
-    if not user:
-        try:
-            user_by_email = User.objects.get(email=username)
-            user = authenticate(request, username=user_by_email.username, password=password)
-        except User.DoesNotExist:
-            pass
-
-    if not user and username.isdigit():
-        try:
-            phone_email = f'{username}@phone.local'
-            user_by_phone = User.objects.get(email__iexact=phone_email)
-            user = authenticate(request, username=user_by_phone.username, password=password)
-        except User.DoesNotExist:
-            pass
-
+    user = identifiers.authenticate(str(username), password)
     if not user:
         return Response({'detail': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
 
@@ -227,12 +479,14 @@ def login(request):
         'lastName': user.last_name,
         'score': profile.score if profile else 0,
         'medals': profile.medals if profile else [],
+        **tokens.issue(user),
     }
 
     return Response(response_data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
+@throttle_classes([AuthThrottle])
 def register(request):
     username = (request.data.get('username') or '').strip()
     email = (request.data.get('email') or '').strip().lower()
@@ -250,21 +504,25 @@ def register(request):
     if not email and phone:
         email = f'{phone}@phone.local'
 
-    if User.objects.filter(username__iexact=username).exists():
+    clashes = identifiers.taken(username=username, email=email)
+    if LoginIdentifier.KIND_USERNAME in clashes:
         return Response({'detail': 'Username already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
-    if User.objects.filter(email__iexact=email).exists():
+    if LoginIdentifier.KIND_EMAIL in clashes:
         return Response({'detail': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
     try:
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=password,
-            first_name=first_name,
-            last_name=last_name,
-        )
-        HonourProfile.objects.create(user=user, score=0, medals=[])
+        # Creating the user claims its login identifiers; a concurrent signup
+        # with the same ones fails on their unique index and rolls back here.
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=username,
+                email=email,
+                password=password,
+                first_name=first_name,
+                last_name=last_name,
+            )
+            HonourProfile.objects.create(user=user, score=0, medals=[])
     except IntegrityError:
         return Response(
             {'detail': 'Unable to create account with provided details'},
@@ -280,11 +538,38 @@ def register(request):
         'lastName': user.last_name,
         'score': 0,
         'medals': [],
+        **tokens.issue(user),
     }
 
     return Response(response_data, status=status.HTTP_201_CREATED)
 
 
+@api_view(['POST'])
+def refresh_token(request):
+    """Trade a refresh token for a new pair; the old refresh token is revoked."""
+    token = request.data.get('refreshToken') or ''
+    try:
+        claims = tokens.decode(token, tokens.REFRESH)
+    except tokens.InvalidToken as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
+
+    # The one lookup per refresh: deactivated accounts and role changes take effect here.
+    user = User.objects.filter(id=claims['uid'], is_active=True).first()
+    if not user:
+        return Response({'detail': 'User not found'}, status=status.HTTP_401_UNAUTHORIZED)
+    tokens.revoke(token, tokens.REFRESH)
+    return Response(tokens.issue(user))
+
+
+@api_view(['POST'])
+def logout(request):
+    """Revoke the refresh token in the body and the access token in the Authorization header."""
+    tokens.revoke(request.data.get('refreshToken') or '', tokens.REFRESH)
+    if isinstance(request.auth, dict):
+        tokens.revoke_claims(request.auth, tokens.ACCESS)
+    return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(['GET', 'POST'])
 def rewards_collection(request):
     if request.method == 'GET':
@@ -299,8 +584,12 @@ def rewards_collection(request):
 
 @api_view(['GET'])
 def reward_redemptions(request):
-    redemptions = RewardRedemption.objects.select_related('reward', 'user').all()
-    return Response(RewardRedemptionSerializer(redemptions, many=True).data)
+    paginator = KeysetPagination(ordering_field='requested_at')
+    redemptions = paginator.paginate_queryset(
+        RewardRedemptionReadSerializer.values(RewardRedemption.objects.all()),
+        request,
+    )
+    return paginator.get_paginated_response(RewardRedemptionReadSerializer.render(redemptions))
 
 
 @api_view(['GET'])
@@ -310,30 +599,34 @@ def user_coupons(request, user_id):
     except User.DoesNotExist:
         return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    coupons = UserCoupon.objects.filter(user_id=user_id).select_related('reward')
-    return Response(UserCouponSerializer(coupons, many=True).data)
+    now = timezone.now()
+    queryset = filter_coupons(UserCoupon.objects.filter(user_id=user_id), request.query_params, now)
+    paginator = KeysetPagination(ordering_field='issued_at')
+    coupons = paginator.paginate_queryset(queryset.select_related('reward'), request)
+    for coupon in coupons:
+        # Report lapsed coupons the sweeper has not reached yet as Expired.
+        if coupon.status == UserCoupon.STATUS_ACTIVE and coupon.expiry_date and coupon.expiry_date <= now:
+            coupon.status = UserCoupon.STATUS_EXPIRED
+    return paginator.get_paginated_response(UserCouponSerializer(coupons, many=True).data)
 
 
 @api_view(['POST'])
 def redeem_reward(request, reward_id):
-    user_id = request.data.get('userId')
+    user_id = acting_user_id(request, request.data.get('userId'))
     if not user_id:
         return Response({'detail': 'userId is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-    try:
-        user = User.objects.get(id=user_id)
-    except User.DoesNotExist:
+    if not request.user.is_authenticated and not User.objects.filter(id=user_id).exists():
         return Response({'detail': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
     reward = Reward.objects.filter(id=reward_id, is_active=True).first()
     if not reward:
         return Response({'detail': 'Reward not found'}, status=status.HTTP_404_NOT_FOUND)
 
-    profile, _ = HonourProfile.objects.get_or_create(user=user)
-    if profile.score < reward.points_required:
+    try:
+        redemption = redemptions.request(user_id, reward)
+    except redemptions.InsufficientPoints:
         return Response({'detail': 'Not enough points'}, status=status.HTTP_400_BAD_REQUEST)
-
-    redemption = RewardRedemption.objects.create(reward=reward, user=user)
     return Response(RewardRedemptionSerializer(redemption).data, status=status.HTTP_201_CREATED)
 
 
@@ -349,36 +642,36 @@ def review_reward_redemption(request, redemption_id):
     if status_value not in [RewardRedemption.STATUS_APPROVED, RewardRedemption.STATUS_REJECTED]:
         return Response({'detail': 'Invalid status'}, status=status.HTTP_400_BAD_REQUEST)
 
-    with transaction.atomic():
-        redemption.status = status_value
-        redemption.review_notes = review_notes
-        redemption.reviewed_by = request.user if request.user.is_authenticated else None
-        redemption.reviewed_at = timezone.now()
-        redemption.save()
-
-        if status_value == RewardRedemption.STATUS_APPROVED:
-            profile, _ = HonourProfile.objects.get_or_create(user=redemption.user)
-            profile.score = max(0, profile.score - redemption.reward.points_required)
-            profile.save(update_fields=['score'])
-            
-            UserCoupon.objects.create(
-                user=redemption.user,
-                reward=redemption.reward,
-                status=UserCoupon.STATUS_ACTIVE,
-                redemption=redemption,
-            )
+    reviewer_id = request.user.id if request.user.is_authenticated else None
+    try:
+        redemptions.review(redemption, status_value, reviewer_id=reviewer_id, notes=review_notes)
+    except redemptions.AlreadyReviewed:
+        return Response({'detail': 'Redemption has already been reviewed'}, status=status.HTTP_409_CONFLICT)
 
     return Response(RewardRedemptionSerializer(redemption).data)
 
 
-def _award_points(user, points):
-    profile, _ = HonourProfile.objects.get_or_create(user=user)
-    profile.score = profile.score + points
-    medals = profile.medals or []
-    if profile.score >= 100 and 'Bronze Rescuer' not in medals:
-        medals.append('Bronze Rescuer')
-    profile.medals = medals
-    profile.save(update_fields=['score', 'medals'])
+@require_GET
+def event_stream(request):
+    """
+    Server-Sent Events feed of case, tip, sighting and score changes.
+
+    `topics` is a comma-separated list of prefixes such as `cases`,
+    `cases.12` (that case, its tips and its sightings), `tips`, `reports` or
+    `users.5`; omit it to receive everything. Served from an ASGI server each
+    idle client is a parked coroutine rather than a busy worker.
+    """
+    topics = [topic.strip() for topic in request.GET.get('topics', '').split(',') if topic.strip()]
+    subscription = events.get_broker().subscribe(topics)
+    if isinstance(request, ASGIRequest):
+        body = events.astream(subscription)
+    else:
+        body = events.stream(subscription)
+
+    response = StreamingHttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 def _get_openai_key():
@@ -655,6 +948,7 @@ def _normalize_phone(value):
 
 
 @api_view(['POST'])
+@throttle_classes([VoiceReportThrottle])
 def parse_voice_report(request):
     text = (request.data.get('text') or '').strip()
     if not text:
@@ -691,6 +985,7 @@ def parse_voice_report(request):
 
 
 @api_view(['POST'])
+@throttle_classes([AIThrottle])
 def ai_chat(request):
     text = (request.data.get('text') or '').strip()
     if not text:
@@ -722,6 +1017,7 @@ def ai_chat(request):
 
 
 @api_view(['POST'])
+@throttle_classes([TextToSpeechThrottle])
 def text_to_speech(request):
     """Convert text to speech (voice output for accessibility)."""
     text = (request.data.get('text') or '').strip()
@@ -772,6 +1068,7 @@ def text_to_speech(request):
 
 
 @api_view(['POST'])
+@throttle_classes([SpeechRecognitionThrottle])
 def speech_recognition(request):
     """Transcribe audio to text (voice input for accessibility)."""
     if 'audio' not in request.FILES:
@@ -68,6 +68,31 @@ DATABASES = {
     }
 }
 
+# Shared cache for dashboard stats and other derived data. Set REDIS_URL when
+# running more than one worker so invalidations reach every process (needs the
+# redis package).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Real-time push (/api/events). The in-memory broker serves a single process;
+# point this at a shared broker class when running several.
+EVENTS_BROKER = os.getenv('EVENTS_BROKER', 'api.events.InMemoryBroker')
+
+# Seconds between in-process coupon expiry sweeps; 0 leaves it to the
+# `expire_coupons` command (cron or a single scheduler process).
+COUPON_SWEEP_SECONDS = int(os.getenv('COUPON_SWEEP_SECONDS', '0'))
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -87,10 +112,54 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.authentication.SignedTokenAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.AllowAny'],
     'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    # Token-bucket budgets per client for the expensive endpoints (api.throttling).
+    'DEFAULT_THROTTLE_RATES': {
+        'auth': os.getenv('THROTTLE_AUTH_RATE', '20/min'),
+        'ai': os.getenv('THROTTLE_AI_RATE', '20/min'),
+        'voice_report': os.getenv('THROTTLE_VOICE_REPORT_RATE', '20/min'),
+        'tts': os.getenv('THROTTLE_TTS_RATE', '30/min'),
+        'speech': os.getenv('THROTTLE_SPEECH_RATE', '30/min'),
+        'sightings': os.getenv('THROTTLE_SIGHTINGS_RATE', '10/min'),
+    },
 }
 
+# Throttle buckets live in this process by default; use
+# 'api.throttling.RedisBucketStore' to share budgets across workers.
+THROTTLE_STORE = os.getenv('THROTTLE_STORE', 'api.throttling.InMemoryBucketStore')
+THROTTLE_REDIS_URL = os.getenv('THROTTLE_REDIS_URL', os.getenv('REDIS_URL', ''))
+
+# Threads rendering thumbnails of uploaded images after commit; 0 renders inline.
+IMAGE_RENDITION_WORKERS = int(os.getenv('IMAGE_RENDITION_WORKERS', '2'))
+
+# Resumable uploads (api.uploads). Partial files stay outside MEDIA_ROOT until
+# claimed; keep this directory on the same filesystem so claiming is a rename.
+UPLOAD_SESSION_DIR = Path(os.getenv('UPLOAD_SESSION_DIR', str(BASE_DIR / 'upload_sessions')))
+UPLOAD_SESSION_MAX_BYTES = int(os.getenv('UPLOAD_SESSION_MAX_BYTES', str(25 * 1024 * 1024)))
+UPLOAD_SESSION_TTL_SECONDS = int(os.getenv('UPLOAD_SESSION_TTL_SECONDS', str(24 * 60 * 60)))
+
+# Media delivery (api.media). MEDIA_SENDFILE='x-accel-redirect' hands the body to
+# nginx, which must map MEDIA_ACCEL_PREFIX as an `internal` location onto
+# MEDIA_ROOT; 'x-sendfile' suits Apache and lighttpd. Empty streams from Django.
+# Turn SERVE_MEDIA off when the proxy serves MEDIA_URL without asking Django.
+SERVE_MEDIA = os.getenv('SERVE_MEDIA', 'true').lower() == 'true'
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '')
+MEDIA_ACCEL_PREFIX = os.getenv('MEDIA_ACCEL_PREFIX', '/protected-media/')
+MEDIA_MAX_AGE = int(os.getenv('MEDIA_MAX_AGE', str(60 * 60)))
+
+# Signed tokens issued at login/register (see api.tokens). Anonymous clients may
+# still name their user with `userId` until TRUST_CLIENT_USER_ID is turned off.
+ACCESS_TOKEN_SECONDS = int(os.getenv('ACCESS_TOKEN_SECONDS', str(15 * 60)))
+REFRESH_TOKEN_SECONDS = int(os.getenv('REFRESH_TOKEN_SECONDS', str(30 * 24 * 60 * 60)))
+AUTH_TOKEN_REVOCATION = os.getenv('AUTH_TOKEN_REVOCATION', 'true').lower() == 'true'
+TRUST_CLIENT_USER_ID = os.getenv('TRUST_CLIENT_USER_ID', 'true').lower() == 'true'
+
 CORS_ALLOWED_ORIGINS = [
     origin.strip()
     for origin in os.getenv(
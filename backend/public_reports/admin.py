@@ -1,9 +1,12 @@
 from django.contrib import admin
+from django.db.models import Q
 from django.utils.html import format_html
+from api import search
+from api.admin import IndexedSearchMixin
 from .models import PublicReport
 
 
-class PublicReportAdmin(admin.ModelAdmin):
+class PublicReportAdmin(IndexedSearchMixin, admin.ModelAdmin):
     list_display = [
         'id',
         'missing_case',
@@ -14,6 +17,7 @@ class PublicReportAdmin(admin.ModelAdmin):
     ]
     list_filter = ['status', 'created_at', 'missing_case']
     search_fields = ['reporter_name', 'description', 'missing_case__name']
+    search_doc_type = 'report'
     readonly_fields = [
         'id',
         'created_at',
@@ -50,6 +54,13 @@ class PublicReportAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        report_ids = search.matching_ids('report', search_term)
+        case_ids = search.matching_ids('case', search_term)
+        return queryset.filter(Q(pk__in=report_ids) | Q(missing_case_id__in=case_ids)), False
+
     def status_badge(self, obj):
         colors = {
             'Pending': '#FFA500',
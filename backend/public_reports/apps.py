@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class PublicReportsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'public_reports'
+
+    def ready(self):
+        from api import blobs, changes, renditions, search, tasks
+        from . import services, tiles
+        from .models import PublicReport
+        from .serializers import PublicReportSerializer
+
+        tiles.connect()
+        tasks.register(services.NOTIFY_TASK, services.send_report_notification)
+
+        def render(ids):
+            reports = PublicReport.objects.filter(id__in=ids).select_related('reviewed_by_admin')
+            return {report.id: PublicReportSerializer(report).data for report in reports}
+
+        search.register(PublicReport, 'report', {'description': 1, 'reporter_name': 1}, render=render)
+        changes.register(PublicReport, 'reports', render=render)
+        blobs.track(PublicReport, 'image', 'reports')
+        renditions.register(PublicReport, 'image', 'reports')
@@ -0,0 +1,108 @@
+import math
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+MAX_COVER_CELLS = 32
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Standard base32 geohash of a point; neighbouring points share long prefixes."""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= middle:
+            bits |= 1
+            bounds[0] = middle
+        else:
+            bounds[1] = middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell at `precision`."""
+    lng_bits = math.ceil(precision * 5 / 2)
+    lat_bits = precision * 5 // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lng_bits)
+
+
+def cover_bbox(min_lat, min_lng, max_lat, max_lng, max_cells=MAX_COVER_CELLS):
+    """
+    Geohash prefixes whose cells together cover the box.
+
+    Picks the longest prefix length that needs at most `max_cells` cells, so
+    each prefix is one index range scan and little lies outside the box.
+    Boxes crossing the antimeridian (min_lng > max_lng) are split in two.
+    """
+    if min_lng > max_lng:
+        return sorted(
+            set(cover_bbox(min_lat, min_lng, max_lat, 180.0, max_cells // 2))
+            | set(cover_bbox(min_lat, -180.0, max_lat, max_lng, max_cells // 2))
+        )
+
+    cells = {''}
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size(precision)
+        rows = math.floor(max_lat / height) - math.floor(min_lat / height) + 1
+        columns = math.floor(max_lng / width) - math.floor(min_lng / width) + 1
+        if rows * columns > max_cells:
+            break
+        cells = {
+            encode(_clamp(lat, -90.0, 90.0), _clamp(lng, -180.0, 180.0), precision)
+            for lat in _steps(min_lat, max_lat, height)
+            for lng in _steps(min_lng, max_lng, width)
+        }
+    return sorted(cells)
+
+
+def radius_bbox(latitude, longitude, radius_km):
+    """Bounding box (min_lat, min_lng, max_lat, max_lng) around a circle."""
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(-90.0, latitude - lat_delta)
+    max_lat = min(90.0, latitude + lat_delta)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat < 1e-6 or radius_km / (KM_PER_DEGREE_LAT * cos_lat) >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+
+    lng_delta = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    min_lng = _wrap_longitude(longitude - lng_delta)
+    max_lng = _wrap_longitude(longitude + lng_delta)
+    return min_lat, min_lng, max_lat, max_lng
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _steps(start, stop, step):
+    value = start
+    while value < stop:
+        yield value
+        value += step
+    yield stop
+
+
+def _clamp(value, low, high):
+    return min(max(value, low), high)
+
+
+def _wrap_longitude(longitude):
+    return (longitude + 180.0) % 360.0 - 180.0 if not -180.0 <= longitude <= 180.0 else longitude
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from public_reports import tiles
+
+
+class Command(BaseCommand):
+    help = 'Recompute the pre-aggregated sighting map tiles from all public reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        counted = tiles.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Sighting tiles rebuilt from {counted} reports.'))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('public_reports', '0002_reporter_user_points_awarded'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='publicreport',
+            index=models.Index(fields=['created_at', 'id'], name='report_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicreport',
+            index=models.Index(fields=['missing_case', 'created_at', 'id'], name='report_case_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+from public_reports import geo
+
+
+def backfill_geohash(apps, schema_editor):
+    PublicReport = apps.get_model('public_reports', 'PublicReport')
+    reports = PublicReport.objects.only('id', 'latitude', 'longitude')
+    for report in reports.iterator(chunk_size=2000):
+        report.geohash = geo.encode(report.latitude, report.longitude)
+        report.save(update_fields=['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('public_reports', '0003_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicreport',
+            name='geohash',
+            field=models.CharField(blank=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='publicreport',
+            index=models.Index(fields=['geohash', 'created_at'], name='report_geohash_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='publicreport',
+            index=models.Index(fields=['missing_case', 'geohash'], name='report_case_geohash_idx'),
+        ),
+    ]
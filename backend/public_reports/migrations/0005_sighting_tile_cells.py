@@ -0,0 +1,36 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_search_index'),
+        ('public_reports', '0004_report_geohash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SightingTileCell',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('x', models.PositiveIntegerField()),
+                ('y', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('latitude_sum', models.FloatField(default=0)),
+                ('longitude_sum', models.FloatField(default=0)),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sighting_tile_cells', to='api.case')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['case', 'zoom', 'x', 'y'], name='tile_cell_case_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='sightingtilecell',
+            constraint=models.UniqueConstraint(fields=('zoom', 'x', 'y', 'case', 'day'), name='unique_sighting_tile_cell'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('public_reports', '0005_sighting_tile_cells'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publicreport',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
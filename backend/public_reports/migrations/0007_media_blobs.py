@@ -0,0 +1,19 @@
+# Generated by Django 4.2.16 on 2026-10-18 16:58
+
+import api.blobs
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('public_reports', '0006_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='publicreport',
+            name='image',
+            field=models.ImageField(storage=api.blobs.media_storage, upload_to='public_reports/'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.16 on 2026-10-18 17:17
+
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_totals(apps, schema_editor):
+    SightingTileCell = apps.get_model('public_reports', 'SightingTileCell')
+    SightingTileTotal = apps.get_model('public_reports', 'SightingTileTotal')
+    rows = (
+        SightingTileCell.objects.values('zoom', 'x', 'y', 'day')
+        .annotate(total=Sum('count'), lat=Sum('latitude_sum'), lng=Sum('longitude_sum'))
+        .order_by()
+    )
+    SightingTileTotal.objects.bulk_create(
+        (
+            SightingTileTotal(
+                zoom=row['zoom'],
+                x=row['x'],
+                y=row['y'],
+                day=row['day'],
+                count=row['total'],
+                latitude_sum=row['lat'],
+                longitude_sum=row['lng'],
+            )
+            for row in rows.iterator(chunk_size=2000)
+        ),
+        batch_size=2000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('public_reports', '0007_media_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SightingTileTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('zoom', models.PositiveSmallIntegerField()),
+                ('x', models.PositiveIntegerField()),
+                ('y', models.PositiveIntegerField()),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('latitude_sum', models.FloatField(default=0)),
+                ('longitude_sum', models.FloatField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='sightingtiletotal',
+            constraint=models.UniqueConstraint(fields=('zoom', 'x', 'y', 'day'), name='unique_sighting_tile_total'),
+        ),
+        migrations.RunPython(backfill_totals, migrations.RunPython.noop),
+    ]
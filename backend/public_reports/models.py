@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth.models import User
+from api.blobs import media_storage
 from api.models import Case
+from . import geo
 
 
 class PublicReport(models.Model):
@@ -31,9 +33,12 @@ class PublicReport(models.Model):
         related_name='public_reports',
     )
     description = models.TextField()
-    image = models.ImageField(upload_to='public_reports/')
+    image = models.ImageField(upload_to='public_reports/', storage=media_storage)
+    # Resized copies of `image`, written by api.renditions.
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
     latitude = models.FloatField()
     longitude = models.FloatField()
+    geohash = models.CharField(max_length=geo.GEOHASH_PRECISION, blank=True, editable=False)
     points_awarded = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     status = models.CharField(
@@ -53,6 +58,78 @@ class PublicReport(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='report_created_id_idx'),
+            models.Index(fields=['missing_case', 'created_at', 'id'], name='report_case_created_id_idx'),
+            models.Index(fields=['geohash', 'created_at'], name='report_geohash_idx'),
+            models.Index(fields=['missing_case', 'geohash'], name='report_case_geohash_idx'),
+        ]
 
     def __str__(self):
         return f'Report #{self.pk} for case #{self.missing_case_id}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what the row looked like so aggregates can apply exact deltas.
+        instance._loaded_state = {
+            field: getattr(instance, field)
+            for field in ('status', 'latitude', 'longitude', 'missing_case_id', 'created_at')
+            if field in field_names
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geo.encode(self.latitude, self.longitude)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+                kwargs['update_fields'] = set(update_fields) | {'geohash'}
+        super().save(*args, **kwargs)
+
+
+class TileAggregate(models.Model):
+    """
+    Pre-aggregated visible (not rejected) sightings per slippy-map tile cell
+    and day. Coordinate sums give the cluster centroid without a scan.
+    """
+
+    zoom = models.PositiveSmallIntegerField()
+    x = models.PositiveIntegerField()
+    y = models.PositiveIntegerField()
+    day = models.DateField()
+    count = models.IntegerField(default=0)
+    latitude_sum = models.FloatField(default=0)
+    longitude_sum = models.FloatField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class SightingTileCell(TileAggregate):
+    """Tile aggregates of one case, for the case-filtered map."""
+
+    case = models.ForeignKey(Case, on_delete=models.CASCADE, related_name='sighting_tile_cells')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['zoom', 'x', 'y', 'case', 'day'], name='unique_sighting_tile_cell'),
+        ]
+        indexes = [
+            models.Index(fields=['case', 'zoom', 'x', 'y'], name='tile_cell_case_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.zoom}/{self.x}/{self.y} case #{self.case_id} {self.day}: {self.count}'
+
+
+class SightingTileTotal(TileAggregate):
+    """Tile aggregates summed over every case, so the unfiltered map reads one row per cell and day."""
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['zoom', 'x', 'y', 'day'], name='unique_sighting_tile_total'),
+        ]
+
+    def __str__(self):
+        return f'{self.zoom}/{self.x}/{self.y} {self.day}: {self.count}'
@@ -1,15 +1,19 @@
 from rest_framework import serializers
+from api import renditions
 from .models import PublicReport
 
 
 class PublicReportSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(read_only=True)
-    missing_case_id = serializers.IntegerField(source='missing_case_id', read_only=True)
-    reporter_user_id = serializers.IntegerField(source='reporter_user_id', required=False)
+    missing_case_id = serializers.IntegerField(read_only=True)
+    reporter_user_id = serializers.IntegerField(required=False)
     reviewer_name = serializers.CharField(
         source='reviewed_by_admin.username',
         read_only=True
     )
+    renditions = serializers.SerializerMethodField()
+    # A completed resumable upload to use instead of `image`.
+    upload_id = serializers.UUIDField(required=False, write_only=True)
 
     class Meta:
         model = PublicReport
@@ -21,6 +25,8 @@ class PublicReportSerializer(serializers.ModelSerializer):
             'reporter_user_id',
             'description',
             'image',
+            'upload_id',
+            'renditions',
             'latitude',
             'longitude',
             'created_at',
@@ -39,16 +45,20 @@ class PublicReportSerializer(serializers.ModelSerializer):
             'reviewer_name',
             'points_awarded',
         ]
+        extra_kwargs = {'image': {'required': False}}
 
     def validate(self, data):
         if not data.get('description') or not data['description'].strip():
             raise serializers.ValidationError('Description is required and cannot be empty.')
-        if not data.get('image'):
+        if not data.get('image') and not data.get('upload_id'):
             raise serializers.ValidationError('Image is required.')
         if 'latitude' not in data or 'longitude' not in data:
             raise serializers.ValidationError('Location (latitude and longitude) is required.')
         return data
 
+    def get_renditions(self, obj):
+        return renditions.urls(obj.renditions, obj.image.storage)
+
     def create(self, validated_data):
         case_id = self.context.get('case_id')
         validated_data['missing_case_id'] = case_id
@@ -1,15 +1,30 @@
 from django.core.mail import send_mail
 from django.conf import settings
+from api import tasks
+from .models import PublicReport
+
+NOTIFY_TASK = 'reports.notify_case_owner'
 
 
 def notify_case_owner(report):
+    """
+    Queue the new-report notification. Call inside the transaction that
+    creates `report`; `runworker` sends it once that commits.
+    """
+    tasks.enqueue(NOTIFY_TASK, {'report_id': report.pk})
+
+
+def send_report_notification(report_id):
     """
     Send notification to case owner and admin when new report is submitted.
+    Raises on SMTP errors so the task queue retries it.
     """
-    try:
-        case = report.missing_case
-        subject = f'New Sighting Report for {case.name}'
-        message = f"""
+    report = PublicReport.objects.select_related('missing_case').filter(pk=report_id).first()
+    if report is None:
+        return
+    case = report.missing_case
+    subject = f'New Sighting Report for {case.name}'
+    message = f"""
 A new sighting report has been submitted for the missing person case:
 
 Person: {case.name}
@@ -22,24 +37,21 @@ Report ID: {report.pk}
 Status: {report.status}
 
 Please review this report in the admin dashboard.
-        """
-        
-        admin_emails = [
-            admin[1]
-            for admin in settings.ADMINS
-            if admin[1]
-        ]
-        
-        if admin_emails:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                admin_emails,
-                fail_silently=True,
-            )
-    except Exception as e:
-        print(f'Error sending notification: {e}')
+    """
+
+    admin_emails = [
+        admin[1]
+        for admin in settings.ADMINS
+        if admin[1]
+    ]
+
+    if admin_emails:
+        send_mail(
+            subject,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            admin_emails,
+        )
 
 
 def get_report_location_display(report):
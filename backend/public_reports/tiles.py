@@ -0,0 +1,197 @@
+import math
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from api.models import Case
+from .models import PublicReport, SightingTileCell, SightingTileTotal
+
+MAX_ZOOM = 18
+CLUSTER_DEPTH = 3
+MAX_LATITUDE = 85.05112878
+TOTAL_KEY = ('zoom', 'x', 'y', 'day')
+CELL_KEY = TOTAL_KEY + ('case_id',)
+
+
+def tile_for(latitude, longitude, zoom):
+    """Web Mercator (slippy map) tile `(x, y)` containing the point at `zoom`."""
+    latitude = min(max(latitude, -MAX_LATITUDE), MAX_LATITUDE)
+    scale = 1 << zoom
+    x = int((longitude + 180.0) / 360.0 * scale)
+    lat_rad = math.radians(latitude)
+    y = int((1.0 - math.asinh(math.tan(lat_rad)) / math.pi) / 2.0 * scale)
+    return min(max(x, 0), scale - 1), min(max(y, 0), scale - 1)
+
+
+def is_visible(status):
+    return status != PublicReport.STATUS_REJECTED
+
+
+def apply(case_id, latitude, longitude, day, delta, per_case=True):
+    """
+    Add (`delta=1`) or remove (`delta=-1`) one sighting from every zoom level,
+    in the totals and, with `per_case`, in the case's own cells.
+    """
+    cells = [(zoom, *tile_for(latitude, longitude, zoom)) for zoom in range(MAX_ZOOM + 1)]
+    with transaction.atomic():
+        if per_case:
+            _increment(SightingTileCell, {'case_id': case_id, 'day': day}, cells, delta, latitude, longitude)
+        _increment(SightingTileTotal, {'day': day}, cells, delta, latitude, longitude)
+
+
+def _increment(model, key, cells, delta, latitude, longitude):
+    """Bump the cell of every zoom level with one UPDATE, inserting the missing ones empty first."""
+    match = Q()
+    for zoom, x, y in cells:
+        match |= Q(zoom=zoom, x=x, y=y)
+    rows = model.objects.filter(match, **key)
+    existing = set(rows.values_list('zoom', flat=True))
+    missing = [model(zoom=zoom, x=x, y=y, **key) for zoom, x, y in cells if zoom not in existing]
+    if missing:
+        # A concurrent writer may insert the same cells; both increments then land on its rows.
+        model.objects.bulk_create(missing, ignore_conflicts=True)
+    rows.update(
+        count=F('count') + delta,
+        latitude_sum=F('latitude_sum') + latitude * delta,
+        longitude_sum=F('longitude_sum') + longitude * delta,
+    )
+
+
+def _contribution(state):
+    """What a report with `state` adds to the tiles, or None when it is not shown."""
+    if not state or not is_visible(state['status']):
+        return None
+    return state['missing_case_id'], state['latitude'], state['longitude'], timezone.localdate(state['created_at'])
+
+
+def on_report_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_loaded_state', None)
+    after = {
+        'status': instance.status,
+        'latitude': instance.latitude,
+        'longitude': instance.longitude,
+        'missing_case_id': instance.missing_case_id,
+        'created_at': instance.created_at,
+    }
+    instance._loaded_state = after
+    if created:
+        before = None
+    elif not before or len(before) != len(after):
+        # Loaded with deferred fields: nothing to compare against.
+        return
+    old, new = _contribution(before), _contribution(after)
+    # Most saves (reviews, edits of other fields) leave the tiles as they are.
+    if old == new:
+        return
+    if old:
+        apply(*old, -1)
+    if new:
+        apply(*new, 1)
+
+
+def on_report_deleted(sender, instance, origin=None, **kwargs):
+    state = getattr(instance, '_loaded_state', None) or {}
+    contribution = _contribution(state) if len(state) == 5 else None
+    if contribution:
+        # Deleting a case deletes its cells too; recreating them would point at the deleted case.
+        with_case = isinstance(origin, Case) or getattr(origin, 'model', None) is Case
+        apply(*contribution, -1, per_case=not with_case)
+
+
+def connect():
+    post_save.connect(on_report_saved, sender=PublicReport, dispatch_uid='sighting-tiles-save')
+    post_delete.connect(on_report_deleted, sender=PublicReport, dispatch_uid='sighting-tiles-delete')
+
+
+def clusters(zoom, x, y, case_id=None, since=None, until=None):
+    """
+    Cluster counts and centroids for tile `zoom/x/y`: one row per child cell
+    `CLUSTER_DEPTH` levels down (an 8x8 grid), read from the aggregates. The
+    unfiltered map reads the all-case totals.
+    """
+    cluster_zoom = min(zoom + CLUSTER_DEPTH, MAX_ZOOM)
+    span = 1 << (cluster_zoom - zoom)
+    model = SightingTileTotal if case_id is None else SightingTileCell
+    cells = model.objects.filter(
+        zoom=cluster_zoom,
+        x__gte=x * span,
+        x__lt=(x + 1) * span,
+        y__gte=y * span,
+        y__lt=(y + 1) * span,
+    )
+    if case_id is not None:
+        cells = cells.filter(case_id=case_id)
+    if since is not None:
+        cells = cells.filter(day__gte=since)
+    if until is not None:
+        cells = cells.filter(day__lte=until)
+
+    rows = (
+        cells.values('x', 'y')
+        .annotate(total=Sum('count'), lat=Sum('latitude_sum'), lng=Sum('longitude_sum'))
+        .filter(total__gt=0)
+        .order_by('y', 'x')
+    )
+    return cluster_zoom, [
+        {
+            'x': row['x'],
+            'y': row['y'],
+            'count': row['total'],
+            'latitude': round(row['lat'] / row['total'], 6),
+            'longitude': round(row['lng'] / row['total'], 6),
+        }
+        for row in rows
+    ]
+
+
+def rebuild(batch_size=2000):
+    """Recompute every cell and total from the reports; returns the number of reports counted."""
+    counted = 0
+    with transaction.atomic():
+        SightingTileCell.objects.all().delete()
+        SightingTileTotal.objects.all().delete()
+        pending = defaultdict(lambda: [0, 0.0, 0.0])
+        totals = defaultdict(lambda: [0, 0.0, 0.0])
+        current_case = None
+        reports = (
+            PublicReport.objects.exclude(status=PublicReport.STATUS_REJECTED)
+            .order_by('missing_case_id', 'id')
+            .values_list('missing_case_id', 'latitude', 'longitude', 'created_at')
+        )
+        for case_id, latitude, longitude, created_at in reports.iterator(chunk_size=batch_size):
+            if case_id != current_case:
+                _flush(SightingTileCell, pending, batch_size)
+                current_case = case_id
+            day = timezone.localdate(created_at)
+            for zoom in range(MAX_ZOOM + 1):
+                x, y = tile_for(latitude, longitude, zoom)
+                for cell in (pending[(zoom, x, y, day, case_id)], totals[(zoom, x, y, day)]):
+                    cell[0] += 1
+                    cell[1] += latitude
+                    cell[2] += longitude
+            counted += 1
+        _flush(SightingTileCell, pending, batch_size)
+        _flush(SightingTileTotal, totals, batch_size)
+    return counted
+
+
+def _flush(model, pending, batch_size):
+    fields = CELL_KEY if model is SightingTileCell else TOTAL_KEY
+    model.objects.bulk_create(
+        [
+            model(
+                **dict(zip(fields, key)),
+                count=count,
+                latitude_sum=latitude_sum,
+                longitude_sum=longitude_sum,
+            )
+            for key, (count, latitude_sum, longitude_sum) in pending.items()
+        ],
+        batch_size=batch_size,
+    )
+    pending.clear()
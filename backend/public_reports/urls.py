@@ -7,6 +7,21 @@ urlpatterns = [
         PublicReportViewSet.as_view({'get': 'list'}),
         name='list-all-reports'
     ),
+    path(
+        'reports/nearby/',
+        PublicReportViewSet.as_view({'get': 'nearby'}),
+        name='reports-nearby'
+    ),
+    path(
+        'reports/within/',
+        PublicReportViewSet.as_view({'get': 'within'}),
+        name='reports-within'
+    ),
+    path(
+        'reports/tiles/<int:z>/<int:x>/<int:y>/',
+        PublicReportViewSet.as_view({'get': 'tile'}),
+        name='reports-tile'
+    ),
     path(
         'cases/<int:case_id>/report-sighting/',
         PublicReportViewSet.as_view({'post': 'create'}),
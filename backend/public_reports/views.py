@@ -1,3 +1,5 @@
+import math
+
 from django.contrib.auth.models import User
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -5,7 +7,16 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
 from django.db import transaction
-from api.models import Case, HonourProfile
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from api import counters, events, medals, points, uploads
+from api.authentication import acting_user_id
+from api.throttling import SightingThrottle
+from api.filters import parse_datetime_param
+from api.models import Case, MedalRule, PointsTransaction
+from api.pagination import KeysetPagination
+from . import geo, tiles
 from .models import PublicReport
 from .serializers import PublicReportSerializer, PublicReportReviewSerializer
 from .services import notify_case_owner
@@ -15,6 +26,7 @@ class PublicReportViewSet(viewsets.ModelViewSet):
     queryset = PublicReport.objects.all()
     serializer_class = PublicReportSerializer
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
 
     def get_case(self):
         case_id = self.kwargs.get('case_id')
@@ -26,38 +38,50 @@ class PublicReportViewSet(viewsets.ModelViewSet):
             return PublicReport.objects.filter(missing_case_id=case_id)
         return PublicReport.objects.all()
 
+    def get_throttles(self):
+        # Submissions carry an image upload and an owner email; reads stay unthrottled.
+        if self.action == 'create':
+            return [SightingThrottle()]
+        return super().get_throttles()
+
     def create(self, request, *args, **kwargs):
         case = self.get_case()
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        reporter_user_id = serializer.validated_data.get('reporter_user_id')
-        reporter_user = None
-        if reporter_user_id:
-            reporter_user = User.objects.filter(id=reporter_user_id).first()
-        
-        report = PublicReport.objects.create(
-            missing_case=case,
-            reporter_name=serializer.validated_data.get('reporter_name'),
-            reporter_contact=serializer.validated_data.get('reporter_contact'),
-            reporter_user=reporter_user,
-            description=serializer.validated_data.get('description'),
-            image=serializer.validated_data.get('image'),
-            latitude=serializer.validated_data.get('latitude'),
-            longitude=serializer.validated_data.get('longitude'),
-        )
-        
-        notify_case_owner(report)
-        
+        reporter_user_id = acting_user_id(request, serializer.validated_data.get('reporter_user_id'))
+        # Ids from a verified token need no lookup; unknown legacy ids are dropped.
+        if reporter_user_id and not request.user.is_authenticated:
+            if not User.objects.filter(id=reporter_user_id).exists():
+                reporter_user_id = None
+
+        with transaction.atomic():
+            image = serializer.validated_data.get('image')
+            if serializer.validated_data.get('upload_id'):
+                image = uploads.claim(serializer.validated_data['upload_id'], request.user.id, field='upload_id')
+            report = PublicReport.objects.create(
+                missing_case=case,
+                reporter_name=serializer.validated_data.get('reporter_name'),
+                reporter_contact=serializer.validated_data.get('reporter_contact'),
+                reporter_user_id=reporter_user_id,
+                description=serializer.validated_data.get('description'),
+                image=image,
+                latitude=serializer.validated_data.get('latitude'),
+                longitude=serializer.validated_data.get('longitude'),
+            )
+            counters.report_created(case.id, report.created_at)
+            events.report_event('report.created', report)
+            notify_case_owner(report)
+
         return Response(
             PublicReportSerializer(report).data,
             status=status.HTTP_201_CREATED
         )
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
     @action(
         detail=True,
@@ -73,18 +97,156 @@ class PublicReportViewSet(viewsets.ModelViewSet):
         new_status = serializer.validated_data.get('status')
 
         with transaction.atomic():
+            # Re-read under a row lock: the counter delta depends on the status this review replaces.
+            report = PublicReport.objects.select_for_update().get(pk=report.pk)
+            counters.report_status_changed(
+                report.missing_case_id,
+                report.status == PublicReport.STATUS_PENDING,
+                new_status == PublicReport.STATUS_PENDING,
+            )
             report.status = new_status
             report.review_notes = serializer.validated_data.get('review_notes')
-            report.reviewed_by_admin = request.user if request.user.is_authenticated else None
-            if new_status == PublicReport.STATUS_ACCEPTED and report.reporter_user:
+            report.reviewed_by_admin_id = request.user.id if request.user.is_authenticated else None
+            if new_status == PublicReport.STATUS_ACCEPTED and report.reporter_user_id:
                 if report.points_awarded == 0:
-                    profile, _ = HonourProfile.objects.get_or_create(user=report.reporter_user)
-                    profile.score = profile.score + 15
-                    profile.save(update_fields=['score'])
-                    report.points_awarded = 15
+                    points.award(
+                        report.reporter_user_id,
+                        points.REPORT_ACCEPTED_POINTS,
+                        PointsTransaction.REASON_REPORT_ACCEPTED,
+                        source_key=f'report:{report.id}',
+                    )
+                    report.points_awarded = points.REPORT_ACCEPTED_POINTS
+                    medals.bump(report.reporter_user_id, MedalRule.METRIC_ACCEPTED_SIGHTINGS)
             report.save()
+            events.report_event('report.reviewed', report)
 
         return Response(
             PublicReportSerializer(report).data,
             status=status.HTTP_200_OK
         )
+
+    @action(detail=False, methods=['get'], url_path='nearby')
+    def nearby(self, request, *args, **kwargs):
+        """Sightings within `radius_km` of `lat`/`lng`, nearest first."""
+        latitude = _float_param(request, 'lat', -90.0, 90.0)
+        longitude = _float_param(request, 'lng', -180.0, 180.0)
+        radius_km = _float_param(request, 'radius_km', 0.0, geo.EARTH_RADIUS_KM * math.pi, default=5.0)
+        limit = _limit_param(request)
+
+        # Rank on bare coordinates first and only load full rows for the page.
+        candidates = self._within(request, *geo.radius_bbox(latitude, longitude, radius_km))
+        hits = []
+        for pk, report_lat, report_lng in candidates.values_list('id', 'latitude', 'longitude'):
+            distance = geo.haversine_km(latitude, longitude, report_lat, report_lng)
+            if distance <= radius_km:
+                hits.append((distance, pk))
+        hits.sort(key=lambda hit: (hit[0], -hit[1]))
+
+        reports = candidates.in_bulk([pk for _, pk in hits[:limit]])
+        results = []
+        for distance, pk in hits[:limit]:
+            payload = PublicReportSerializer(reports[pk]).data
+            payload['distance_km'] = round(distance, 3)
+            results.append(payload)
+        return Response({'count': len(hits), 'results': results})
+
+    @action(detail=False, methods=['get'], url_path='within')
+    def within(self, request, *args, **kwargs):
+        """Sightings inside the `min_lat,min_lng,max_lat,max_lng` box, newest first."""
+        min_lat = _float_param(request, 'min_lat', -90.0, 90.0)
+        max_lat = _float_param(request, 'max_lat', -90.0, 90.0)
+        min_lng = _float_param(request, 'min_lng', -180.0, 180.0)
+        max_lng = _float_param(request, 'max_lng', -180.0, 180.0)
+        if min_lat > max_lat:
+            raise ValidationError({'min_lat': 'Must not be greater than max_lat.'})
+        limit = _limit_param(request)
+
+        reports = self._within(request, min_lat, min_lng, max_lat, max_lng)
+        return Response(
+            {
+                'count': reports.count(),
+                'results': PublicReportSerializer(reports.order_by('-created_at', '-id')[:limit], many=True).data,
+            }
+        )
+
+    @action(detail=False, methods=['get'], url_path='tiles')
+    def tile(self, request, z, x, y, *args, **kwargs):
+        """Pre-aggregated sighting clusters for slippy-map tile `z/x/y`."""
+        if z > tiles.MAX_ZOOM or x >= (1 << z) or y >= (1 << z):
+            raise ValidationError({'detail': f'Tile {z}/{x}/{y} is out of range.'})
+
+        case_id = request.query_params.get('case_id')
+        if case_id and not case_id.isdigit():
+            raise ValidationError({'case_id': 'Must be an integer.'})
+        since = parse_datetime_param(request.query_params, 'since')
+        until = parse_datetime_param(request.query_params, 'until', end_of_day=True)
+
+        cluster_zoom, clusters = tiles.clusters(
+            z,
+            x,
+            y,
+            case_id=int(case_id) if case_id else None,
+            since=timezone.localdate(since) if since else None,
+            until=timezone.localdate(until) if until else None,
+        )
+        return Response(
+            {
+                'z': z,
+                'x': x,
+                'y': y,
+                'cluster_zoom': cluster_zoom,
+                'total': sum(cluster['count'] for cluster in clusters),
+                'clusters': clusters,
+            }
+        )
+
+    def _within(self, request, min_lat, min_lng, max_lat, max_lng):
+        """
+        Reports in the box: geohash prefix range scans narrow the candidates
+        through the index, then the exact coordinate bounds trim the cell edges.
+        """
+        prefixes = geo.cover_bbox(min_lat, min_lng, max_lat, max_lng)
+        cells = Q()
+        for prefix in prefixes:
+            cells |= Q(geohash__startswith=prefix)
+
+        if min_lng <= max_lng:
+            longitude = Q(longitude__gte=min_lng, longitude__lte=max_lng)
+        else:
+            longitude = Q(longitude__gte=min_lng) | Q(longitude__lte=max_lng)
+
+        queryset = PublicReport.objects.filter(cells, longitude, latitude__gte=min_lat, latitude__lte=max_lat)
+        case_id = request.query_params.get('case_id')
+        if case_id:
+            if not case_id.isdigit():
+                raise ValidationError({'case_id': 'Must be an integer.'})
+            queryset = queryset.filter(missing_case_id=int(case_id))
+        since = parse_datetime_param(request.query_params, 'since')
+        if since is not None:
+            queryset = queryset.filter(created_at__gte=since)
+        until = parse_datetime_param(request.query_params, 'until', end_of_day=True)
+        if until is not None:
+            queryset = queryset.filter(created_at__lte=until)
+        return queryset.select_related('reviewed_by_admin')
+
+
+def _float_param(request, name, low, high, default=None):
+    raw = request.query_params.get(name)
+    if raw in (None, ''):
+        if default is None:
+            raise ValidationError({name: 'This parameter is required.'})
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        raise ValidationError({name: 'Must be a number.'})
+    if not low <= value <= high or math.isnan(value):
+        raise ValidationError({name: f'Must be between {low} and {high}.'})
+    return value
+
+
+def _limit_param(request, default=200, maximum=1000):
+    try:
+        return min(max(int(request.query_params.get('limit', default)), 1), maximum)
+    except (TypeError, ValueError):
+        raise ValidationError({'limit': 'Must be an integer.'})
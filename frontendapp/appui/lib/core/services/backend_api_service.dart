@@ -13,6 +13,57 @@ class BackendApiService {
 
   static Uri _endpoint(String path) => Uri.parse('$_apiBase/$path');
 
+  // Signed tokens from login/register, kept for the life of the app process.
+  static String? _accessToken;
+  static String? _refreshToken;
+
+  static void _storeTokens(Map<String, dynamic> decoded) {
+    final access = decoded['accessToken'];
+    final refresh = decoded['refreshToken'];
+    if (access is String && refresh is String) {
+      _accessToken = access;
+      _refreshToken = refresh;
+    }
+  }
+
+  static Future<bool> _refreshTokens() async {
+    final refresh = _refreshToken;
+    _accessToken = null;
+    _refreshToken = null;
+    if (refresh == null) {
+      return false;
+    }
+    final response = await http.post(
+      _endpoint('auth/refresh'),
+      headers: {'Content-Type': 'application/json'},
+      body: jsonEncode({'refreshToken': refresh}),
+    );
+    if (response.statusCode != 200) {
+      return false;
+    }
+    final decoded = jsonDecode(response.body);
+    if (decoded is Map<String, dynamic>) {
+      _storeTokens(decoded);
+    }
+    return _accessToken != null;
+  }
+
+  /// Sends with the access token; on a 401 refreshes once and sends again
+  /// (without a token if the session has ended, as anonymous clients do).
+  static Future<http.Response> _authorized(
+    Future<http.Response> Function(Map<String, String> headers) send,
+  ) async {
+    Map<String, String> headers() => {
+          if (_accessToken != null) 'Authorization': 'Bearer $_accessToken',
+        };
+    final response = await send(headers());
+    if (response.statusCode != 401 || _accessToken == null) {
+      return response;
+    }
+    await _refreshTokens();
+    return send(headers());
+  }
+
   static String _mediaUrl(String? rawValue) {
     final value = (rawValue ?? '').trim();
     if (value.isEmpty) return '';
@@ -25,6 +76,38 @@ class BackendApiService {
     return '${baseUri.scheme}://${baseUri.host}:${baseUri.port}$mediaPath';
   }
 
+  /// List endpoints return a cursor page: `{next, previous, results}`.
+  static List<Map<String, dynamic>> _pageResults(dynamic decoded) {
+    final results = decoded is Map<String, dynamic> ? decoded['results'] : decoded;
+    if (results is! List) {
+      return [];
+    }
+    return results.whereType<Map<String, dynamic>>().toList();
+  }
+
+  /// Every row of a paginated list: follows `next` until the last page.
+  /// Throws with [failure] and the status code when a page cannot be loaded.
+  static Future<List<Map<String, dynamic>>> _fetchAllPages(
+    Uri uri,
+    String failure,
+  ) async {
+    final rows = <Map<String, dynamic>>[];
+    Uri? next = uri;
+    while (next != null) {
+      final response = await http.get(next);
+      if (response.statusCode < 200 || response.statusCode >= 300) {
+        throw Exception(
+          _extractError(response, '$failure (${response.statusCode})'),
+        );
+      }
+      final decoded = jsonDecode(response.body);
+      rows.addAll(_pageResults(decoded));
+      final link = decoded is Map<String, dynamic> ? decoded['next'] : null;
+      next = link is String && link.isNotEmpty ? Uri.parse(link) : null;
+    }
+    return rows;
+  }
+
   static UrgencyLevel _mapUrgency(String? urgency) {
     switch ((urgency ?? '').toLowerCase()) {
       case 'high':
@@ -88,20 +171,11 @@ class BackendApiService {
   }
 
   static Future<List<MissingPerson>> fetchCases() async {
-    final response = await http.get(_endpoint('cases'));
-    if (response.statusCode < 200 || response.statusCode >= 300) {
-      throw Exception('Failed to fetch cases (${response.statusCode})');
-    }
-
-    final decoded = jsonDecode(response.body);
-    if (decoded is! List) {
-      return [];
-    }
-
-    return decoded
-        .whereType<Map<String, dynamic>>()
-        .map(_toMissingPerson)
-        .toList();
+    final rows = await _fetchAllPages(
+      _endpoint('cases'),
+      'Failed to fetch cases',
+    );
+    return rows.map(_toMissingPerson).toList();
   }
 
   static Future<MissingPerson> createCase({
@@ -113,28 +187,30 @@ class BackendApiService {
     XFile? photo,
     int? userId,
   }) async {
-    final request = http.MultipartRequest('POST', _endpoint('cases'))
-      ..fields['name'] = name
-      ..fields['age'] = age.toString()
-      ..fields['location'] = location
-      ..fields['description'] = description
-      ..fields['reliability'] = '70'
-      ..fields['urgency'] = _mapUrgencyToApi(urgency)
-      ..fields['status'] = 'Pending';
-
-    if (userId != null) {
-      request.fields['userId'] = userId.toString();
-    }
-
-    if (photo != null) {
-      final bytes = await photo.readAsBytes();
-      request.files.add(
-        http.MultipartFile.fromBytes('photo', bytes, filename: photo.name),
-      );
-    }
+    final photoBytes = photo != null ? await photo.readAsBytes() : null;
+    final response = await _authorized((headers) async {
+      final request = http.MultipartRequest('POST', _endpoint('cases'))
+        ..headers.addAll(headers)
+        ..fields['name'] = name
+        ..fields['age'] = age.toString()
+        ..fields['location'] = location
+        ..fields['description'] = description
+        ..fields['reliability'] = '70'
+        ..fields['urgency'] = _mapUrgencyToApi(urgency)
+        ..fields['status'] = 'Pending';
+
+      if (userId != null) {
+        request.fields['userId'] = userId.toString();
+      }
 
-    final streamed = await request.send();
-    final response = await http.Response.fromStream(streamed);
+      if (photo != null && photoBytes != null) {
+        request.files.add(
+          http.MultipartFile.fromBytes('photo', photoBytes, filename: photo.name),
+        );
+      }
+
+      return http.Response.fromStream(await request.send());
+    });
 
     if (response.statusCode < 200 || response.statusCode >= 300) {
       throw Exception('Failed to create case (${response.statusCode})');
@@ -153,31 +229,34 @@ class BackendApiService {
     String reporter = 'Anonymous',
     int? userId,
   }) async {
-    final request = http.MultipartRequest('POST', _endpoint('tips'))
-      ..fields['caseId'] = caseId.toString()
-      ..fields['content'] = content
-      ..fields['isAnonymous'] = isAnonymous.toString()
-      ..fields['shareLocation'] = shareLocation.toString()
-      ..fields['reporter'] = reporter;
-
-    if (userId != null) {
-      request.fields['userId'] = userId.toString();
-    }
-
-    if (attachment != null) {
-      final bytes = await attachment.readAsBytes();
-      request.files.add(
-        http.MultipartFile.fromBytes(
-          'attachment',
-          bytes,
-          filename: attachment.name,
-        ),
-      );
-    }
+    final attachmentBytes = attachment != null ? await attachment.readAsBytes() : null;
+    final response = await _authorized((headers) async {
+      final request = http.MultipartRequest('POST', _endpoint('tips'))
+        ..headers.addAll(headers)
+        ..fields['caseId'] = caseId.toString()
+        ..fields['content'] = content
+        ..fields['isAnonymous'] = isAnonymous.toString()
+        ..fields['shareLocation'] = shareLocation.toString()
+        ..fields['reporter'] = reporter;
+
+      if (userId != null) {
+        request.fields['userId'] = userId.toString();
+      }
 
-    final streamed = await request.send();
-    if (streamed.statusCode < 200 || streamed.statusCode >= 300) {
-      throw Exception('Failed to submit tip (${streamed.statusCode})');
+      if (attachment != null && attachmentBytes != null) {
+        request.files.add(
+          http.MultipartFile.fromBytes(
+            'attachment',
+            attachmentBytes,
+            filename: attachment.name,
+          ),
+        );
+      }
+
+      return http.Response.fromStream(await request.send());
+    });
+    if (response.statusCode < 200 || response.statusCode >= 300) {
+      throw Exception('Failed to submit tip (${response.statusCode})');
     }
   }
 
@@ -209,6 +288,7 @@ class BackendApiService {
 
     final decoded = jsonDecode(response.body);
     if (decoded is Map<String, dynamic>) {
+      _storeTokens(decoded);
       return decoded;
     }
     return {};
@@ -243,6 +323,7 @@ class BackendApiService {
 
     final decoded = jsonDecode(response.body);
     if (decoded is Map<String, dynamic>) {
+      _storeTokens(decoded);
       return decoded;
     }
     return {};
@@ -305,6 +386,36 @@ class BackendApiService {
     return fallback;
   }
 
+  /// Server-Sent Events from `/api/events` for the given topic prefixes
+  /// (e.g. `users.5`, `cases.12`), one decoded event per item.
+  static Stream<Map<String, dynamic>> subscribeEvents(List<String> topics) async* {
+    final client = http.Client();
+    try {
+      final uri = _endpoint('events').replace(
+        queryParameters: {'topics': topics.join(',')},
+      );
+      final request = http.Request('GET', uri)
+        ..headers['Accept'] = 'text/event-stream';
+      final response = await client.send(request);
+      if (response.statusCode != 200) {
+        throw Exception('Failed to open event stream (${response.statusCode})');
+      }
+
+      final lines = response.stream
+          .transform(utf8.decoder)
+          .transform(const LineSplitter());
+      await for (final line in lines) {
+        if (!line.startsWith('data:')) continue;
+        final decoded = jsonDecode(line.substring(5).trim());
+        if (decoded is Map<String, dynamic>) {
+          yield decoded;
+        }
+      }
+    } finally {
+      client.close();
+    }
+  }
+
   static Future<List<Map<String, dynamic>>> fetchRewards() async {
     final response = await http.get(_endpoint('rewards'));
     if (response.statusCode < 200 || response.statusCode >= 300) {
@@ -337,18 +448,42 @@ class BackendApiService {
   static Future<List<Map<String, dynamic>>> fetchUserCoupons({
     required int userId,
   }) async {
-    final response = await http.get(_endpoint('users/$userId/coupons'));
+    return _fetchAllPages(
+      _endpoint('users/$userId/coupons'),
+      'Failed to fetch coupons',
+    );
+  }
+
+  /// Changes since [since] (`next`, `has_more`, `changes`). Without a token the
+  /// response only carries the current token; keep calling while `has_more`.
+  static Future<Map<String, dynamic>> fetchChanges({
+    String? since,
+    int? userId,
+  }) async {
+    final query = <String, String>{
+      if (since != null) 'since': since,
+      if (userId != null) 'userId': '$userId',
+    };
+    final response = await _authorized(
+      (headers) => http.get(
+        _endpoint('changes').replace(queryParameters: query.isEmpty ? null : query),
+        headers: headers,
+      ),
+    );
+    if (response.statusCode == 410) {
+      throw StateError('Sync token expired');
+    }
     if (response.statusCode < 200 || response.statusCode >= 300) {
       throw Exception(
-        _extractError(response, 'Failed to fetch coupons (${response.statusCode})'),
+        _extractError(response, 'Failed to fetch changes (${response.statusCode})'),
       );
     }
 
     final decoded = jsonDecode(response.body);
-    if (decoded is List) {
-      return decoded.whereType<Map<String, dynamic>>().toList();
+    if (decoded is Map<String, dynamic>) {
+      return decoded;
     }
-    return [];
+    return {};
   }
 
   static Future<List<Map<String, dynamic>>> fetchRewardRedemptions() async {
@@ -356,21 +491,19 @@ class BackendApiService {
     if (response.statusCode < 200 || response.statusCode >= 300) {
       throw Exception('Failed to fetch redemptions (${response.statusCode})');
     }
-    final decoded = jsonDecode(response.body);
-    if (decoded is List) {
-      return decoded.whereType<Map<String, dynamic>>().toList();
-    }
-    return [];
+    return _pageResults(jsonDecode(response.body));
   }
 
   static Future<Map<String, dynamic>> redeemReward({
     required int rewardId,
     required int userId,
   }) async {
-    final response = await http.post(
-      _endpoint('rewards/$rewardId/redeem'),
-      headers: {'Content-Type': 'application/json'},
-      body: jsonEncode({'userId': userId}),
+    final response = await _authorized(
+      (headers) => http.post(
+        _endpoint('rewards/$rewardId/redeem'),
+        headers: {'Content-Type': 'application/json', ...headers},
+        body: jsonEncode({'userId': userId}),
+      ),
     );
 
     if (response.statusCode < 200 || response.statusCode >= 300) {
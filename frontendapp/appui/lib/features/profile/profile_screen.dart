@@ -29,7 +29,8 @@ class _ProfileScreenState extends State<ProfileScreen>
   List<Map<String, dynamic>> _rewards = [];
   bool _loadingRedemptions = true;
   List<Map<String, dynamic>> _redemptions = [];
-  Timer? _autoSyncTimer;
+  StreamSubscription<Map<String, dynamic>>? _scoreEvents;
+  Timer? _reconnectTimer;
 
   @override
   void initState() {
@@ -42,7 +43,7 @@ class _ProfileScreenState extends State<ProfileScreen>
 
   @override
   void dispose() {
-    _autoSyncTimer?.cancel();
+    _stopAutoSync();
     WidgetsBinding.instance.removeObserver(this);
     super.dispose();
   }
@@ -76,19 +77,38 @@ class _ProfileScreenState extends State<ProfileScreen>
       _startAutoSync(userId);
       await _syncProfileFromServer(userId);
     } else {
-      _autoSyncTimer?.cancel();
-      _autoSyncTimer = null;
+      _stopAutoSync();
     }
   }
 
+  // Score changes are pushed over the event stream; reconnect (and resync
+  // once, in case anything was missed) whenever the stream drops.
   void _startAutoSync(int userId) {
-    _autoSyncTimer?.cancel();
-    _autoSyncTimer = Timer.periodic(
-      const Duration(seconds: 15),
+    _stopAutoSync();
+    _scoreEvents = BackendApiService.subscribeEvents(['users.$userId']).listen(
       (_) => _syncProfileFromServer(userId),
+      onError: (_) => _scheduleReconnect(userId),
+      onDone: () => _scheduleReconnect(userId),
+      cancelOnError: true,
     );
   }
 
+  void _scheduleReconnect(int userId) {
+    _reconnectTimer?.cancel();
+    _reconnectTimer = Timer(const Duration(seconds: 15), () {
+      if (!mounted) return;
+      _startAutoSync(userId);
+      _syncProfileFromServer(userId);
+    });
+  }
+
+  void _stopAutoSync() {
+    _scoreEvents?.cancel();
+    _scoreEvents = null;
+    _reconnectTimer?.cancel();
+    _reconnectTimer = null;
+  }
+
   Future<void> _syncProfileFromServer(int userId) async {
     try {
       final remoteProfile = await BackendApiService.fetchUserProfile(userId: userId);